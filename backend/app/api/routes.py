@@ -1,18 +1,50 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse, FileResponse, Response
-from ..models.schemas import CodeAnalysisResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Request
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from ..config import get_settings
 from ..service.analyser import CodeAnalyzer
-from ..storage.pdf import PDFGenerator
+from ..service.dag import run_cpu
+from ..service.jobs import JobQueueFullError, get_job_manager
+from ..service.pipeline import run_analysis
+from ..storage.analysis import AnalysisStore
 from ..storage.file import FileStorage
+from ..service.cache import get_llm_cache
+from ..service.latency import get_latency_tracker
+from ..service.singleflight import get_singleflight
+from ..service.usage import get_usage_tracker
+from ..service.scheduler import get_scheduler
+from ..service.structured import get_structured_parser
 from ..utils.logger import setup_logger
 import json
+from typing import Optional
 
 router = APIRouter()
 logger = setup_logger(__name__)
 
+def _client_id(request: Request) -> str:
+    """Fair-queueing identity: X-Client-ID header, else the caller's address"""
+    header = request.headers.get("X-Client-ID")
+    if header:
+        return header
+    return request.client.host if request.client else "anonymous"
+
+async def _check_previous_analysis(previous_analysis_id: Optional[str]):
+    if previous_analysis_id and await run_cpu(AnalysisStore().get, previous_analysis_id) is None:
+        raise HTTPException(status_code=404, detail="Previous analysis not found")
+
 @router.post("/analyze")
-async def analyze_code(file: UploadFile = File(...)):
-    """Analyze Python code file"""
+async def analyze_code(
+    request: Request,
+    file: UploadFile = File(...),
+    refresh: bool = False,
+    previous_analysis_id: Optional[str] = None
+):
+    """Analyze Python code file (blocks until done; POST /jobs returns at once).
+    
+    An unchanged file is answered from the analysis cache unless refresh=true;
+    previous_analysis_id (an earlier revision's file_id) re-explains only
+    the functions and classes that changed.
+    """
+    await _check_previous_analysis(previous_analysis_id)
     logger.info(f"Received analysis request for file: {file.filename}")
     
     try:
@@ -22,97 +54,134 @@ async def analyze_code(file: UploadFile = File(...)):
         
         logger.info(f"File size: {len(code)} bytes")
         
-        # Analyze
-        analyzer = CodeAnalyzer()
-        analysis = await analyzer.analyze(code, filename)
-        
-        # Generate PDF report
-        pdf_generator = PDFGenerator()
-        pdf_html = pdf_generator.generate_formal_report(analysis, filename, code)
-        
-        # Save PDF
-        storage = FileStorage()
-        file_id, pdf_path = storage.save_pdf(pdf_html, filename)
-        
-        # Build response
-        response_dict = {
-            "overview": analysis.overview,
-            "detailed_overview": analysis.detailed_overview,
-            "variables": [
-                {
-                    "name": v.name,
-                    "type": v.type,
-                    "scope": v.scope,
-                    "line_number": v.line_number,
-                    "occurrences": v.occurrences
-                }
-                for v in analysis.variables
-            ],
-            "functions": [
-                {
-                    "name": f.name,
-                    "parameters": f.parameters,
-                    "return_type": f.return_type,
-                    "docstring": f.docstring,
-                    "line_number": f.line_number,
-                    "logic_explanation": f.logic_explanation,
-                    "variables_used": f.variables_used,
-                    "occurrences": f.occurrences
-                }
-                for f in analysis.functions
-            ],
-            "classes": [
-                {
-                    "name": c.name,
-                    "methods": c.methods,
-                    "attributes": c.attributes,
-                    "base_classes": c.base_classes,
-                    "docstring": c.docstring,
-                    "line_number": c.line_number,
-                    "detailed_explanation": c.detailed_explanation,
-                    "method_explanations": c.method_explanations
-                }
-                for c in analysis.classes
-            ],
-            "imports": [
-                {
-                    "module": i.module,
-                    "names": i.names,
-                    "line_number": i.line_number,
-                    "purpose": i.purpose
-                }
-                for i in analysis.imports
-            ],
-            "errors": [
-                {
-                    "severity": e.severity,
-                    "message": e.message,
-                    "line_number": e.line_number,
-                    "category": e.category
-                }
-                for e in analysis.errors
-            ],
-            "suggestions": [
-                {
-                    "category": s.category,
-                    "title": s.title,
-                    "description": s.description,
-                    "code_example": s.code_example,
-                    "priority": s.priority
-                }
-                for s in analysis.suggestions
-            ],
-            "file_id": file_id,
-            "pdf_ready": True
-        }
-        
-        logger.info(f"Analysis complete. File ID: {file_id}")
+        response_dict = await run_analysis(
+            code, filename,
+            client_id=_client_id(request),
+            refresh=refresh,
+            previous_analysis_id=previous_analysis_id
+        )
         return JSONResponse(content=response_dict)
         
     except Exception as e:
         logger.error(f"Analysis failed: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@router.post("/jobs", status_code=202)
+async def submit_job(
+    request: Request,
+    file: UploadFile = File(...),
+    refresh: bool = False,
+    previous_analysis_id: Optional[str] = None
+):
+    """Queue an analysis and return its job id immediately (query options as for /analyze)"""
+    await _check_previous_analysis(previous_analysis_id)
+    logger.info(f"Received analysis job for file: {file.filename}")
+    
+    content = await file.read()
+    try:
+        code = content.decode('utf-8')
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    
+    try:
+        job = get_job_manager().submit(
+            code, file.filename,
+            client_id=_client_id(request),
+            refresh=refresh,
+            previous_analysis_id=previous_analysis_id
+        )
+    except JobQueueFullError as e:
+        logger.warning(f"Rejected analysis job: {e}")
+        raise HTTPException(status_code=503, detail=f"Too many queued analyses, retry later ({e})")
+    
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "result_url": f"/api/jobs/{job.id}/result"
+    }
+
+def _get_job(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Stage progress and the partial results produced so far"""
+    job = _get_job(job_id)
+    return {
+        **job.snapshot(),
+        "queue_position": get_job_manager().queue_position(job)
+    }
+
+@router.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """Final analysis payload; 202 with the job status while it is still running"""
+    job = _get_job(job_id)
+    if job.status == job.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != job.SUCCEEDED:
+        return JSONResponse(status_code=202, content=job.snapshot(include_partial=False))
+    return JSONResponse(content=job.result)
+
+def _sse(event: dict, event_id: Optional[int] = None) -> str:
+    """Format an event dict as a Server-Sent Events frame"""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+@router.post("/analyze/stream")
+async def analyze_code_stream(request: Request, file: UploadFile = File(...)):
+    """Stream AI explanations as Server-Sent Events, tagged by section"""
+    logger.info(f"Received streaming analysis request for file: {file.filename}")
+    
+    content = await file.read()
+    try:
+        code = content.decode('utf-8')
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    filename = file.filename
+    client_id = _client_id(request)
+    
+    async def event_stream():
+        analyzer = CodeAnalyzer(client_id=client_id)
+        try:
+            async for event in analyzer.stream_explanations(code, filename):
+                yield _sse(event)
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {str(e)}", exc_info=True)
+            yield _sse({"event": "error", "detail": str(e)})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request, after: int = 0):
+    """Stream a job's stage and explanation events as Server-Sent Events.
+    
+    Events already sent are replayed first, so clients can connect at any
+    time; reconnecting with Last-Event-ID (or ?after=) resumes after it.
+    """
+    job = _get_job(job_id)
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id and last_event_id.isdigit():
+        after = int(last_event_id)
+    heartbeat = get_settings().JOB_EVENT_HEARTBEAT_SECONDS or None
+    
+    async def event_stream():
+        async for message in job.channel.subscribe(after, heartbeat=heartbeat):
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse({"event": message["event"], **message["data"]}, message["id"])
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
 @router.get("/download/pdf/{file_id}")
 async def download_pdf(file_id: str):
     """Download professional PDF report"""
@@ -133,4 +202,67 @@ async def download_pdf(file_id: str):
         headers={
             "Content-Disposition": f"attachment; filename=code_analysis_report_{file_id}.html"
         }
-    )
\ No newline at end of file
+    )
+
+@router.get("/analyses/{file_id}")
+async def get_analysis(file_id: str):
+    """A stored analysis result by its file id"""
+    record = await run_cpu(AnalysisStore().get, file_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return JSONResponse(content=record["result"])
+
+@router.delete("/analyses/{file_id}")
+async def invalidate_analysis(file_id: str):
+    """Stop serving this analysis from the cache; the next upload of the file is recomputed"""
+    if not await run_cpu(AnalysisStore().invalidate, file_id):
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    logger.info(f"Invalidated cached analysis {file_id}")
+    return {"status": "invalidated", "file_id": file_id}
+
+@router.delete("/analyses")
+async def clear_analyses():
+    """Invalidate every cached analysis (stored results and reports stay downloadable)"""
+    removed = await run_cpu(AnalysisStore().clear)
+    logger.info(f"Cleared {removed} cached analyses")
+    return {"status": "cleared", "removed": removed}
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """LLM response cache hit/miss counters and sizes, plus in-flight coalescing"""
+    return {
+        **(await get_llm_cache().stats()),
+        "coalescing": get_singleflight().stats()
+    }
+
+@router.delete("/cache")
+async def clear_cache():
+    """Drop every cached LLM response"""
+    logger.info("Clearing LLM response cache")
+    await get_llm_cache().clear()
+    return {"status": "cleared"}
+
+@router.get("/metrics/latency")
+async def latency_metrics():
+    """Observed Ollama latency percentiles per prompt type and model"""
+    return get_latency_tracker().snapshot()
+
+@router.get("/metrics/tokens")
+async def token_metrics():
+    """Tokens in/out and throughput per prompt type and model"""
+    return get_usage_tracker().snapshot()
+
+@router.get("/metrics/scheduler")
+async def scheduler_metrics():
+    """Global LLM queue depth by priority and client"""
+    return get_scheduler().stats()
+
+@router.get("/metrics/structured")
+async def structured_metrics():
+    """JSON-mode parse outcomes per prompt type (strict, repaired, LLM-repaired, failed)"""
+    return get_structured_parser().stats()
+
+@router.get("/metrics/jobs")
+async def job_metrics():
+    """Background job queue depth, workers and outcomes"""
+    return get_job_manager().stats()
\ No newline at end of file
@@ -3,19 +3,150 @@
 # ==========================================
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Any, Dict, List, Union
 
 class Settings(BaseSettings):
     # Ollama Configuration
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "deepseek-coder"
     
+    # Load-balanced Ollama backends: JSON list of {"url", "weight", "models", "parallel"}
+    # (a bare URL string also works); empty uses OLLAMA_BASE_URL alone
+    OLLAMA_BACKENDS: List[Union[str, Dict[str, Any]]] = []
+    BACKEND_HEALTH_INTERVAL: float = 10.0
+    BACKEND_EJECT_AFTER_FAILURES: int = 3
+    
+    # Model tiers (empty falls back to OLLAMA_MODEL)
+    OLLAMA_MODEL_FAST: str = ""
+    OLLAMA_MODEL_BALANCED: str = ""
+    OLLAMA_MODEL_QUALITY: str = ""
+    
+    # Model warm-up and residency (keep_alive uses Ollama duration syntax, "-1" pins forever)
+    OLLAMA_WARMUP_ENABLED: bool = True
+    OLLAMA_WARMUP_TIMEOUT: float = 600.0
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    OLLAMA_KEEP_ALIVE_PER_MODEL: Dict[str, str] = {}
+    
+    # Tier routing thresholds for per-symbol prompts
+    ROUTER_FAST_MAX_TOKENS: int = 120
+    ROUTER_FAST_MAX_COMPLEXITY: int = 2
+    ROUTER_QUALITY_MIN_TOKENS: int = 700
+    ROUTER_QUALITY_MIN_COMPLEXITY: int = 15
+    
     # Timeout Configuration (in seconds)
     OLLAMA_TIMEOUT_SHORT: float = 180.0
     OLLAMA_TIMEOUT_MEDIUM: float = 300.0
     OLLAMA_TIMEOUT_LONG: float = 600.0
+    OLLAMA_CONNECT_TIMEOUT: float = 10.0
+    
+    # Adaptive timeouts: percentile of recent latencies times a factor,
+    # clamped to [MIN, MAX]; the values above apply until enough samples exist
+    OLLAMA_TIMEOUT_MIN: float = 15.0
+    OLLAMA_TIMEOUT_MAX: float = 900.0
+    ADAPTIVE_TIMEOUT_PERCENTILE: float = 0.99
+    ADAPTIVE_TIMEOUT_FACTOR: float = 2.0
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = 8
+    ADAPTIVE_TIMEOUT_WINDOW: int = 200
+    
+    # Connection Pool Configuration (shared keep-alive client per Ollama host)
+    OLLAMA_MAX_CONNECTIONS_PER_HOST: int = 16
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS: int = 8
+    OLLAMA_KEEPALIVE_EXPIRY: float = 120.0
+    
+    # Circuit breaker around the Ollama transport
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_SECONDS: float = 30.0
+    CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+    
+    # Server-side output caps (num_predict) per prompt type; batch prompt
+    # types are per item and multiplied by the batch size
+    OLLAMA_NUM_PREDICT: Dict[str, int] = {
+        "overview": 320,
+        "detailed_overview": 1024,
+        "function": 256,
+        "functions_batch": 192,
+        "class": 256,
+        "imports_batch": 160,
+        "suggestions": 512
+    }
+    
+    # JSON-mode replies for suggestions and batch prompts: "schema" sends the
+    # per-task JSON schema (Ollama 0.5+), "json" sends plain format=json
+    OLLAMA_STRUCTURED_FORMAT: str = "schema"
+    
+    # Shared per-file prompt prefix reuse: "context" primes it once per model and
+    # sends Ollama's context tokens, "system" sends it as the system prompt,
+    # "off" builds every prompt from scratch
+    OLLAMA_PREFIX_MODE: str = "context"
+    
+    # Maximum concurrent Ollama calls issued by a single analysis
+    OLLAMA_MAX_PARALLEL: int = 4
+    
+    # Per-backend cap on in-flight Ollama calls; match the server's OLLAMA_NUM_PARALLEL
+    OLLAMA_SERVER_PARALLEL: int = 4
+    # Relative fair-queueing weights per client id (default 1.0)
+    SCHEDULER_CLIENT_WEIGHTS: Dict[str, float] = {}
+    
+    # Heuristic fast path: trivial functions and classes get a template
+    # explanation instead of an LLM call
+    HEURISTICS_ENABLED: bool = True
+    HEURISTIC_FUNCTION_MAX_STATEMENTS: int = 2
+    # Top-level members (methods, assignments); each method must also be trivial
+    HEURISTIC_CLASS_MAX_STATEMENTS: int = 6
+    HEURISTIC_DOCSTRING_MIN_WORDS: int = 25
+    HEURISTIC_DOCUMENTED_MAX_STATEMENTS: int = 8
+    
+    # Reuse explanations of structurally identical functions/classes (within a
+    # file and through the LLM cache); canonicalizing names lets copies with
+    # renamed variables match, literals lets copies with different constants match
+    FINGERPRINT_ENABLED: bool = True
+    FINGERPRINT_CANONICALIZE_NAMES: bool = True
+    FINGERPRINT_CANONICALIZE_LITERALS: bool = False
+    
+    # Batched function explanations (estimated prompt tokens per batch)
+    LLM_BATCH_TOKEN_BUDGET: int = 2048
+    LLM_BATCH_MAX_ITEMS: int = 8
+    
+    # Longest function/class snippet sent to the LLM (estimated tokens); longer
+    # bodies keep their signature, docstring and control flow, 0 disables
+    SNIPPET_MAX_TOKENS: int = 1200
+    
+    # Offline import-purpose index (empty uses the bundled app/data file)
+    IMPORT_KB_PATH: str = ""
+    
+    # LLM Response Cache (memory LRU in front of a SQLite store)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "cache/llm_cache.sqlite3"
+    LLM_CACHE_MEMORY_ITEMS: int = 2048
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LLM_CACHE_TTL_SECONDS: float = 30 * 24 * 3600.0
+    
+    # Worker threads for CPU-bound pipeline stages (parsing, static checks, diagrams, reports)
+    PIPELINE_CPU_WORKERS: int = 4
+    
+    # Background analysis jobs (POST /api/jobs): concurrent pipelines, waiting
+    # jobs accepted before submit is refused, and how long results are kept
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_MAX: int = 100
+    JOB_RESULT_TTL_SECONDS: float = 3600.0
+    # Live job events (GET /api/jobs/{id}/events): events kept for replay on
+    # reconnect, and the idle interval after which a keep-alive comment is sent
+    JOB_EVENT_BUFFER: int = 1000
+    JOB_EVENT_HEARTBEAT_SECONDS: float = 15.0
+    
+    # Whole-analysis cache: an unchanged upload (same source, models, prompt
+    # templates and APP_VERSION) returns the stored result and report
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_TTL_SECONDS: float = 7 * 24 * 3600.0
+    
+    # Incremental re-analysis (previous_analysis_id): unchanged symbols keep their
+    # explanations; the overviews are regenerated only when at least this share
+    # of symbols and imports was added, removed or modified
+    INCREMENTAL_OVERVIEW_THRESHOLD: float = 0.25
     
     # Application Settings
     APP_NAME: str = "Python Code Explainer"
+    APP_VERSION: str = "2.0.0"
     DEBUG: bool = False
     OUTPUT_DIR: str = "output"
     LOG_LEVEL: str = "INFO"
@@ -4,8 +4,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from .api.routes import router
 from .config import get_settings
+from .service.http_pool import get_http_pool
+from .service.backends import get_backend_pool
+from .service.breaker import get_circuit_breaker
+from .service.jobs import get_job_manager
+from .service.warmup import get_model_warmup
 from .utils.logger import setup_logger
 from pathlib import Path
 
@@ -15,7 +21,7 @@ logger = setup_logger(__name__)
 app = FastAPI(
     title=settings.APP_NAME,
     description="AI-powered Python code explanation system with comprehensive analysis",
-    version="2.0.0"
+    version=settings.APP_VERSION
 )
 
 logger.info("Starting Python Code Explainer API")
@@ -41,20 +47,57 @@ async def root():
     return {
         "message": "Python Code Explainer API", 
         "status": "running",
-        "version": "2.0.0"
+        "version": settings.APP_VERSION
     }
 
 @app.get("/health")
 async def health():
     logger.debug("Health check endpoint accessed")
-    return {"status": "healthy"}
+    circuit = get_circuit_breaker().snapshot()
+    backends = get_backend_pool().snapshot()
+    warmup = get_model_warmup()
+    
+    # Not ready until the models are loaded, so load balancers skip cold instances
+    if not warmup.finished:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "warming_up",
+                "ready": False,
+                "warmup": warmup.snapshot(),
+                "ollama_circuit": circuit,
+                "ollama_backends": backends
+            }
+        )
+    
+    healthy = (
+        circuit["state"] == "closed"
+        and warmup.status != warmup.DEGRADED
+        and backends["healthy"] == backends["total"]
+    )
+    return {
+        "status": "healthy" if healthy else "degraded",
+        "ready": True,
+        "warmup": warmup.snapshot(),
+        "ollama_circuit": circuit,
+        "ollama_backends": backends
+    }
 
 @app.on_event("startup")
 async def startup_event():
+    backends = get_backend_pool()
+    await get_http_pool().startup(backend.url for backend in backends.backends)
+    backends.start()
+    get_model_warmup().start()
+    get_job_manager().start()
     logger.info("Application startup complete")
     logger.info(f"Output directory: {settings.OUTPUT_DIR}")
-    logger.info(f"Ollama URL: {settings.OLLAMA_BASE_URL}")
+    logger.info(f"Ollama backends: {', '.join(backend.url for backend in backends.backends)}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logger.info("Application shutting down")
\ No newline at end of file
+    logger.info("Application shutting down")
+    await get_job_manager().stop()
+    await get_model_warmup().stop()
+    await get_backend_pool().stop()
+    await get_http_pool().close()
\ No newline at end of file
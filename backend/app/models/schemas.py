@@ -17,9 +17,17 @@ class Function(BaseModel):
     return_type: Optional[str]
     docstring: Optional[str]
     line_number: int
+    start_line_number: Optional[int] = None  # First line, decorators included
+    end_line_number: Optional[int] = None  # Last line of the def, decorators excluded
     logic_explanation: str = ""  # Detailed explanation
     variables_used: List[str] = []  # Variables used in function
     occurrences: List[int] = []  # Where function is called
+    body_statements: int = 0  # Statements in the body, nested ones included, docstring excluded
+    statement_kinds: List[str] = []  # e.g. "Return:Attribute", "Assign:Attribute", "If"
+    fingerprint: Optional[str] = None  # Normalized AST hash, equal for structurally identical code
+    fingerprint_names: List[str] = []  # Names bound by the symbol, in placeholder order
+    explanation_source: str = "llm"  # "llm", "heuristic" or "reused"
+    carried_over: bool = False  # Explanation kept from the previous analysis of an unchanged symbol
 
 class Class(BaseModel):
     name: str
@@ -28,8 +36,18 @@ class Class(BaseModel):
     base_classes: List[str]
     docstring: Optional[str]
     line_number: int
+    start_line_number: Optional[int] = None  # First line, decorators included
+    end_line_number: Optional[int] = None  # Last line of the class body
     detailed_explanation: str = ""
     method_explanations: str=""
+    body_statements: int = 0
+    statement_kinds: List[str] = []
+    member_kinds: List[str] = []  # Kinds of the top-level body statements only (methods, assignments, ...)
+    method_functions: List[Function] = []  # Parsed methods, for per-method heuristics
+    fingerprint: Optional[str] = None
+    fingerprint_names: List[str] = []
+    explanation_source: str = "llm"
+    carried_over: bool = False
 
 class Import(BaseModel):
     module: str
@@ -62,4 +80,5 @@ class CodeAnalysisResponse(BaseModel):
     diagrams: Dict[str, str]
     markdown_content: str
     pdf_content: Optional[str]
-    file_id: str
\ No newline at end of file
+    file_id: str
+    stats: Dict[str, Any] = {}  # Per-stage counters, e.g. LLM calls saved by heuristics
\ No newline at end of file
@@ -3,29 +3,113 @@
 # ==========================================
 import httpx
 import asyncio
-from typing import Dict, Any, List
+import json
+import time
+from contextlib import nullcontext
+from typing import Dict, Any, Callable, List, Optional, AsyncIterator, Tuple, TypeVar
 from ..config import get_settings
+from .http_pool import get_http_pool
+from .backends import get_backend_pool
+from .cache import get_llm_cache
+from .knowledge import get_import_knowledge_base
+from .router import ModelRouter
+from .latency import get_latency_tracker
+from .breaker import CircuitOpenError, get_circuit_breaker, is_outage
+from .warmup import keep_alive_for
+from .singleflight import get_singleflight
+from .usage import get_usage_tracker
+from .prefix import FilePromptContext, PREFIX_PROMPT_TYPES
+from .scheduler import get_scheduler
+from .structured import SCHEMAS, StructuredOutputError, get_structured_parser, response_format_for
 from ..models.schemas import Function, Class, Import, Suggestion
 from ..utils.logger import setup_logger
+from ..utils.tokens import estimate_tokens
 
 logger = setup_logger(__name__)
 
+T = TypeVar("T")
+
+# Bump whenever a prompt template changes so cached responses are not reused
+PROMPT_TEMPLATE_VERSION = "4"
+
+# Timeout class applied to each prompt type while its latency window is cold
+TIMEOUT_CLASSES = {
+    "overview": "short",
+    "function": "medium",
+    "class": "medium",
+    "functions_batch": "long",
+    "imports_batch": "long",
+    "detailed_overview": "long",
+    "suggestions": "long",
+    "json_repair": "short"
+}
+
 class AIService:
-    def __init__(self):
+    def __init__(self, client_id: str = "anonymous"):
         logger.info("Initializing AIService")
         self.settings = get_settings()
-        self.base_url = self.settings.OLLAMA_BASE_URL
+        self.client_id = client_id
         self.model = self.settings.OLLAMA_MODEL
+        self.router = ModelRouter()
+        self.models = self.router.models
+        self.http_pool = get_http_pool()
+        self.backends = get_backend_pool()
+        self.cache = get_llm_cache()
+        self.knowledge_base = get_import_knowledge_base()
+        
+        # Bounds how many prompts this service keeps in flight at once
+        self.max_parallel = max(1, self.settings.OLLAMA_MAX_PARALLEL)
+        self._semaphore = asyncio.Semaphore(self.max_parallel)
         
-        # Configurable timeouts
-        self.short_timeout = 45.0   # For simple tasks
-        self.medium_timeout = 90.0  # For moderate complexity
-        self.long_timeout = 180.0   # For complex analysis
+        # Configured timeouts, used until observed latencies take over
+        self.timeouts = {
+            "short": self.settings.OLLAMA_TIMEOUT_SHORT,
+            "medium": self.settings.OLLAMA_TIMEOUT_MEDIUM,
+            "long": self.settings.OLLAMA_TIMEOUT_LONG
+        }
+        self.latency = get_latency_tracker()
+        self.breaker = get_circuit_breaker()
+        self.singleflight = get_singleflight()
+        self.usage = get_usage_tracker()
+        self.scheduler = get_scheduler()
+        self.structured = get_structured_parser()
+        
+        # Per-file prompt prefix, set by the analyzer once the file is parsed
+        self.file_context: Optional[FilePromptContext] = None
+        self.prefix_mode = self.settings.OLLAMA_PREFIX_MODE
+        
+        # Prompt types answered from a structural fallback instead of the model
+        self.fallbacks: Dict[str, int] = {}
+    
+    def model_for(self, prompt_type: str, snippet: str = "") -> str:
+        """Model chosen by the tier router for a prompt"""
+        return self.router.choose_model(prompt_type, snippet)
+    
+    def set_file_context(self, file_context: Optional[FilePromptContext]):
+        """Share one prompt prefix across every per-symbol prompt for a file"""
+        self.file_context = file_context
+    
+    def _record_fallback(self, prompt_type: str, count: int = 1):
+        self.fallbacks[prompt_type] = self.fallbacks.get(prompt_type, 0) + count
     
     async def generate_overview(self, code: str, structure: Dict[str, Any]) -> str:
         """Generate brief overview"""
         logger.info("Generating code overview")
-        prompt = f"""Analyze this Python code and provide a 2-3 paragraph overview.
+        prompt = self._build_overview_prompt(code, structure)
+        try:
+            return await self._call_ollama_with_limit(
+                prompt,
+                prompt_type="overview",
+                model=self.model_for("overview")
+            )
+        except Exception as e:
+            logger.warning(f"Overview generation failed: {e}")
+            self._record_fallback("overview")
+            return self._generate_fallback_overview(code, structure)
+    
+    def _build_overview_prompt(self, code: str, structure: Dict[str, Any]) -> str:
+        """Prompt for the brief overview"""
+        return f"""Analyze this Python code and provide a 2-3 paragraph overview.
 
 Code snippet:
 {code[:800]}...
@@ -36,8 +120,14 @@ Structure:
 - Imports: {len(structure.get('imports', []))}
 
 Explain what this code does and its main purpose. Keep it concise (max 200 words)."""
-
-        return await self._call_ollama(prompt, timeout=self.short_timeout)
+    
+    async def explain_imports(self, imports: List[Import]) -> List[Import]:
+        """Resolve import purposes offline, batching only unknown modules to the LLM"""
+        resolved, unknown = self.knowledge_base.resolve(imports)
+        logger.info(f"Resolved {len(resolved)} imports from the knowledge base, {len(unknown)} unknown")
+        if unknown:
+            await self.explain_imports_batch(unknown)
+        return imports
     
     async def explain_imports_batch(self, imports: List[Import]) -> List[Import]:
         """Explain all imports in ONE comprehensive call"""
@@ -63,54 +153,28 @@ For EACH import, provide a detailed explanation (3-4 sentences) covering:
 3. Common use cases in Python development
 4. How it fits into typical Python applications
 
-Format your response EXACTLY as:
-IMPORT 1: [Detailed explanation here]
-IMPORT 2: [Detailed explanation here]
-etc.
+Respond with JSON only, one entry per import, using its number as "index":
+{{"imports": [{{"index": 1, "explanation": "..."}}, {{"index": 2, "explanation": "..."}}]}}
 
 Keep each explanation detailed but concise (3-4 sentences)."""
 
         try:
-            response = await self._call_ollama_with_limit(
+            explanations = await self._call_structured(
                 prompt,
-                timeout=self.timeouts["long"],
-                model=self.models["balanced"]
+                prompt_type="imports_batch",
+                model=self.model_for("imports_batch"),
+                num_predict=self.num_predict_for("imports_batch", len(imports)),
+                parse=lambda text, repaired: self.structured.indexed(text, "imports_batch", "imports", len(imports), repaired),
+                items=len(imports)
             )
             
-            # Parse response
-            lines = response.strip().split('\n')
-            explanations = {}
-            current_import_idx = None
-            current_explanation = []
-            
-            for line in lines:
-                if line.startswith('IMPORT '):
-                    # Save previous explanation
-                    if current_import_idx is not None and current_explanation:
-                        explanations[current_import_idx] = ' '.join(current_explanation).strip()
-                    
-                    # Start new import
-                    parts = line.split(':', 1)
-                    if len(parts) == 2:
-                        import_num = parts[0].replace('IMPORT', '').strip()
-                        try:
-                            current_import_idx = int(import_num) - 1
-                            current_explanation = [parts[1].strip()]
-                        except:
-                            current_explanation.append(line)
-                elif current_import_idx is not None:
-                    current_explanation.append(line.strip())
-            
-            # Save last explanation
-            if current_import_idx is not None and current_explanation:
-                explanations[current_import_idx] = ' '.join(current_explanation).strip()
-            
             # Assign explanations to imports
             for idx, imp in enumerate(imports):
                 if idx in explanations:
                     imp.purpose = explanations[idx]
                 else:
                     # Fallback
+                    self._record_fallback("imports_batch")
                     imp.purpose = f"The {imp.module} module provides {', '.join(imp.names)} for Python development. This is commonly used for its specialized functionality."
             
             logger.info(f"Successfully explained {len(explanations)} imports")
@@ -118,6 +182,7 @@ Keep each explanation detailed but concise (3-4 sentences)."""
             
         except Exception as e:
             logger.warning(f"Batch import explanation failed: {e}")
+            self._record_fallback("imports_batch", len(imports))
             # Fallback: basic explanations
             for imp in imports:
                 imp.purpose = f"The {imp.module} module provides {', '.join(imp.names)}. This module offers specialized functionality commonly used in Python applications."
@@ -171,10 +236,12 @@ Write in a formal, professional tone suitable for technical documentation."""
         try:
             return await self._call_ollama_with_limit(
                 prompt,
-                timeout=self.timeouts["long"],
-                model=self.models["quality"]
+                prompt_type="detailed_overview",
+                model=self.model_for("detailed_overview")
             )
-        except:
+        except Exception as e:
+            logger.warning(f"Detailed overview generation failed: {e}")
+            self._record_fallback("detailed_overview")
             return self._generate_fallback_overview(code, structure)
     
     def _generate_fallback_overview(self, code: str, structure: Dict[str, Any]) -> str:
@@ -198,8 +265,125 @@ Based on the structure, this code appears to implement core business logic with
         """Generate detailed function explanation"""
         logger.info(f"Explaining function: {func.name}")
         
-        # Optimized shorter prompt
-        prompt = f"""Explain this Python function briefly (max 150 words).
+        prompt = self._build_function_prompt(func, code_snippet)
+        
+        try:
+            return await self._call_ollama_with_limit(
+                prompt,
+                prompt_type="function",
+                model=self.model_for("function", code_snippet)
+            )
+        except Exception as e:
+            logger.warning(f"Function explanation failed for {func.name}: {e}")
+            self._record_fallback("function")
+            return self._generate_fallback_function_explanation(func)
+    
+    async def explain_functions_batch(
+        self,
+        items: List[Tuple[Function, str]],
+        on_result: Optional[Callable[[int, str], None]] = None
+    ) -> List[str]:
+        """Explain many functions with as few prompts as the token budget allows.
+        
+        Snippets are packed in order into batches that fit LLM_BATCH_TOKEN_BUDGET;
+        only items missing from a parsed batch reply get an individual call.
+        A batch lost to an outage or an open circuit falls back as a whole,
+        since single calls would only hit the same outage once per item.
+        on_result(index, explanation) is called as soon as each item is done.
+        """
+        report = on_result or (lambda idx, explanation: None)
+        if not items:
+            return []
+        
+        batches = self._pack_batches([estimate_tokens(snippet) for _, snippet in items])
+        logger.info(f"Explaining {len(items)} functions in {len(batches)} prompt(s)")
+        results: List[Optional[str]] = [None] * len(items)
+        
+        async def run_batch(indices: List[int]):
+            batch = [items[idx] for idx in indices]
+            prompt = self._build_functions_batch_prompt(batch)
+            try:
+                parsed = await self._call_structured(
+                    prompt,
+                    prompt_type="functions_batch",
+                    model=self.model_for("function", "\n".join(snippet for _, snippet in batch)),
+                    num_predict=self.num_predict_for("functions_batch", len(batch)),
+                    parse=lambda text, repaired: self.structured.indexed(text, "functions_batch", "functions", len(batch), repaired),
+                    items=len(batch)
+                )
+            except Exception as e:
+                logger.warning(f"Batch function explanation failed for {len(batch)} functions: {e}")
+                if isinstance(e, CircuitOpenError) or is_outage(e):
+                    self._record_fallback("function", len(batch))
+                    parsed = {
+                        position: self._generate_fallback_function_explanation(func)
+                        for position, (func, _) in enumerate(batch)
+                    }
+                else:
+                    parsed = {}
+            for position, idx in enumerate(indices):
+                results[idx] = parsed.get(position)
+                if results[idx] is not None:
+                    report(idx, results[idx])
+        
+        await asyncio.gather(*[run_batch(indices) for indices in batches if len(indices) > 1])
+        
+        # Single calls for unbatched items and anything the batch reply dropped
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if missing:
+            logger.info(f"Falling back to single calls for {len(missing)} function(s)")
+            
+            async def run_single(idx: int):
+                results[idx] = await self.explain_function(*items[idx])
+                report(idx, results[idx])
+            
+            await asyncio.gather(*[run_single(idx) for idx in missing])
+        
+        return results
+    
+    def _pack_batches(self, token_counts: List[int]) -> List[List[int]]:
+        """Greedily group consecutive items so each batch fits the token budget"""
+        budget = self.settings.LLM_BATCH_TOKEN_BUDGET
+        max_items = max(1, self.settings.LLM_BATCH_MAX_ITEMS)
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        
+        for idx, tokens in enumerate(token_counts):
+            if current and (current_tokens + tokens > budget or len(current) >= max_items):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(idx)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    def _build_functions_batch_prompt(self, batch: List[Tuple[Function, str]]) -> str:
+        """Numbered multi-function prompt answered as {"functions": [{index, explanation}]}"""
+        functions_list = "\n\n".join([
+            f"FUNCTION {idx+1}: {func.name}({', '.join(func.parameters)}) -> {func.return_type or 'Unknown'}\n{snippet}"
+            for idx, (func, snippet) in enumerate(batch)
+        ])
+        
+        return f"""Explain each of these Python functions briefly (max 120 words each).
+
+FUNCTIONS TO EXPLAIN:
+{functions_list}
+
+For EACH function explain:
+1. What it does
+2. How it processes inputs
+3. Key logic steps
+4. What it returns
+
+Respond with JSON only, one entry per function, using its number as "index":
+{{"functions": [{{"index": 1, "explanation": "..."}}, {{"index": 2, "explanation": "..."}}]}}"""
+    
+    def _build_function_prompt(self, func: Function, code_snippet: str) -> str:
+        """Optimized short prompt for a single function"""
+        return f"""Explain this Python function briefly (max 150 words).
 
 Function: {func.name}({', '.join(func.parameters)})
 Returns: {func.return_type or 'Unknown'}
@@ -212,12 +396,6 @@ Explain:
 2. How it processes inputs
 3. Key logic steps
 4. What it returns"""
-
-        try:
-            return await self._call_ollama(prompt, timeout=self.medium_timeout)
-        except Exception as e:
-            logger.warning(f"Function explanation failed for {func.name}: {e}")
-            return self._generate_fallback_function_explanation(func)
     
     def _generate_fallback_function_explanation(self, func: Function) -> str:
         """Fallback explanation if AI times out"""
@@ -237,7 +415,22 @@ Explain:
         """Generate detailed class explanation"""
         logger.info(f"Explaining class: {cls.name}")
         
-        prompt = f"""Explain this Python class briefly (max 150 words).
+        prompt = self._build_class_prompt(cls, code_snippet)
+        
+        try:
+            return await self._call_ollama_with_limit(
+                prompt,
+                prompt_type="class",
+                model=self.model_for("class", code_snippet)
+            )
+        except Exception as e:
+            logger.warning(f"Class explanation failed for {cls.name}: {e}")
+            self._record_fallback("class")
+            return self._generate_fallback_class_explanation(cls)
+    
+    def _build_class_prompt(self, cls: Class, code_snippet: str) -> str:
+        """Short prompt for a single class"""
+        return f"""Explain this Python class briefly (max 150 words).
 
 Class: {cls.name}
 Methods: {', '.join(cls.methods[:5])}...
@@ -251,12 +444,6 @@ Explain:
 2. How it's designed
 3. Key methods
 4. State management"""
-
-        try:
-            return await self._call_ollama(prompt, timeout=self.medium_timeout)
-        except Exception as e:
-            logger.warning(f"Class explanation failed for {cls.name}: {e}")
-            return self._generate_fallback_class_explanation(cls)
     
     def _generate_fallback_class_explanation(self, cls: Class) -> str:
         """Fallback explanation if AI times out"""
@@ -272,23 +459,6 @@ Explain:
 *Note: Detailed AI analysis timed out.*"""
         return explanation
     
-    async def explain_import(self, imp: Import) -> str:
-        """Explain what an import does"""
-        logger.info(f"Explaining import: {imp.module}")
-        
-        prompt = f"""Explain this Python import in 2-3 sentences.
-
-Module: {imp.module}
-Imports: {', '.join(imp.names)}
-
-What does this module provide and why use these specific imports?"""
-
-        try:
-            return await self._call_ollama(prompt, timeout=self.short_timeout)
-        except Exception as e:
-            logger.warning(f"Import explanation failed for {imp.module}: {e}")
-            return f"{imp.module} provides {', '.join(imp.names)}. This module is used for its functionality."
-    
     async def generate_suggestions(self, code: str, errors: List) -> List[Suggestion]:
         """Generate improvement suggestions"""
         logger.info("Generating code improvement suggestions")
@@ -299,22 +469,23 @@ What does this module provide and why use these specific imports?"""
 Code length: {len(code)} chars
 Issues found: {len(errors)}
 
-Format each as:
-CATEGORY: [Performance/Security/Best Practice]
-TITLE: Short title
-DESCRIPTION: One sentence
-PRIORITY: High/Medium/Low
----"""
+Respond with JSON only:
+{{"suggestions": [{{"category": "Performance, Security or Best Practice", "title": "Short title", "description": "One sentence", "priority": "High, Medium or Low"}}]}}"""
 
         try:
-            result = await self._call_ollama(prompt, timeout=self.long_timeout)
-            suggestions = self._parse_suggestions(result)
-            if suggestions:
-                return suggestions
+            suggestions = await self._call_structured(
+                prompt,
+                prompt_type="suggestions",
+                model=self.model_for("suggestions"),
+                parse=self.structured.suggestions
+            )
+            logger.info(f"Parsed {len(suggestions)} suggestions")
+            return suggestions
         except Exception as e:
             logger.warning(f"Suggestion generation failed: {e}")
         
         # Return default suggestions if AI fails
+        self._record_fallback("suggestions")
         return self._generate_default_suggestions(errors)
     
     def _generate_default_suggestions(self, errors: List) -> List[Suggestion]:
@@ -344,63 +515,331 @@ PRIORITY: High/Medium/Low
         
         return suggestions
     
-    def _parse_suggestions(self, text: str) -> List[Suggestion]:
-        """Parse AI suggestions into structured format"""
-        logger.debug("Parsing AI suggestions")
-        suggestions = []
+    def timeout_for(self, prompt_type: str, model: str, items: int = 1) -> float:
+        """Timeout derived from recent latencies for this prompt type and model, scaled to the batch size"""
+        default = self.timeouts[TIMEOUT_CLASSES.get(prompt_type, "medium")]
+        return self.latency.timeout_for(prompt_type, model, default, items)
+    
+    def num_predict_for(self, prompt_type: str, items: int = 1) -> Optional[int]:
+        """Output token cap for a prompt type (scaled by item count for batches)"""
+        cap = self.settings.OLLAMA_NUM_PREDICT.get(prompt_type)
+        return cap * max(1, items) if cap else None
+    
+    def _options_for(self, prompt_type: str, num_predict: Optional[int]) -> Dict[str, Any]:
+        """Ollama generation options for a call"""
+        num_predict = num_predict or self.num_predict_for(prompt_type)
+        return {"num_predict": num_predict} if num_predict else {}
+    
+    def _call_cost(self, prompt: str) -> float:
+        """Fair-queueing cost of a call, in units of a ~512-token prompt"""
+        return 1.0 + estimate_tokens(prompt) / 512
+    
+    def _cache_key(self, model: str, prompt: str, options: Dict[str, Any], response_format: Optional[Any] = None) -> str:
+        """Cache key; generation options and output format change the reply so they are part of it.
         
-        parts = text.split('---')
-        for part in parts:
-            if not part.strip():
-                continue
-            
-            lines = part.strip().split('\n')
-            category = priority = title = description = ""
-            
-            for line in lines:
-                if line.startswith('CATEGORY:'):
-                    category = line.replace('CATEGORY:', '').strip()
-                elif line.startswith('TITLE:'):
-                    title = line.replace('TITLE:', '').strip()
-                elif line.startswith('PRIORITY:'):
-                    priority = line.replace('PRIORITY:', '').strip()
-                elif line.startswith('DESCRIPTION:'):
-                    description = line.replace('DESCRIPTION:', '').strip()
-                elif description and not line.startswith(('CATEGORY', 'TITLE', 'PRIORITY')):
-                    description += ' ' + line.strip()
-            
-            if title and description:
-                suggestions.append(Suggestion(
-                    category=category or "General",
-                    title=title,
-                    description=description,
-                    priority=priority or "Medium"
-                ))
-        
-        logger.info(f"Parsed {len(suggestions)} suggestions")
-        return suggestions
+        The shared file prefix is not: its outline carries line numbers, so
+        keying on it would invalidate every symbol of a file on any edit that
+        shifts lines, and identical symbols in different files could never
+        share an entry or an in-flight call.
+        """
+        variant = f"{PROMPT_TEMPLATE_VERSION}:{json.dumps(options, sort_keys=True)}"
+        if response_format is not None:
+            variant += f":{json.dumps(response_format, sort_keys=True)}"
+        return self.cache.make_key(model, variant, prompt)
     
-    async def _call_ollama(self, prompt: str, timeout: float = 60.0) -> str:
-        """Call Ollama API with configurable timeout"""
-        logger.debug(f"Calling Ollama with prompt length: {len(prompt)}, timeout: {timeout}s")
+    async def _call_structured(
+        self,
+        prompt: str,
+        prompt_type: str,
+        model: str,
+        parse: Callable[[str, bool], T],
+        num_predict: Optional[int] = None,
+        items: int = 1
+    ) -> T:
+        """JSON-mode call validated by ``parse``.
         
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
+        A malformed reply first goes through the local repair in ``parse``;
+        if that fails, a short repair prompt on the fast model rewrites the
+        reply instead of regenerating it. A repaired reply replaces the
+        malformed one in the cache, so later identical calls parse straight
+        away; if the repair fails too, both replies are evicted.
+        """
+        response_format = response_format_for(prompt_type)
+        response = await self._call_ollama_with_limit(
+            prompt,
+            prompt_type=prompt_type,
+            model=model,
+            num_predict=num_predict,
+            response_format=response_format,
+            items=items
+        )
+        try:
+            return parse(response, False)
+        except StructuredOutputError as e:
+            logger.warning(f"Malformed {prompt_type} reply ({e}), asking the model to repair it")
+        cache_key = self._cache_key(model, prompt, self._options_for(prompt_type, num_predict), response_format)
+        
+        repair_prompt = f"""Rewrite the reply below as valid JSON matching this schema. Keep its content, fix only the syntax and structure, and output nothing but the JSON.
+
+SCHEMA:
+{json.dumps(SCHEMAS[prompt_type])}
+
+REPLY:
+{response}"""
+        repair_model = self.model_for("json_repair")
+        repair_predict = estimate_tokens(response) + 128
+        repaired = await self._call_ollama_with_limit(
+            repair_prompt,
+            prompt_type="json_repair",
+            model=repair_model,
+            num_predict=repair_predict,
+            response_format=response_format,
+            items=items
+        )
+        try:
+            result = parse(repaired, True)
+        except StructuredOutputError:
+            self.structured.record(prompt_type, "failed")
+            await self.cache.delete(cache_key)
+            await self.cache.delete(self._cache_key(
+                repair_model, repair_prompt, self._options_for("json_repair", repair_predict), response_format
+            ))
+            raise
+        await self.cache.set(cache_key, repaired)
+        return result
+    
+    async def _call_ollama_with_limit(
+        self,
+        prompt: str,
+        prompt_type: str = "generic",
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        num_predict: Optional[int] = None,
+        response_format: Optional[Any] = None,
+        items: int = 1
+    ) -> str:
+        """Call Ollama once a parallelism slot is free"""
+        return await self._call_ollama(
+            prompt,
+            prompt_type=prompt_type,
+            model=model,
+            timeout=timeout,
+            num_predict=num_predict,
+            semaphore=self._semaphore,
+            response_format=response_format,
+            items=items
+        )
+    
+    async def _call_ollama(
+        self,
+        prompt: str,
+        prompt_type: str = "generic",
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        num_predict: Optional[int] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        response_format: Optional[Any] = None,
+        items: int = 1
+    ) -> str:
+        """Call Ollama, serving repeated prompts from the response cache; items sizes the adaptive timeout"""
+        model = model or self.model
+        options = self._options_for(prompt_type, num_predict)
+        cache_key = self._cache_key(model, prompt, options, response_format)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit for prompt length: {len(prompt)}")
+            return cached
+        
+        async def generate() -> str:
+            # Cache hits never wait for a parallelism slot. The per-analysis
+            # semaphore bounds fan-out; the scheduler orders calls globally
+            async with (semaphore or nullcontext()):
+                async with self.scheduler.slot(prompt_type, self.client_id, self._call_cost(prompt)):
+                    # Re-checked after queueing: the circuit may have opened meanwhile
+                    with self.breaker.guard():
+                        response = await self._post_generate(
+                            prompt,
+                            timeout or self.timeout_for(prompt_type, model, items),
+                            model,
+                            prompt_type,
+                            options,
+                            response_format,
+                            items
+                        )
+            await self.cache.set(cache_key, response)
+            return response
+        
+        # Identical prompts already in flight (from any request) share one call
+        return await self.breaker.run_unless_open(self.singleflight.do(cache_key, generate))
+    
+    async def stream_ollama(
+        self,
+        prompt: str,
+        prompt_type: str = "generic",
+        model: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Yield response tokens as Ollama produces them.
+        
+        A cached response is yielded as a single chunk; a freshly streamed one
+        is written to the cache once the stream completes.
+        """
+        model = model or self.model
+        options = self._options_for(prompt_type, None)
+        cache_key = self._cache_key(model, prompt, options)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        timeout = timeout or self.timeout_for(prompt_type, model)
+        logger.debug(f"Streaming from Ollama ({model}) with prompt length: {len(prompt)}, timeout: {timeout}s")
+        
+        chunks = []
+        async with self._semaphore:
+            async with self.scheduler.slot(prompt_type, self.client_id, self._call_cost(prompt)):
+                with self.breaker.guard(), self.backends.lease(model) as backend:
+                    client = self.http_pool.client(backend.url)
+                    payload = await self._build_payload(prompt, model, prompt_type, options, stream=True)
+                    started = time.monotonic()
+                    try:
+                        async with client.stream(
+                            "POST",
+                            "/api/generate",
+                            json=payload,
+                            timeout=httpx.Timeout(timeout, connect=self.settings.OLLAMA_CONNECT_TIMEOUT)
+                        ) as response:
+                            response.raise_for_status()
+                            async for line in response.aiter_lines():
+                                if not line.strip():
+                                    continue
+                                chunk = json.loads(line)
+                                if chunk.get("error"):
+                                    raise Exception(chunk["error"])
+                                token = chunk.get("response", "")
+                                if token:
+                                    chunks.append(token)
+                                    yield token
+                                if chunk.get("done"):
+                                    self.usage.record(prompt_type, model, chunk)
+                                    break
+                    except httpx.TimeoutException as e:
+                        self.latency.record_timeout(prompt_type, model, timeout)
+                        logger.error(f"Ollama stream timeout after {timeout}s on {backend.url}: {str(e)}")
+                        raise Exception(f"AI generation timed out after {timeout}s") from e
+                    except Exception as e:
+                        logger.error(f"Ollama stream failed on {backend.url}: {str(e)}")
+                        raise Exception(f"AI generation failed: {str(e)}") from e
+                    self.latency.record(prompt_type, model, time.monotonic() - started)
+        
+        await self.cache.set(cache_key, "".join(chunks))
+    
+    def _uses_prefix(self, prompt_type: str) -> bool:
+        return (
+            self.file_context is not None
+            and self.prefix_mode != "off"
+            and prompt_type in PREFIX_PROMPT_TYPES
+        )
+    
+    async def _build_payload(
+        self,
+        prompt: str,
+        model: str,
+        prompt_type: str,
+        options: Dict[str, Any],
+        stream: bool,
+        response_format: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """Generate request body, attaching the shared file prefix when it applies"""
+        payload: Dict[str, Any] = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": keep_alive_for(model),
+            "options": options
+        }
+        if response_format is not None:
+            payload["format"] = response_format
+        if not self._uses_prefix(prompt_type):
+            return payload
+        
+        if self.prefix_mode == "context":
+            context = await self.file_context.context_for(model, self._prime_prefix)
+            if context:
+                payload["context"] = context
+                return payload
+        
+        payload["system"] = self.file_context.text
+        return payload
+    
+    async def _prime_prefix(self, model: str, prefix: str) -> Optional[List[int]]:
+        """Evaluate the file prefix once and return Ollama's context tokens for it"""
+        try:
+            with self.backends.lease(model) as backend:
+                response = await self.http_pool.client(backend.url).post(
+                    "/api/generate",
                     json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False
-                    }
+                        "model": model,
+                        "prompt": f"{prefix}\n\nReply with OK.",
+                        "stream": False,
+                        "keep_alive": keep_alive_for(model),
+                        "options": {"num_predict": 1}
+                    },
+                    timeout=httpx.Timeout(self.timeouts["medium"], connect=self.settings.OLLAMA_CONNECT_TIMEOUT)
                 )
                 response.raise_for_status()
                 result = response.json()
-                logger.debug("Ollama API call successful")
-                return result.get("response", "")
-            except httpx.TimeoutException as e:
-                logger.error(f"Ollama API timeout after {timeout}s: {str(e)}")
-                raise Exception(f"AI generation timed out after {timeout}s")
-            except Exception as e:
-                logger.error(f"Ollama API call failed: {str(e)}")
-                raise Exception(f"AI generation failed: {str(e)}")
\ No newline at end of file
+            self.usage.record("prefix", model, result)
+            logger.debug(f"Primed file prefix for {model}: {result.get('prompt_eval_count', 0)} tokens")
+            return result.get("context") or None
+        except Exception as e:
+            logger.warning(f"Prefix priming failed for {model}: {e}")
+            return None
+    
+    async def _post_to_backend(self, payload: Dict[str, Any], model: str, timeout: float) -> Dict[str, Any]:
+        """POST a generate request to the least-loaded backend, failing over on connect errors"""
+        attempts = max(1, len(self.backends.backends_for(model)))
+        for attempt in range(attempts):
+            try:
+                with self.backends.lease(model) as backend:
+                    response = await self.http_pool.client(backend.url).post(
+                        "/api/generate",
+                        json=payload,
+                        timeout=httpx.Timeout(timeout, connect=self.settings.OLLAMA_CONNECT_TIMEOUT)
+                    )
+                    response.raise_for_status()
+                    return response.json()
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                # The request never reached the server, so another backend can take it
+                if attempt + 1 >= attempts:
+                    raise
+                logger.warning(f"Ollama backend {backend.url} unreachable ({e}), trying another backend")
+    
+    async def _post_generate(
+        self,
+        prompt: str,
+        timeout: float,
+        model: str,
+        prompt_type: str = "generic",
+        options: Optional[Dict[str, Any]] = None,
+        response_format: Optional[Any] = None,
+        items: int = 1
+    ) -> str:
+        """Send a single non-streaming generate request to Ollama"""
+        logger.debug(f"Calling Ollama ({model}) with prompt length: {len(prompt)}, timeout: {timeout:.1f}s")
+        
+        payload = await self._build_payload(prompt, model, prompt_type, options or {}, stream=False, response_format=response_format)
+        started = time.monotonic()
+        try:
+            result = await self._post_to_backend(payload, model, timeout)
+            self.latency.record(prompt_type, model, time.monotonic() - started, items)
+            self.usage.record(prompt_type, model, result)
+            logger.debug("Ollama API call successful")
+            return result.get("response", "")
+        except httpx.TimeoutException as e:
+            self.latency.record_timeout(prompt_type, model, timeout, items)
+            logger.error(f"Ollama API timeout after {timeout}s: {str(e)}")
+            raise Exception(f"AI generation timed out after {timeout}s") from e
+        except Exception as e:
+            logger.error(f"Ollama API call failed: {str(e)}")
+            raise Exception(f"AI generation failed: {str(e)}") from e
\ No newline at end of file
@@ -2,99 +2,528 @@
 # BACKEND - backend/app/services/analyzer.py
 # ==========================================
 import ast
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 from .parser import CodeParser
 from .error import ErrorDetector
 from .diagram import DiagramGenerator
-from .ai import AIService
-from ..models.schemas import CodeAnalysisResponse
+from .ai import AIService, PROMPT_TEMPLATE_VERSION
+from .prefix import FilePromptContext
+from .heuristics import TrivialSymbolClassifier
+from .fingerprint import ExplanationStore, rewrite_names
+from .dag import Stage, StageGraph
+from .incremental import IncrementalPlan
+from ..config import get_settings
+from ..models.schemas import CodeAnalysisResponse, Function, Class
 from ..utils.logger import setup_logger
+from ..utils.source import SourceIndex
+from ..utils.tokens import estimate_tokens
 
 logger = setup_logger(__name__)
 
+# Pipeline stages reported through the progress callback; independent ones run concurrently
+ANALYSIS_STAGES = (
+    "parse", "static_checks", "diagrams", "overview", "detailed_overview", "imports", "explanations", "suggestions"
+)
+
+# progress(event, payload): event is a stage from ANALYSIS_STAGES (payload holds
+# the results it produced) or "explanation" when one function/class is explained
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
 class CodeAnalyzer:
-    def __init__(self):
+    def __init__(self, client_id: str = "anonymous"):
         logger.info("Initializing CodeAnalyzer")
-        self.ai_service = AIService()
+        self.ai_service = AIService(client_id=client_id)
+        self.classifier = TrivialSymbolClassifier()
+        models = ",".join(sorted(set(self.ai_service.models.values())))
+        self.explanations = ExplanationStore(f"{PROMPT_TEMPLATE_VERSION}:{models}")
     
-    async def analyze(self, code: str, filename: str) -> CodeAnalysisResponse:
-        """Main analysis pipeline"""
+    async def analyze(
+        self,
+        code: str,
+        filename: str,
+        progress: Optional[ProgressCallback] = None,
+        previous: Optional[Dict[str, Any]] = None
+    ) -> CodeAnalysisResponse:
+        """Main analysis pipeline; progress, if given, hears each finished stage and explanation.
+        
+        Stages form a dependency graph (see _build_graph): static work runs in
+        the CPU thread pool while independent LLM calls overlap on the loop.
+        previous is a stored analysis of an earlier revision of the file:
+        unchanged symbols keep its explanations and, below the structural
+        change threshold, its overviews.
+        """
         logger.info(f"Starting analysis for file: {filename}")
+        report = progress or (lambda event, payload: None)
         
-        # Parse code
-        parser = CodeParser(code)
-        tree = parser.parse()
+        def stage_done(name: str, result: Any):
+            # Keys starting with "_" are internal hand-offs between stages
+            if name in ANALYSIS_STAGES:
+                report(name, {key: value for key, value in result.items() if not key.startswith("_")})
         
-        # Extract structure
-        imports = parser.extract_imports()
-        variables = parser.extract_variables()
-        functions = parser.extract_functions()
-        classes = parser.extract_classes()
+        graph = self._build_graph(code, filename, report, previous, on_done=stage_done)
+        results = await graph.run()
+        pipeline_stats = graph.timings()
+        logger.info(
+            f"Analysis complete in {pipeline_stats['wall_ms']} ms; "
+            f"critical path {' -> '.join(pipeline_stats['critical_path'])} ({pipeline_stats['critical_path_ms']} ms)"
+        )
+        
+        parsed = results["parse"]
+        explained = results["explanations"]
+        stats = {
+            "heuristics": results["prepare"]["_heuristics"],
+            "fingerprints": explained["_fingerprints"],
+            "pipeline": pipeline_stats,
+            # Any structural fallback makes the result unfit for the analysis cache
+            "fallbacks": dict(self.ai_service.fallbacks),
+            "degraded": bool(self.ai_service.fallbacks)
+        }
+        if self.ai_service.fallbacks:
+            logger.warning(f"Analysis of {filename} used fallbacks: {self.ai_service.fallbacks}")
+        plan = results["diff"]["_plan"]
+        if plan is not None:
+            stats["incremental"] = plan.stats(
+                overview_regenerated=results["overview"]["_regenerated"] or results["detailed_overview"]["_regenerated"]
+            )
+        return CodeAnalysisResponse(
+            overview=results["overview"]["overview"],
+            detailed_overview=results["detailed_overview"]["detailed_overview"],
+            variables=parsed["variables"],
+            functions=parsed["functions"],
+            classes=parsed["classes"],
+            imports=results["imports"]["imports"],
+            errors=results["static_checks"]["errors"],
+            suggestions=results["suggestions"]["suggestions"],
+            diagrams=results["diagrams"]["diagrams"],
+            markdown_content="",
+            pdf_content=None,
+            file_id="",
+            stats=stats
+        )
+    
+    def _build_graph(
+        self,
+        code: str,
+        filename: str,
+        report: ProgressCallback,
+        previous: Optional[Dict[str, Any]] = None,
+        on_done: Optional[Callable[[str, Any], None]] = None
+    ) -> StageGraph:
+        """The analysis as a stage graph; each stage returns a dict of its results"""
+        
+        def parse() -> Dict[str, Any]:
+            parser = CodeParser(code)
+            tree = parser.parse()
+            imports = parser.extract_imports()
+            variables = parser.extract_variables()
+            functions = parser.extract_functions()
+            classes = parser.extract_classes()
+            self.ai_service.set_file_context(FilePromptContext.build(filename, functions, classes, imports))
+            return {
+                "variables": variables,
+                "functions": functions,
+                "classes": classes,
+                "imports": imports,
+                "_tree": tree
+            }
         
-        # Detect errors
-        error_detector = ErrorDetector(code)
-        errors = error_detector.detect_errors()
+        def static_checks() -> Dict[str, Any]:
+            return {"errors": ErrorDetector(code).detect_errors()}
         
-        # Generate diagrams
-        diagrams = {}
-        if tree:
-            diagram_gen = DiagramGenerator(code, tree)
-            diagrams = diagram_gen.generate_all_diagrams()
+        def diagrams(parse: Dict[str, Any]) -> Dict[str, Any]:
+            tree = parse["_tree"]
+            return {"diagrams": DiagramGenerator(code, tree).generate_all_diagrams() if tree else {}}
         
-        # AI explanations
+        def structure_info(parsed: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                "functions": parsed["functions"],
+                "classes": parsed["classes"],
+                "imports": parsed["imports"]
+            }
+        
+        def diff(parse: Dict[str, Any]) -> Dict[str, Any]:
+            # One line index per analysis; every symbol's snippet is sliced from it
+            source = self._source_index(code)
+            plan = None
+            if previous is not None:
+                plan = IncrementalPlan(previous, source, parse["functions"], parse["classes"], parse["imports"])
+                logger.info(
+                    f"Incremental analysis against {plan.previous_id}: {plan.counts}, "
+                    f"structural change {plan.structural_change}"
+                )
+            return {"_source": source, "_plan": plan}
+        
+        def keep_overview(plan: Optional[IncrementalPlan], section: str) -> bool:
+            # A fallback overview is worth another try, like a fallback explanation
+            return (
+                plan is not None
+                and plan.reusable(section)
+                and plan.structural_change < get_settings().INCREMENTAL_OVERVIEW_THRESHOLD
+            )
+        
+        async def overview(parse: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
+            plan = diff["_plan"]
+            if keep_overview(plan, "overview"):
+                return {"overview": plan.previous_result["overview"], "_regenerated": False}
+            return {"overview": await self.ai_service.generate_overview(code, structure_info(parse)), "_regenerated": True}
+        
+        async def detailed_overview(parse: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
+            plan = diff["_plan"]
+            if keep_overview(plan, "detailed_overview"):
+                return {"detailed_overview": plan.previous_result["detailed_overview"], "_regenerated": False}
+            return {
+                "detailed_overview": await self.ai_service.generate_detailed_overview(code, structure_info(parse)),
+                "_regenerated": True
+            }
+        
+        async def imports(parse: Dict[str, Any]) -> Dict[str, Any]:
+            # Purposes are filled in place
+            await self.ai_service.explain_imports(parse["imports"])
+            return {"imports": parse["imports"]}
+        
+        async def prepare(parse: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
+            source = diff["_source"]
+            # Symbols unchanged since the previous revision keep their explanation
+            functions = self._carry_over("function", parse["functions"], diff["_plan"], report)
+            classes = self._carry_over("class", parse["classes"], diff["_plan"], report)
+            
+            # Trivial symbols get a template explanation and skip the LLM entirely
+            llm_functions, llm_classes, heuristic_stats = self._apply_heuristics(source, functions, classes)
+            for kind, symbols in (("function", functions), ("class", classes)):
+                for symbol in symbols:
+                    if symbol.explanation_source == "heuristic":
+                        report("explanation", self._explanation_event(kind, symbol))
+            
+            # Structurally identical symbols share one explanation, from this file or the cache
+            function_groups, unique_functions = await self._reuse_explanations("function", llm_functions)
+            class_groups, unique_classes = await self._reuse_explanations("class", llm_classes)
+            return {
+                "_source": source,
+                "_heuristics": heuristic_stats,
+                "_llm_functions": llm_functions,
+                "_groups": (function_groups, class_groups),
+                "_unique": (unique_functions, unique_classes)
+            }
+        
+        async def explanations(parse: Dict[str, Any], prepare: Dict[str, Any]) -> Dict[str, Any]:
+            source = prepare["_source"]
+            function_groups, class_groups = prepare["_groups"]
+            unique_functions, unique_classes = prepare["_unique"]
+            
+            def function_done(idx: int, explanation: str):
+                unique_functions[idx].logic_explanation = explanation
+                report("explanation", self._explanation_event("function", unique_functions[idx]))
+            
+            async def explain_class(cls: Class):
+                cls.detailed_explanation = await self.ai_service.explain_class(cls, self._extract_class_code(source, cls))
+                report("explanation", self._explanation_event("class", cls))
+            
+            # AIService bounds the number of in-flight prompts; explanations are
+            # filled in place as each one finishes
+            await asyncio.gather(
+                self.ai_service.explain_functions_batch(
+                    [(func, self._extract_function_code(source, func)) for func in unique_functions],
+                    on_result=function_done
+                ),
+                *[explain_class(cls) for cls in unique_classes]
+            )
+            
+            await self._share_explanations("function", function_groups)
+            await self._share_explanations("class", class_groups)
+            for kind, groups in (("function", function_groups), ("class", class_groups)):
+                for group in groups:
+                    # Representatives explained by the LLM were reported as they finished
+                    copies = group["members"] if group["from_cache"] else group["members"][1:]
+                    for member in copies:
+                        report("explanation", self._explanation_event(kind, member))
+            return {
+                "functions": parse["functions"],
+                "classes": parse["classes"],
+                "_fingerprints": self._reuse_stats(
+                    source, function_groups, class_groups, prepare["_llm_functions"], unique_functions
+                )
+            }
+        
+        async def suggestions(static_checks: Dict[str, Any]) -> Dict[str, Any]:
+            return {"suggestions": await self.ai_service.generate_suggestions(code, static_checks["errors"])}
+        
+        return StageGraph([
+            Stage("parse", parse, cpu=True),
+            Stage("static_checks", static_checks, cpu=True),
+            Stage("diagrams", diagrams, deps=["parse"], cpu=True),
+            Stage("diff", diff, deps=["parse"]),
+            Stage("overview", overview, deps=["parse", "diff"]),
+            Stage("detailed_overview", detailed_overview, deps=["parse", "diff"]),
+            Stage("imports", imports, deps=["parse"]),
+            Stage("prepare", prepare, deps=["parse", "diff"]),
+            Stage("explanations", explanations, deps=["parse", "prepare"]),
+            Stage("suggestions", suggestions, deps=["static_checks"])
+        ], on_done=on_done)
+    
+    def _carry_over(
+        self,
+        kind: str,
+        symbols: List[Union[Function, Class]],
+        plan: Optional[IncrementalPlan],
+        report: ProgressCallback
+    ) -> List[Union[Function, Class]]:
+        """Fill unchanged symbols from the previous analysis; returns the ones still to explain"""
+        if plan is None:
+            return symbols
+        fallback: Callable = (
+            self.ai_service._generate_fallback_function_explanation if kind == "function"
+            else self.ai_service._generate_fallback_class_explanation
+        )
+        remaining = []
+        for symbol in symbols:
+            entry = plan.carried_over(symbol)
+            # A timeout fallback is worth another try rather than carrying over
+            if entry is None or entry["explanation"] == fallback(symbol):
+                remaining.append(symbol)
+                continue
+            self._set_explanation(kind, symbol, entry["explanation"])
+            symbol.explanation_source = entry["source"]
+            symbol.carried_over = True
+            report("explanation", self._explanation_event(kind, symbol))
+        return remaining
+    
+    def _apply_heuristics(self, source: SourceIndex, functions: List[Function], classes: List[Class]):
+        """Explain trivial symbols from templates; returns (llm_functions, llm_classes, stats)"""
+        by_kind: Dict[str, int] = {}
+        llm_functions = []
+        for func in functions:
+            result = self.classifier.classify_function(func)
+            if result is None:
+                llm_functions.append(func)
+                continue
+            kind, func.logic_explanation = result
+            func.explanation_source = "heuristic"
+            by_kind[f"function:{kind}"] = by_kind.get(f"function:{kind}", 0) + 1
+        
+        llm_classes = []
+        for cls in classes:
+            result = self.classifier.classify_class(cls)
+            if result is None:
+                llm_classes.append(cls)
+                continue
+            kind, cls.detailed_explanation = result
+            cls.explanation_source = "heuristic"
+            by_kind[f"class:{kind}"] = by_kind.get(f"class:{kind}", 0) + 1
+        
+        # Functions are batched, so count the prompts the batcher would have sent
+        calls_before = self._function_prompt_count(source, functions) + len(classes)
+        calls_after = self._function_prompt_count(source, llm_functions) + len(llm_classes)
+        stats = {
+            "functions": len(functions) - len(llm_functions),
+            "classes": len(classes) - len(llm_classes),
+            "by_kind": by_kind,
+            "llm_calls_saved": calls_before - calls_after
+        }
+        if by_kind:
+            logger.info(
+                f"Heuristic fast path explained {stats['functions']} function(s) and {stats['classes']} class(es), "
+                f"saving {stats['llm_calls_saved']} LLM call(s)"
+            )
+        return llm_functions, llm_classes, stats
+    
+    async def _reuse_explanations(self, kind: str, symbols: List[Union[Function, Class]]) -> Tuple[List[Dict[str, Any]], List[Any]]:
+        """Group symbols by fingerprint and fill groups already explained in the cache.
+        
+        Returns (groups, representatives still needing the LLM); each group
+        is {"members", "from_cache"} with the representative first.
+        """
+        groups: Dict[Any, Dict[str, Any]] = {}
+        for symbol in symbols:
+            key = symbol.fingerprint or id(symbol)
+            groups.setdefault(key, {"members": [], "from_cache": False})["members"].append(symbol)
+        
+        pending = []
+        for group in groups.values():
+            representative = group["members"][0]
+            cached = await self.explanations.get(kind, representative.fingerprint) if representative.fingerprint else None
+            if cached is None:
+                pending.append(representative)
+                continue
+            text, names = cached
+            group["from_cache"] = True
+            for member in group["members"]:
+                self._set_explanation(kind, member, rewrite_names(text, names, member.fingerprint_names))
+                member.explanation_source = "reused"
+        
+        return list(groups.values()), pending
+    
+    async def _share_explanations(self, kind: str, groups: List[Dict[str, Any]]):
+        """Store fresh LLM explanations by fingerprint and copy them to identical symbols"""
+        fallback: Callable = (
+            self.ai_service._generate_fallback_function_explanation if kind == "function"
+            else self.ai_service._generate_fallback_class_explanation
+        )
+        for group in groups:
+            if group["from_cache"]:
+                continue
+            representative, *copies = group["members"]
+            text = self._get_explanation(kind, representative)
+            # Never persist or copy a timeout fallback; copies get their own
+            if text == fallback(representative):
+                for member in copies:
+                    self._set_explanation(kind, member, fallback(member))
+                continue
+            if representative.fingerprint:
+                await self.explanations.set(kind, representative.fingerprint, text, representative.fingerprint_names)
+            for member in copies:
+                self._set_explanation(kind, member, rewrite_names(text, representative.fingerprint_names, member.fingerprint_names))
+                member.explanation_source = "reused"
+    
+    def _reuse_stats(
+        self,
+        source: SourceIndex,
+        function_groups: List[Dict[str, Any]],
+        class_groups: List[Dict[str, Any]],
+        llm_functions: List[Function],
+        unique_functions: List[Function]
+    ) -> Dict[str, Any]:
+        groups = function_groups + class_groups
+        from_cache = sum(len(group["members"]) for group in groups if group["from_cache"])
+        in_file = sum(len(group["members"]) - 1 for group in groups if not group["from_cache"])
+        calls_saved = (
+            self._function_prompt_count(source, llm_functions) - self._function_prompt_count(source, unique_functions)
+            + sum(len(group["members"]) for group in class_groups)
+            - sum(1 for group in class_groups if not group["from_cache"])
+        )
+        if from_cache or in_file:
+            logger.info(
+                f"Reused explanations for {in_file} identical symbol(s) in the file and {from_cache} from the cache, "
+                f"saving {calls_saved} LLM call(s)"
+            )
+        return {"reused_in_file": in_file, "reused_from_cache": from_cache, "llm_calls_saved": calls_saved}
+    
+    def _explanation_event(self, kind: str, symbol: Union[Function, Class]) -> Dict[str, Any]:
+        return {
+            "kind": kind,
+            "name": symbol.name,
+            "line_number": symbol.line_number,
+            "explanation": self._get_explanation(kind, symbol),
+            "source": symbol.explanation_source,
+            "carried_over": symbol.carried_over
+        }
+    
+    def _get_explanation(self, kind: str, symbol: Union[Function, Class]) -> str:
+        return symbol.logic_explanation if kind == "function" else symbol.detailed_explanation
+    
+    def _set_explanation(self, kind: str, symbol: Union[Function, Class], text: str):
+        if kind == "function":
+            symbol.logic_explanation = text
+        else:
+            symbol.detailed_explanation = text
+    
+    def _function_prompt_count(self, source: SourceIndex, functions: List[Function]) -> int:
+        if not functions:
+            return 0
+        snippets = [self._extract_function_code(source, func) for func in functions]
+        return len(self.ai_service._pack_batches([estimate_tokens(snippet) for snippet in snippets]))
+    
+    async def stream_explanations(self, code: str, filename: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream overview, function and class explanations token by token.
+        
+        Sections run concurrently (bounded by AIService), so events from
+        different sections interleave; every event carries its section tag.
+        """
+        logger.info(f"Starting streamed explanation for file: {filename}")
+        
+        parser = CodeParser(code)
+        parser.parse()
+        imports = parser.extract_imports()
+        functions = parser.extract_functions()
+        classes = parser.extract_classes()
+        self.ai_service.set_file_context(FilePromptContext.build(filename, functions, classes, imports))
+        source = self._source_index(code)
         structure_info = {
             "functions": functions,
             "classes": classes,
             "imports": imports
         }
         
-        logger.info("Generating AI explanations")
-        overview = await self.ai_service.generate_overview(code, structure_info)
-        detailed_overview = await self.ai_service.generate_detailed_overview(code, structure_info)
-        
-        # Explain functions
+        sections = [(
+            "overview",
+            self.ai_service._build_overview_prompt(code, structure_info),
+            "overview",
+            self.ai_service.model_for("overview"),
+            lambda: self.ai_service._generate_fallback_overview(code, structure_info)
+        )]
         for func in functions:
-            func_code = self._extract_function_code(code, func.line_number)
-            func.logic_explanation = await self.ai_service.explain_function(func, func_code)
-        
-        # Explain classes
+            heuristic = self.classifier.classify_function(func)
+            if heuristic is not None:
+                sections.append((f"function:{func.name}", None, "function", None, lambda text=heuristic[1]: text))
+                continue
+            snippet = self._extract_function_code(source, func)
+            sections.append((
+                f"function:{func.name}",
+                self.ai_service._build_function_prompt(func, snippet),
+                "function",
+                self.ai_service.model_for("function", snippet),
+                lambda func=func: self.ai_service._generate_fallback_function_explanation(func)
+            ))
         for cls in classes:
-            class_code = self._extract_class_code(code, cls.line_number)
-            cls.detailed_explanation = await self.ai_service.explain_class(cls, class_code)
+            heuristic = self.classifier.classify_class(cls)
+            if heuristic is not None:
+                sections.append((f"class:{cls.name}", None, "class", None, lambda text=heuristic[1]: text))
+                continue
+            snippet = self._extract_class_code(source, cls)
+            sections.append((
+                f"class:{cls.name}",
+                self.ai_service._build_class_prompt(cls, snippet),
+                "class",
+                self.ai_service.model_for("class", snippet),
+                lambda cls=cls: self.ai_service._generate_fallback_class_explanation(cls)
+            ))
         
-        # Explain imports
-        for imp in imports:
-            imp.purpose = await self.ai_service.explain_import(imp)
+        queue: asyncio.Queue = asyncio.Queue()
         
-        # Generate suggestions
-        suggestions = await self.ai_service.generate_suggestions(code, errors)
+        async def produce(section: str, prompt: Optional[str], prompt_type: str, model: Optional[str], fallback):
+            await queue.put({"event": "section_start", "section": section})
+            if prompt is None:
+                # Heuristic section: the "fallback" is the finished template explanation
+                await queue.put({"event": "token", "section": section, "token": fallback()})
+                await queue.put({"event": "section_end", "section": section, "fallback": False, "source": "heuristic"})
+                return
+            try:
+                async for token in self.ai_service.stream_ollama(prompt, prompt_type=prompt_type, model=model):
+                    await queue.put({"event": "token", "section": section, "token": token})
+                await queue.put({"event": "section_end", "section": section, "fallback": False, "source": "llm"})
+            except Exception as e:
+                logger.warning(f"Streaming failed for {section}: {e}")
+                await queue.put({"event": "token", "section": section, "token": fallback()})
+                await queue.put({"event": "section_end", "section": section, "fallback": True, "source": "fallback"})
         
-        logger.info("Analysis complete")
+        yield {"event": "sections", "sections": [section[0] for section in sections]}
         
-        return CodeAnalysisResponse(
-            overview=overview,
-            detailed_overview=detailed_overview,
-            variables=variables,
-            functions=functions,
-            classes=classes,
-            imports=imports,
-            errors=errors,
-            suggestions=suggestions,
-            diagrams=diagrams,
-            markdown_content="",
-            pdf_content=None,
-            file_id=""
-        )
+        tasks = [asyncio.create_task(produce(*section)) for section in sections]
+        done_marker = object()
+        waiter = asyncio.gather(*tasks)
+        waiter.add_done_callback(lambda _: queue.put_nowait(done_marker))
+        try:
+            while True:
+                event = await queue.get()
+                if event is done_marker:
+                    break
+                yield event
+        finally:
+            # Client went away or we finished: make sure no producer is left running
+            for task in tasks:
+                task.cancel()
+            waiter.cancel()
+        
+        yield {"event": "done"}
+    
+    def _source_index(self, code: str) -> SourceIndex:
+        return SourceIndex(code, max_tokens=get_settings().SNIPPET_MAX_TOKENS)
     
-    def _extract_function_code(self, code: str, start_line: int) -> str:
-        """Extract function code snippet"""
-        lines = code.split('\n')
-        # Get 10 lines starting from function definition
-        end_line = min(start_line + 9, len(lines))
-        return '\n'.join(lines[start_line-1:end_line])
+    def _extract_function_code(self, source: SourceIndex, func: Function) -> str:
+        """Extract function code snippet (the exact def, truncated to the token budget)"""
+        # Symbols built without an end line fall back to the old 10-line window
+        return source.snippet(func.line_number, func.end_line_number or func.line_number + 9)
     
-    def _extract_class_code(self, code: str, start_line: int) -> str:
-        """Extract class code snippet"""
-        lines = code.split('\n')
-        # Get 15 lines starting from class definition
-        end_line = min(start_line + 14, len(lines))
-        return '\n'.join(lines[start_line-1:end_line])
\ No newline at end of file
+    def _extract_class_code(self, source: SourceIndex, cls: Class) -> str:
+        """Extract class code snippet (the exact class, truncated to the token budget)"""
+        return source.snippet(cls.line_number, cls.end_line_number or cls.line_number + 14)
\ No newline at end of file
@@ -0,0 +1,205 @@
+# ==========================================
+# BACKEND - backend/app/service/backends.py
+# ==========================================
+import asyncio
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+import httpx
+from ..config import get_settings
+from .breaker import is_outage
+from .http_pool import get_http_pool
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class NoBackendAvailableError(Exception):
+    """Raised when no configured Ollama backend serves the requested model"""
+
+class OllamaBackend:
+    """One Ollama server in the pool and its live routing state"""
+
+    def __init__(self, url: str, weight: float = 1.0, models: Optional[List[str]] = None, parallel: int = 1):
+        self.url = url.rstrip('/')
+        self.weight = max(0.01, float(weight))
+        self.models = list(models or [])
+        self.parallel = max(1, int(parallel))
+        
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.ejections = 0
+
+    def serves(self, model: str) -> bool:
+        """An empty model list means the backend serves every model"""
+        return not self.models or model in self.models
+
+    def load(self) -> float:
+        return self.outstanding / self.weight
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "weight": self.weight,
+            "models": self.models or ["*"],
+            "parallel": self.parallel,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "consecutive_failures": self.consecutive_failures,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "ejections": self.ejections
+        }
+
+class BackendPool:
+    """Routes Ollama calls across several servers.
+
+    Each call goes to the healthy backend serving the model with the fewest
+    outstanding requests relative to its weight. A backend is ejected after
+    ``BACKEND_EJECT_AFTER_FAILURES`` consecutive outages (see ``is_outage``) and re-admitted once
+    a background ``/api/tags`` probe succeeds. If every backend for a model is
+    ejected, the least-failed one is still tried so the circuit breaker, not
+    the pool, decides when to fail fast.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.eject_after = max(1, self.settings.BACKEND_EJECT_AFTER_FAILURES)
+        self.probe_interval = self.settings.BACKEND_HEALTH_INTERVAL
+        self.backends: List[OllamaBackend] = self._load_backends()
+        
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _load_backends(self) -> List[OllamaBackend]:
+        default_parallel = self.settings.OLLAMA_SERVER_PARALLEL
+        if not self.settings.OLLAMA_BACKENDS:
+            return [OllamaBackend(self.settings.OLLAMA_BASE_URL, parallel=default_parallel)]
+        
+        backends = []
+        for entry in self.settings.OLLAMA_BACKENDS:
+            if isinstance(entry, str):
+                entry = {"url": entry}
+            backends.append(OllamaBackend(
+                entry["url"],
+                weight=entry.get("weight", 1.0),
+                models=entry.get("models"),
+                parallel=entry.get("parallel", default_parallel)
+            ))
+        logger.info(f"Ollama backend pool: {', '.join(backend.url for backend in backends)}")
+        return backends
+
+    @property
+    def capacity(self) -> int:
+        """Total concurrent calls the pool can serve"""
+        return sum(backend.parallel for backend in self.backends)
+
+    def backends_for(self, model: str) -> List[OllamaBackend]:
+        return [backend for backend in self.backends if backend.serves(model)]
+
+    def pick(self, model: str) -> OllamaBackend:
+        """Least outstanding requests per unit of weight among healthy backends"""
+        candidates = self.backends_for(model)
+        if not candidates:
+            raise NoBackendAvailableError(f"No Ollama backend is configured for model '{model}'")
+        
+        healthy = [backend for backend in candidates if backend.healthy]
+        if healthy:
+            return min(healthy, key=lambda backend: (backend.load(), backend.total_requests / backend.weight))
+        return min(candidates, key=lambda backend: (backend.consecutive_failures, backend.load()))
+
+    @contextmanager
+    def lease(self, model: str) -> Iterator[OllamaBackend]:
+        """Hold an outstanding-request slot on a backend and record the outcome.
+        
+        Only outages count against the backend: a 4xx or an unparseable
+        reply is about the request, and counting it would let one bad model
+        name eject every healthy server.
+        """
+        with self._lock:
+            backend = self.pick(model)
+            backend.outstanding += 1
+            backend.total_requests += 1
+        try:
+            yield backend
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except Exception as e:
+            if is_outage(e):
+                self.record_failure(backend)
+            raise
+        else:
+            self.record_success(backend)
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    def record_success(self, backend: OllamaBackend):
+        with self._lock:
+            backend.consecutive_failures = 0
+            if not backend.healthy:
+                backend.healthy = True
+                logger.info(f"Ollama backend {backend.url} re-admitted")
+
+    def record_failure(self, backend: OllamaBackend):
+        with self._lock:
+            backend.total_failures += 1
+            backend.consecutive_failures += 1
+            if backend.healthy and backend.consecutive_failures >= self.eject_after:
+                backend.healthy = False
+                backend.ejections += 1
+                logger.warning(
+                    f"Ollama backend {backend.url} ejected after "
+                    f"{backend.consecutive_failures} consecutive failures"
+                )
+
+    async def probe(self, backend: OllamaBackend) -> bool:
+        """Cheap liveness check against the backend's model list endpoint"""
+        client = get_http_pool().client(backend.url)
+        try:
+            response = await client.get(
+                "/api/tags",
+                timeout=httpx.Timeout(self.settings.OLLAMA_CONNECT_TIMEOUT, connect=self.settings.OLLAMA_CONNECT_TIMEOUT)
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.debug(f"Health probe failed for {backend.url}: {e}")
+            if is_outage(e):
+                self.record_failure(backend)
+                return False
+        # Any reply, even an error status below 500, means the server is up
+        self.record_success(backend)
+        return True
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await asyncio.gather(*(self.probe(backend) for backend in self.backends))
+
+    def start(self):
+        """Run health probes in the background (only useful with more than one backend)"""
+        if self._task is not None or self.probe_interval <= 0 or len(self.backends) < 2:
+            return
+        self._task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            backends = [backend.snapshot() for backend in self.backends]
+        return {
+            "healthy": sum(1 for backend in backends if backend["healthy"]),
+            "total": len(backends),
+            "capacity": self.capacity,
+            "backends": backends
+        }
+
+@lru_cache()
+def get_backend_pool() -> BackendPool:
+    return BackendPool()
\ No newline at end of file
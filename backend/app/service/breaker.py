@@ -0,0 +1,187 @@
+# ==========================================
+# BACKEND - backend/app/service/breaker.py
+# ==========================================
+import asyncio
+import httpx
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Awaitable, Dict, TypeVar
+from ..config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Ollama while the circuit is open"""
+
+def is_outage(error: BaseException) -> bool:
+    """Whether an error means Ollama itself is unhealthy: transport errors, timeouts or a 5xx reply.
+
+    4xx replies (an unknown model, a bad request) are deterministic and say
+    nothing about the server, so they must not open the circuit for every
+    other prompt. Wrapped errors are judged by their ``__cause__``.
+    """
+    while error is not None:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+            return True
+        error = error.__cause__
+    return False
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker shared by every Ollama call.
+    
+    After ``failure_threshold`` consecutive outages (see ``is_outage``; 4xx
+    replies do not count) the circuit opens and every call fails
+    immediately, so callers drop straight to their structural fallbacks. After ``recovery_timeout`` seconds a limited number
+    of trial calls are let through (half-open); one success closes the
+    circuit again, one failure re-opens it.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str = "ollama"):
+        settings = get_settings()
+        self.name = name
+        self.failure_threshold = max(1, settings.CIRCUIT_FAILURE_THRESHOLD)
+        self.recovery_timeout = settings.CIRCUIT_RECOVERY_SECONDS
+        self.half_open_max_calls = max(1, settings.CIRCUIT_HALF_OPEN_MAX_CALLS)
+        
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self._total_failures = 0
+        self._total_rejections = 0
+        # Set while open so queued and in-flight calls can bail out early
+        self._open_event = asyncio.Event()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            logger.info(f"Circuit '{self.name}' half-open, allowing trial calls")
+            self._state = self.HALF_OPEN
+            self._trial_calls = 0
+            self._open_event.clear()
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may go through right now (reserves a half-open trial slot)"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._trial_calls < self.half_open_max_calls:
+                self._trial_calls += 1
+                return True
+            self._total_rejections += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.info(f"Circuit '{self.name}' closed after successful trial call")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._trial_calls = 0
+            self._open_event.clear()
+
+    def record_failure(self):
+        with self._lock:
+            self._total_failures += 1
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or (state == self.CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._open()
+
+    def _release_trial(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def _open(self):
+        logger.warning(
+            f"Circuit '{self.name}' opened after {self._consecutive_failures} consecutive failures; "
+            f"failing fast for {self.recovery_timeout}s"
+        )
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_calls = 0
+        self._open_event.set()
+
+    @contextmanager
+    def guard(self):
+        """Reject the call if the circuit is open, otherwise record its outcome"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open; Ollama calls are failing fast")
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            self._release_trial()
+            raise
+        except Exception as e:
+            if is_outage(e):
+                self.record_failure()
+            else:
+                # The server answered; neither a failure nor a successful trial
+                self._release_trial()
+            raise
+        else:
+            self.record_success()
+
+    async def run_unless_open(self, awaitable: Awaitable[T]) -> T:
+        """Await a call, abandoning it as soon as the circuit opens.
+        
+        Covers calls still queued for a parallelism slot as well as ones
+        already waiting on Ollama.
+        """
+        if self.state == self.OPEN:
+            self._total_rejections += 1
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise CircuitOpenError(f"Circuit '{self.name}' is open; Ollama calls are failing fast")
+        
+        call = asyncio.ensure_future(awaitable)
+        opened = asyncio.ensure_future(self._open_event.wait())
+        try:
+            done, _ = await asyncio.wait({call, opened}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        finally:
+            opened.cancel()
+        
+        if call in done:
+            return call.result()
+        call.cancel()
+        raise CircuitOpenError(f"Circuit '{self.name}' opened while the call was pending")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == self.OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "total_failures": self._total_failures,
+                "rejected_calls": self._total_rejections,
+                "retry_in_seconds": round(retry_in, 1)
+            }
+
+@lru_cache()
+def get_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker()
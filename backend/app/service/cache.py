@@ -0,0 +1,319 @@
+# ==========================================
+# BACKEND - backend/app/service/cache.py
+# ==========================================
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from ..config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+class LLMCache:
+    """Content-addressed cache of LLM responses.
+
+    Lookups go through an in-memory LRU first and an on-disk SQLite store
+    second; disk hits are promoted back into memory. Entries expire after
+    the configured TTL and the disk store is trimmed to a byte budget by
+    least-recent access.
+
+    The SQLite tier is only touched from one dedicated worker thread, so no
+    disk read or write runs on the event loop. Memory hits are answered
+    inline; their access times reach the disk in batches, always before the
+    disk store is trimmed.
+    """
+    # Memory hits collected before their access times are written back
+    TOUCH_BATCH = 256
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.enabled = self.settings.LLM_CACHE_ENABLED
+        self.ttl = self.settings.LLM_CACHE_TTL_SECONDS
+        self.max_memory_items = self.settings.LLM_CACHE_MEMORY_ITEMS
+        self.max_disk_bytes = self.settings.LLM_CACHE_MAX_BYTES
+        
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        # key -> last memory hit not yet written to disk
+        self._touched: Dict[str, float] = {}
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "expired": 0,
+            "evictions": 0
+        }
+        
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache")
+        if self.enabled:
+            self._open_db(Path(self.settings.LLM_CACHE_PATH))
+
+    def _open_db(self, path: Path):
+        """Open (or create) the SQLite tier"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+            self._db.commit()
+            row = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+            self._disk_bytes = row[0]
+            logger.info(f"LLM cache opened at {path} ({self._disk_bytes} bytes on disk)")
+        except sqlite3.Error as e:
+            logger.error(f"Could not open LLM cache database, using memory only: {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(model: str, template_version: str, prompt: str) -> str:
+        """Hash model, prompt-template version and prompt text into a cache key"""
+        digest = hashlib.sha256()
+        for part in (model, template_version, prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    async def _on_disk(self, func: Callable[..., T], *args) -> T:
+        """Run a SQLite operation on the cache's disk thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._disk, func, *args)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None on a miss"""
+        if not self.enabled:
+            return None
+        
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    self._touch(key, now)
+                    return value
+                self._drop_memory(key)
+                self._stats["expired"] += 1
+        
+        row = await self._on_disk(self._read_disk, key, now) if self._db is not None else None
+        with self._lock:
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            value, created_at = row
+            self._remember(key, value, created_at)
+            self._stats["disk_hits"] += 1
+            return value
+
+    async def set(self, key: str, value: str):
+        """Store a response in both tiers"""
+        if not self.enabled or not value:
+            return
+        
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._stats["writes"] += 1
+        if self._db is not None:
+            await self._on_disk(self._write_disk, key, value, now)
+
+    def _touch(self, key: str, now: float):
+        """Queue a memory hit's access time for the disk tier (lock held)"""
+        if self._db is None:
+            return
+        self._touched[key] = now
+        if len(self._touched) >= self.TOUCH_BATCH:
+            self._disk.submit(self._flush_touches, True)
+
+    def _remember(self, key: str, value: str, created_at: float):
+        """Insert into the memory LRU, evicting the least recently used entries"""
+        self._drop_memory(key)
+        self._memory[key] = (value, created_at)
+        self._memory_bytes += len(value.encode('utf-8'))
+        while len(self._memory) > self.max_memory_items:
+            _, (old_value, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_value.encode('utf-8'))
+            self._stats["evictions"] += 1
+
+    def _drop_memory(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[0].encode('utf-8'))
+
+    # ---- disk tier: everything below runs on the disk thread ----
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        try:
+            row = self._db.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._is_expired(row[1], now):
+                self._delete_disk(key)
+                with self._lock:
+                    self._stats["expired"] += 1
+                return None
+            self._db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            return row
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    def _write_disk(self, key: str, value: str, now: float):
+        size = len(value.encode('utf-8'))
+        try:
+            row = self._db.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._disk_bytes -= row[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._disk_bytes += size
+            self._evict_disk()
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _flush_touches(self, commit: bool = False):
+        """Write queued memory-hit access times to disk, so eviction sees hot entries as hot"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return
+        try:
+            self._db.executemany(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+                [(accessed_at, key, accessed_at) for key, accessed_at in touched.items()]
+            )
+            if commit:
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache access-time update failed: {e}")
+
+    def _delete_disk(self, key: str):
+        row = self._db.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._db.commit()
+            self._disk_bytes -= row[0]
+
+    def _evict_disk(self):
+        """Drop expired rows, then least recently used rows until under the byte budget"""
+        if self.ttl > 0:
+            cutoff = time.time() - self.ttl
+            expired = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache WHERE created_at < ?", (cutoff,)
+            ).fetchone()
+            if expired[0]:
+                self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,))
+                self._disk_bytes -= expired[1]
+                with self._lock:
+                    self._stats["expired"] += expired[0]
+        
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        
+        self._flush_touches()
+        # Trim to 90% of the budget so we do not evict on every write. The
+        # running total finds how many of the oldest rows free enough bytes
+        excess = self._disk_bytes - int(self.max_disk_bytes * 0.9)
+        count, freed = self._db.execute(
+            """SELECT COUNT(*), COALESCE(MAX(freed), 0) FROM (
+                SELECT size, SUM(size) OVER (ORDER BY accessed_at, key) AS freed FROM llm_cache
+            ) WHERE freed - size < ?""",
+            (excess,)
+        ).fetchone()
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at, key LIMIT ?)",
+            (count,)
+        )
+        self._disk_bytes -= freed
+        with self._lock:
+            self._stats["evictions"] += count
+        logger.debug(f"LLM cache trimmed to {self._disk_bytes} bytes")
+
+    def _delete_disk_safely(self, key: str):
+        try:
+            self._delete_disk(key)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache delete failed: {e}")
+
+    def _clear_disk(self):
+        with self._lock:
+            self._touched.clear()
+        self._db.execute("DELETE FROM llm_cache")
+        self._db.commit()
+        self._disk_bytes = 0
+
+    def _count_disk(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    # ---- maintenance ----
+
+    async def delete(self, key: str):
+        """Drop a single entry, e.g. a reply that turned out to be unusable"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._drop_memory(key)
+            self._touched.pop(key, None)
+        if self._db is not None:
+            await self._on_disk(self._delete_disk_safely, key)
+
+    async def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self._db is not None:
+            await self._on_disk(self._clear_disk)
+        logger.info("LLM cache cleared")
+
+    async def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        disk_items = await self._on_disk(self._count_disk) if self._db is not None else 0
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                "hits": hits,
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_items": disk_items,
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "ttl_seconds": self.ttl
+            }
+
+@lru_cache()
+def get_llm_cache() -> LLMCache:
+    return LLMCache()
@@ -0,0 +1,129 @@
+# ==========================================
+# BACKEND - backend/app/service/dag.py
+# ==========================================
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from ..config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+@lru_cache()
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Shared worker threads for CPU-bound stages, so they never block the event loop"""
+    return ThreadPoolExecutor(
+        max_workers=max(1, get_settings().PIPELINE_CPU_WORKERS),
+        thread_name_prefix="pipeline-cpu"
+    )
+
+async def run_cpu(func: Callable[..., Any], *args) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(get_cpu_executor(), func, *args)
+
+class Stage:
+    """One node of a StageGraph.
+
+    ``func`` receives the results of ``deps`` as keyword arguments, in the
+    order given. Coroutine functions run on the event loop; plain functions
+    run in the CPU thread pool when ``cpu`` is set, inline otherwise.
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], deps: Sequence[str] = (), cpu: bool = False):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.cpu = cpu
+
+class StageGraph:
+    """Runs stages as soon as their dependencies finish, timing each one.
+
+    ``timings()`` reports when every node started and ended (relative to the
+    run) and the critical path: the chain of nodes, each waiting on the one
+    before it, that decided the total wall time.
+    """
+
+    def __init__(self, stages: Sequence[Stage], on_done: Optional[Callable[[str, Any], None]] = None):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                # Declaring stages in dependency order also rules out cycles
+                raise ValueError(f"Stage {stage.name} depends on undeclared stage(s): {', '.join(missing)}")
+            self.stages[stage.name] = stage
+        # Called on the event loop as each stage finishes, with its result
+        self.on_done = on_done
+        self.results: Dict[str, Any] = {}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._spans: Dict[str, Dict[str, float]] = {}
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every stage; the first failure cancels the rest and is re-raised"""
+        self._started_at = time.monotonic()
+        tasks: Dict[str, asyncio.Task] = {}
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.create_task(self._run_stage(stage, [tasks[dep] for dep in stage.deps]))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            self._finished_at = time.monotonic()
+        return self.results
+
+    async def _run_stage(self, stage: Stage, deps: List[asyncio.Task]):
+        await asyncio.gather(*deps)
+        kwargs = {name: self.results[name] for name in stage.deps}
+        started = time.monotonic()
+        if inspect.iscoroutinefunction(stage.func):
+            result = await stage.func(**kwargs)
+        elif stage.cpu:
+            result = await run_cpu(lambda: stage.func(**kwargs))
+        else:
+            result = stage.func(**kwargs)
+        self.results[stage.name] = result
+        self._spans[stage.name] = {"start": started, "end": time.monotonic()}
+        if self.on_done is not None:
+            self.on_done(stage.name, result)
+
+    def critical_path(self) -> List[str]:
+        """Walk back from the last stage to finish through the dependency that finished last"""
+        if not self._spans:
+            return []
+        path = [max(self._spans, key=lambda name: self._spans[name]["end"])]
+        while True:
+            deps = [dep for dep in self.stages[path[-1]].deps if dep in self._spans]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda name: self._spans[name]["end"]))
+        return list(reversed(path))
+
+    def timings(self) -> Dict[str, Any]:
+        origin = self._started_at or 0.0
+
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 1)
+
+        nodes = {
+            name: {
+                "start_ms": ms(span["start"] - origin),
+                "end_ms": ms(span["end"] - origin),
+                "duration_ms": ms(span["end"] - span["start"]),
+                "deps": self.stages[name].deps,
+                "cpu": self.stages[name].cpu
+            }
+            for name, span in self._spans.items()
+        }
+        path = self.critical_path()
+        return {
+            "wall_ms": ms((self._finished_at or time.monotonic()) - origin),
+            "nodes": nodes,
+            "critical_path": path,
+            "critical_path_ms": round(sum(nodes[name]["duration_ms"] for name in path), 1)
+        }
\ No newline at end of file
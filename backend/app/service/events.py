@@ -0,0 +1,72 @@
+# ==========================================
+# BACKEND - backend/app/service/events.py
+# ==========================================
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class EventChannel:
+    """Ordered event stream for one analysis, with a replay buffer.
+
+    Every event gets an increasing id, so a subscriber that reconnects with
+    the last id it saw (SSE Last-Event-ID) picks up where it left off as long
+    as the missed events are still in the buffer.
+    """
+
+    def __init__(self, buffer_size: int = 1000):
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max(1, buffer_size))
+        self.next_id = 1
+        self.closed = False
+        self._subscribers: List[asyncio.Queue] = []
+
+    def publish(self, event: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        message = {"id": self.next_id, "event": event, "data": data}
+        self.next_id += 1
+        self.events.append(message)
+        for queue in self._subscribers:
+            queue.put_nowait(message)
+        return message
+
+    def close(self):
+        """No more events; live subscribers finish once they drain their queue"""
+        self.closed = True
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    async def subscribe(self, after_id: int = 0, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Buffered events after after_id, then live ones until the channel closes.
+
+        With heartbeat set, yields None whenever that many seconds pass without
+        an event so the caller can keep an idle connection open.
+        """
+        # Snapshot and register without awaiting in between, so nothing published
+        # meanwhile is either missed or seen twice
+        backlog = [message for message in self.events if message["id"] > after_id]
+        queue: asyncio.Queue = asyncio.Queue()
+        live = not self.closed
+        if live:
+            self._subscribers.append(queue)
+        try:
+            for message in backlog:
+                yield message
+            if not live:
+                return
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
\ No newline at end of file
@@ -0,0 +1,145 @@
+# ==========================================
+# BACKEND - backend/app/service/fingerprint.py
+# ==========================================
+import ast
+import copy
+import hashlib
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+from .cache import get_llm_cache
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Bump whenever normalization changes so old fingerprints stop matching
+FINGERPRINT_VERSION = "1"
+
+_CANONICAL_LITERALS = (str, bytes, int, float, complex)
+
+def _strip_docstring(body: List[ast.stmt]) -> List[ast.stmt]:
+    first = body[0] if body else None
+    if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+        return body[1:] or [ast.Pass()]
+    return body
+
+class _Normalizer(ast.NodeTransformer):
+    """Drops docstrings and optionally replaces bound names and literals with placeholders"""
+
+    def __init__(self, bound: Dict[str, str], literals: bool):
+        self.bound = bound
+        self.literals = literals
+
+    def _rename(self, name: str) -> str:
+        return self.bound.get(name, name)
+
+    def _visit_scope(self, node):
+        node.body = _strip_docstring(node.body)
+        node.name = self._rename(node.name)
+        return self.generic_visit(node)
+
+    visit_FunctionDef = _visit_scope
+    visit_AsyncFunctionDef = _visit_scope
+    visit_ClassDef = _visit_scope
+
+    def visit_arg(self, node: ast.arg):
+        node.arg = self._rename(node.arg)
+        return self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name):
+        node.id = self._rename(node.id)
+        return node
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        if node.name:
+            node.name = self._rename(node.name)
+        return self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        if self.literals and type(node.value) in _CANONICAL_LITERALS:
+            return ast.Constant(value=f"<{type(node.value).__name__}>")
+        return node
+
+def _bound_names(node: ast.AST) -> List[str]:
+    """Names the symbol binds itself, in a deterministic (breadth-first) order.
+
+    Free names (globals, builtins, imported modules) and attribute names are
+    left alone since they change what the code means. Dunder names are kept.
+    """
+    names: List[str] = []
+
+    def add(name: Optional[str]):
+        if name and name not in names and not (name.startswith("__") and name.endswith("__")):
+            names.append(name)
+
+    for inner in ast.walk(node):
+        if isinstance(inner, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            add(inner.name)
+        elif isinstance(inner, ast.arg):
+            add(inner.arg)
+        elif isinstance(inner, ast.Name) and isinstance(inner.ctx, (ast.Store, ast.Del)):
+            add(inner.id)
+        elif isinstance(inner, ast.ExceptHandler):
+            add(inner.name)
+    return names
+
+def fingerprint_node(node: ast.AST, names: bool = True, literals: bool = False) -> Tuple[str, List[str]]:
+    """Normalized structural hash of a function or class.
+
+    Returns ``(fingerprint, bound_names)``; ``bound_names[i]`` is the original
+    name behind placeholder ``i``, so explanations can be renamed between two
+    symbols with the same fingerprint. Positions, formatting and docstrings
+    never affect the hash.
+    """
+    bound = _bound_names(node) if names else []
+    placeholders = {name: f"_v{idx}" for idx, name in enumerate(bound)}
+    normalized = _Normalizer(placeholders, literals).visit(copy.deepcopy(node))
+    dump = ast.dump(normalized, annotate_fields=False, include_attributes=False)
+    digest = hashlib.sha256(f"{FINGERPRINT_VERSION}:{int(names)}{int(literals)}:{dump}".encode("utf-8")).hexdigest()
+    return digest, bound
+
+def rewrite_names(text: str, source_names: List[str], target_names: List[str]) -> str:
+    """Rename whole-word mentions of one symbol's bound names to another's"""
+    mapping = {
+        source: target
+        for source, target in zip(source_names, target_names)
+        if source != target
+    }
+    if not mapping:
+        return text
+    # Very short names ("a", "x", "id") read as prose, so only rename them inside backticks
+    words = [name for name in mapping if len(name) > 2]
+    short = [name for name in mapping if len(name) <= 2]
+    if words:
+        # Whole identifiers only: not part of a longer name and not an attribute (``self.total``)
+        pattern = re.compile(r"(?<![\w.])(" + "|".join(re.escape(name) for name in sorted(words, key=len, reverse=True)) + r")(?!\w)")
+        text = pattern.sub(lambda match: mapping[match.group(1)], text)
+    if short:
+        pattern = re.compile(r"`(" + "|".join(re.escape(name) for name in short) + r")`")
+        text = pattern.sub(lambda match: f"`{mapping[match.group(1)]}`", text)
+    return text
+
+class ExplanationStore:
+    """Explanations keyed by fingerprint, kept in the persistent LLM cache"""
+
+    def __init__(self, namespace: str):
+        self.cache = get_llm_cache()
+        # Explanations depend on the prompt templates and models, so callers fold those in
+        self.namespace = f"{FINGERPRINT_VERSION}:{namespace}"
+
+    def _key(self, kind: str, fingerprint: str) -> str:
+        return self.cache.make_key(f"fingerprint:{kind}", self.namespace, fingerprint)
+
+    async def get(self, kind: str, fingerprint: str) -> Optional[Tuple[str, List[str]]]:
+        """(explanation, bound names of the symbol it was written for), or None"""
+        stored = await self.cache.get(self._key(kind, fingerprint))
+        if stored is None:
+            return None
+        try:
+            entry = json.loads(stored)
+            return entry["text"], entry["names"]
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    async def set(self, kind: str, fingerprint: str, text: str, names: List[str]):
+        await self.cache.set(self._key(kind, fingerprint), json.dumps({"text": text, "names": names}))
\ No newline at end of file
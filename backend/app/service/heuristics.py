@@ -0,0 +1,167 @@
+# ==========================================
+# BACKEND - backend/app/service/heuristics.py
+# ==========================================
+from typing import List, Optional, Tuple
+from ..config import get_settings
+from ..models.schemas import Function, Class
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CONTROL_FLOW = {"If", "For", "AsyncFor", "While", "Try", "TryStar", "With", "AsyncWith", "Match"}
+SIMPLE_VALUES = {"Attribute", "Name", "Constant", "Subscript"}
+DATA_STATEMENTS = {"Pass", "Expr:Constant", "Assign:Name", "AnnAssign:Name"}
+REPR_METHODS = {"__repr__", "__str__"}
+
+# How a trivial method is summarised inside a simple class's explanation
+METHOD_ROLES = {
+    "documented": "short and documented",
+    "stub": "placeholder",
+    "repr": "builds the text representation",
+    "getter": "returns a stored value",
+    "setter": "stores its arguments as attributes",
+    "wrapper": "delegates to a single call"
+}
+
+def _signature(func: Function) -> str:
+    return f"{func.name}({', '.join(func.parameters)})"
+
+def _arguments(func: Function) -> List[str]:
+    return [param for param in func.parameters if param not in ("self", "cls")]
+
+class TrivialSymbolClassifier:
+    """Recognises functions and classes simple enough to explain from their structure.
+
+    Works only on the parsed ``Function``/``Class`` data (statement counts and
+    kinds, docstring) and returns ``(kind, explanation)`` for trivial symbols,
+    or None when the symbol should go to the LLM. Methods are classified one
+    by one with the function rules; a class is only simple when all of them
+    are trivial.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = settings.HEURISTICS_ENABLED
+        self.function_max_statements = settings.HEURISTIC_FUNCTION_MAX_STATEMENTS
+        self.class_max_statements = settings.HEURISTIC_CLASS_MAX_STATEMENTS
+        self.docstring_min_words = settings.HEURISTIC_DOCSTRING_MIN_WORDS
+        self.documented_max_statements = settings.HEURISTIC_DOCUMENTED_MAX_STATEMENTS
+
+    def _rich_docstring(self, docstring: Optional[str], statements: int) -> bool:
+        return (
+            bool(docstring)
+            and len(docstring.split()) >= self.docstring_min_words
+            and statements <= self.documented_max_statements
+        )
+
+    def classify_function(self, func: Function) -> Optional[Tuple[str, str]]:
+        if not self.enabled:
+            return None
+        kinds = func.statement_kinds
+
+        if self._rich_docstring(func.docstring, func.body_statements):
+            return "documented", self._documented_function(func)
+        if func.body_statements > self.function_max_statements or CONTROL_FLOW.intersection(kinds):
+            return None
+
+        if all(kind in ("Pass", "Expr:Constant") or kind.startswith("Raise") for kind in kinds):
+            return "stub", self._stub_function(func)
+        if func.name in REPR_METHODS and len(kinds) == 1 and kinds[0].startswith("Return"):
+            return "repr", self._repr(func)
+        if len(kinds) == 1 and kinds[0].split(":")[-1] in SIMPLE_VALUES and kinds[0].startswith("Return"):
+            return "getter", self._getter(func)
+        if kinds and all(kind.startswith(("Assign:Attribute", "AnnAssign:Attribute")) for kind in kinds):
+            return "setter", self._setter(func)
+        if len(kinds) == 1 and kinds[0] in ("Return:Call", "Expr:Call", "Return:Await", "Expr:Await"):
+            return "wrapper", self._wrapper(func)
+        return None
+
+    def classify_class(self, cls: Class) -> Optional[Tuple[str, str]]:
+        if not self.enabled:
+            return None
+        kinds = cls.statement_kinds
+
+        if not cls.methods and all(kind in DATA_STATEMENTS for kind in kinds):
+            return "data", self._data_class(cls)
+        if self._rich_docstring(cls.docstring, cls.body_statements):
+            return "documented", self._documented_class(cls)
+        # Members are counted at the top level; what happens inside methods is up to the method rules
+        members = cls.member_kinds
+        if len(members) > self.class_max_statements or CONTROL_FLOW.intersection(members):
+            return None
+        methods = [(method, self.classify_function(method)) for method in cls.method_functions]
+        if all(result is not None for _, result in methods):
+            return "simple", self._simple_class(cls, [(method, result[0]) for method, result in methods])
+        return None
+
+    # ---- templates ----
+
+    def _documented_function(self, func: Function) -> str:
+        returns = f" and returns `{func.return_type}`" if func.return_type else ""
+        return f"""**{func.name}** takes {self._describe_args(func)}{returns}.
+
+{func.docstring.strip()}
+
+*Explained from its docstring; the body is short and fully documented.*"""
+
+    def _stub_function(self, func: Function) -> str:
+        return f"""**{_signature(func)}** is a placeholder: its body only passes, holds a docstring or raises, so it does no work yet. Such functions usually mark an interface to be implemented (or overridden) later.
+
+**Docstring:** {func.docstring if func.docstring else 'No documentation provided.'}"""
+
+    def _repr(self, func: Function) -> str:
+        return f"""**{_signature(func)}** builds the object's text representation from its state in a single expression, without changing anything.
+
+**Docstring:** {func.docstring if func.docstring else 'No documentation provided.'}"""
+
+    def _getter(self, func: Function) -> str:
+        returns = f" of type `{func.return_type}`" if func.return_type else ""
+        return f"""**{_signature(func)}** is a simple accessor: it returns a stored or constant value{returns} directly, without computing anything or changing state.
+
+**Docstring:** {func.docstring if func.docstring else 'No documentation provided.'}"""
+
+    def _setter(self, func: Function) -> str:
+        return f"""**{_signature(func)}** is a simple setter: it stores {self._describe_args(func)} as attribute(s) on the object and performs no other logic.
+
+**Docstring:** {func.docstring if func.docstring else 'No documentation provided.'}"""
+
+    def _wrapper(self, func: Function) -> str:
+        returns = f" and returns its result (`{func.return_type}`)" if func.return_type else " and returns its result"
+        return f"""**{_signature(func)}** is a thin wrapper: it passes {self._describe_args(func)} straight on to a single call{returns}, giving that call a clearer name or a fixed set of arguments.
+
+**Docstring:** {func.docstring if func.docstring else 'No documentation provided.'}"""
+
+    def _describe_args(self, func: Function) -> str:
+        args = _arguments(func)
+        return f"`{'`, `'.join(args)}`" if args else "no arguments"
+
+    def _inheritance(self, cls: Class) -> str:
+        return f" It inherits from {', '.join(cls.base_classes)}." if cls.base_classes else ""
+
+    def _data_class(self, cls: Class) -> str:
+        if cls.attributes:
+            body = f"It only declares the attribute(s) {', '.join(cls.attributes)} and has no methods, so it acts as a plain data holder or set of constants."
+        elif "AnnAssign:Name" in cls.statement_kinds:
+            body = "It only declares annotated fields and has no methods, so it acts as a plain data holder (for example a dataclass or typed record)."
+        else:
+            body = "It has no methods or attributes of its own, so it exists only as a distinct type (for example a marker or a custom exception)."
+        return f"""**{cls.name}** is a declarative class. {body}{self._inheritance(cls)}
+
+**Docstring:** {cls.docstring if cls.docstring else 'No documentation provided.'}"""
+
+    def _documented_class(self, cls: Class) -> str:
+        methods = f"\n\n**Methods:** {', '.join(cls.methods)}" if cls.methods else ""
+        return f"""**{cls.name}** is a small, documented class.{self._inheritance(cls)}
+
+{cls.docstring.strip()}{methods}
+
+*Explained from its docstring; the class is small and fully documented.*"""
+
+    def _simple_class(self, cls: Class, methods: List[Tuple[Function, str]]) -> str:
+        roles = "".join(f"\n- `{_signature(method)}`: {METHOD_ROLES[kind]}" for method, kind in methods)
+        return f"""**{cls.name}** is a small class with {len(cls.member_kinds)} member(s) and {len(methods)} method(s), each of them trivial, so it mostly stores and exposes state.{self._inheritance(cls)}
+
+**Methods:**{roles or ' None'}
+
+**Attributes:** {', '.join(cls.attributes) if cls.attributes else 'None declared at class level'}
+**Docstring:** {cls.docstring if cls.docstring else 'No documentation provided.'}"""
\ No newline at end of file
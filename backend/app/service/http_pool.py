@@ -0,0 +1,63 @@
+# ==========================================
+# BACKEND - backend/app/service/http_pool.py
+# ==========================================
+import httpx
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+from ..config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class OllamaHTTPPool:
+    """Long-lived keep-alive HTTP clients shared by every AIService instance.
+
+    One ``httpx.AsyncClient`` is kept per Ollama host, so the connection
+    limits configured in settings act as per-host caps.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _build_client(self, base_url: str) -> httpx.AsyncClient:
+        """Create a pooled client for a single Ollama host"""
+        limits = httpx.Limits(
+            max_connections=self.settings.OLLAMA_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=self.settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=self.settings.OLLAMA_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(
+            self.settings.OLLAMA_TIMEOUT_LONG,
+            connect=self.settings.OLLAMA_CONNECT_TIMEOUT
+        )
+        logger.info(
+            f"Creating pooled Ollama client for {base_url} "
+            f"(max connections: {limits.max_connections}, keep-alive: {limits.max_keepalive_connections})"
+        )
+        return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout)
+
+    def client(self, base_url: Optional[str] = None) -> httpx.AsyncClient:
+        """Return the shared client for a host, creating it on first use"""
+        base_url = (base_url or self.settings.OLLAMA_BASE_URL).rstrip('/')
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = self._build_client(base_url)
+            self._clients[base_url] = client
+        return client
+
+    async def startup(self, base_urls: Optional[Iterable[str]] = None):
+        """Open the clients for the configured Ollama hosts"""
+        for base_url in base_urls or [self.settings.OLLAMA_BASE_URL]:
+            self.client(base_url)
+
+    async def close(self):
+        """Close every pooled client and drop its connections"""
+        for base_url, client in self._clients.items():
+            logger.info(f"Closing pooled Ollama client for {base_url}")
+            await client.aclose()
+        self._clients.clear()
+
+@lru_cache()
+def get_http_pool() -> OllamaHTTPPool:
+    return OllamaHTTPPool()
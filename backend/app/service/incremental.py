@@ -0,0 +1,108 @@
+# ==========================================
+# BACKEND - backend/app/service/incremental.py
+# ==========================================
+import hashlib
+from typing import Any, Dict, List, Optional, Union
+from ..models.schemas import Function, Class, Import
+from ..utils.source import SourceIndex
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def span_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def symbol_span(source: SourceIndex, symbol: Union[Function, Class]) -> str:
+    """Exact source of a symbol, decorators included since they change what it does"""
+    return source.span(symbol.start_line_number or symbol.line_number, symbol.end_line_number)
+
+def _keyed(symbols: List[Union[Function, Class]]) -> Dict[str, Union[Function, Class]]:
+    """Symbols by name, with a counter for repeated names (nested or redefined symbols)"""
+    keyed: Dict[str, Union[Function, Class]] = {}
+    seen: Dict[str, int] = {}
+    for symbol in symbols:
+        count = seen.get(symbol.name, 0)
+        seen[symbol.name] = count + 1
+        keyed[f"{symbol.name}#{count}"] = symbol
+    return keyed
+
+def build_symbol_index(source: SourceIndex, functions: List[Function], classes: List[Class]) -> Dict[str, Any]:
+    """What a later revision needs to diff against: span hash and explanation per symbol"""
+    index: Dict[str, Any] = {}
+    for kind, symbols in (("function", functions), ("class", classes)):
+        index[kind] = {
+            key: {
+                "span_hash": span_hash(symbol_span(source, symbol)),
+                "explanation": symbol.logic_explanation if kind == "function" else symbol.detailed_explanation,
+                "source": symbol.explanation_source
+            }
+            for key, symbol in _keyed(symbols).items()
+        }
+    return index
+
+class IncrementalPlan:
+    """Diff of a new revision against a stored analysis of the previous one.
+
+    Functions and classes are matched by name (and order among equal names)
+    and compared by the hash of their exact source span, so moving a symbol
+    keeps its explanation while any edit inside it does not.
+    """
+
+    def __init__(
+        self,
+        previous: Dict[str, Any],
+        source: SourceIndex,
+        functions: List[Function],
+        classes: List[Class],
+        imports: List[Import]
+    ):
+        self.previous_id = previous["file_id"]
+        self.previous_result = previous["result"]
+        # Sections the previous run answered from a fallback; None for records older than the fallback stats
+        self.previous_fallbacks = (self.previous_result.get("stats") or {}).get("fallbacks")
+        old_symbols = previous.get("symbols") or {}
+        self.carried: Dict[int, Dict[str, Any]] = {}
+        self.counts = {"unchanged": 0, "modified": 0, "added": 0, "removed": 0}
+
+        for kind, symbols in (("function", functions), ("class", classes)):
+            old = old_symbols.get(kind, {})
+            current = _keyed(symbols)
+            for key, symbol in current.items():
+                entry = old.get(key)
+                if entry is None:
+                    self.counts["added"] += 1
+                elif entry["span_hash"] == span_hash(symbol_span(source, symbol)):
+                    self.counts["unchanged"] += 1
+                    self.carried[id(symbol)] = entry
+                else:
+                    self.counts["modified"] += 1
+            self.counts["removed"] += len(set(old) - set(current))
+
+        old_imports = {item["module"] for item in self.previous_result.get("imports", [])}
+        new_imports = {item.module for item in imports}
+        self.imports_changed = len(old_imports ^ new_imports)
+        self.import_count = len(old_imports | new_imports)
+
+    def carried_over(self, symbol: Union[Function, Class]) -> Optional[Dict[str, Any]]:
+        """Stored explanation for an unchanged symbol, or None if it must be explained again"""
+        return self.carried.get(id(symbol))
+
+    def reusable(self, section: str) -> bool:
+        """Whether the previous analysis got a section (e.g. "overview") from the model"""
+        return self.previous_fallbacks is not None and section not in self.previous_fallbacks
+
+    @property
+    def structural_change(self) -> float:
+        """Share of symbols and imports added, removed or modified (0.0 - 1.0)"""
+        changed = self.counts["added"] + self.counts["removed"] + self.counts["modified"] + self.imports_changed
+        total = sum(self.counts.values()) + self.import_count
+        return round(changed / total, 3) if total else 0.0
+
+    def stats(self, overview_regenerated: bool) -> Dict[str, Any]:
+        return {
+            "previous_analysis_id": self.previous_id,
+            **self.counts,
+            "imports_changed": self.imports_changed,
+            "structural_change": self.structural_change,
+            "overview_regenerated": overview_regenerated
+        }
\ No newline at end of file
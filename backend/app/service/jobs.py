@@ -0,0 +1,258 @@
+# ==========================================
+# BACKEND - backend/app/service/jobs.py
+# ==========================================
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from ..config import get_settings
+from .events import EventChannel
+from .pipeline import PIPELINE_STAGES, run_analysis, serialize_sections
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class JobQueueFullError(Exception):
+    """Too many analyses are already waiting"""
+
+class AnalysisJob:
+    """One submitted analysis: its input, stage progress, partial and final results.
+
+    Everything that happens to the job is also published on ``channel``
+    (queued, started, stage, explanation, done/failed) for live clients.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        code: str,
+        filename: str,
+        client_id: str,
+        event_buffer: int = 1000,
+        refresh: bool = False,
+        previous_analysis_id: Optional[str] = None
+    ):
+        self.id = uuid.uuid4().hex
+        self.code: Optional[str] = code
+        self.filename = filename
+        self.client_id = client_id
+        self.refresh = refresh
+        self.previous_analysis_id = previous_analysis_id
+        self.status = self.QUEUED
+        self.completed_stages: List[str] = []
+        self.partial: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.channel = EventChannel(event_buffer)
+        self.publish("queued")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    @property
+    def stage(self) -> Optional[str]:
+        """Stage currently running (None while queued or once finished)"""
+        if self.status != self.RUNNING:
+            return None
+        remaining = [stage for stage in PIPELINE_STAGES if stage not in self.completed_stages]
+        return remaining[0] if remaining else None
+
+    @property
+    def progress(self) -> float:
+        return round(len(self.completed_stages) / len(PIPELINE_STAGES), 3)
+
+    def advance(self, event: str, payload: Dict[str, Any]):
+        """Progress callback for the pipeline: record a finished stage or explanation"""
+        if event == "explanation":
+            self.partial.setdefault("explanations", []).append(payload)
+            self.publish("explanation", {"fragment": payload})
+            return
+
+        if event not in self.completed_stages:
+            self.completed_stages.append(event)
+        fragment = serialize_sections(payload)
+        self.partial.update(fragment)
+        self.publish("stage", {"completed": event, "fragment": fragment})
+        logger.debug(f"Job {self.id} finished stage {event}")
+
+    def publish(self, event: str, data: Optional[Dict[str, Any]] = None):
+        """Send an event to live subscribers, tagged with the job's current progress"""
+        self.channel.publish(event, {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            **(data or {})
+        })
+
+    def snapshot(self, include_partial: bool = True) -> Dict[str, Any]:
+        snapshot = {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "completed_stages": list(self.completed_stages),
+            "stages": list(PIPELINE_STAGES),
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if include_partial and not self.finished:
+            snapshot["partial"] = self.partial
+        return snapshot
+
+class JobManager:
+    """Runs submitted analyses on a fixed pool of background workers.
+
+    Jobs live in memory until JOB_RESULT_TTL_SECONDS after they finish;
+    submit fails fast with JobQueueFullError once JOB_QUEUE_MAX are waiting.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.workers = max(1, settings.JOB_WORKERS)
+        self.queue_max = settings.JOB_QUEUE_MAX
+        self.result_ttl = settings.JOB_RESULT_TTL_SECONDS
+        self.event_buffer = settings.JOB_EVENT_BUFFER
+        self.jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        """Spawn the workers; called at startup, and lazily by submit"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        logger.info(f"Job manager started with {self.workers} worker(s)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        # Anything still waiting or half-run can never finish now
+        for job in self.jobs.values():
+            if not job.finished:
+                self._finish(job, error="Server shut down before the analysis finished")
+
+    def submit(
+        self,
+        code: str,
+        filename: str,
+        client_id: str = "anonymous",
+        refresh: bool = False,
+        previous_analysis_id: Optional[str] = None
+    ) -> AnalysisJob:
+        self._prune()
+        self.start()
+        if self.queue_max and self._queue.qsize() >= self.queue_max:
+            self.rejected += 1
+            raise JobQueueFullError(f"{self._queue.qsize()} analyses already queued")
+
+        job = AnalysisJob(
+            code, filename, client_id,
+            event_buffer=self.event_buffer,
+            refresh=refresh,
+            previous_analysis_id=previous_analysis_id
+        )
+        self.jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        logger.info(f"Queued analysis job {job.id} for {filename} (queue depth {self._queue.qsize()})")
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        self._prune()
+        return self.jobs.get(job_id)
+
+    def queue_position(self, job: AnalysisJob) -> Optional[int]:
+        """1-based place among queued jobs, None once the job has started"""
+        if job.status != AnalysisJob.QUEUED:
+            return None
+        queued = [other.id for other in self.jobs.values() if other.status == AnalysisJob.QUEUED]
+        return queued.index(job.id) + 1
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: AnalysisJob):
+        job.status = AnalysisJob.RUNNING
+        job.started_at = time.time()
+        job.publish("started")
+        logger.info(f"Running analysis job {job.id} for {job.filename}")
+        try:
+            job.result = await run_analysis(
+                job.code, job.filename, job.client_id,
+                progress=job.advance,
+                refresh=job.refresh,
+                previous_analysis_id=job.previous_analysis_id
+            )
+            self._finish(job)
+        except asyncio.CancelledError:
+            self._finish(job, error="Analysis was cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Analysis job {job.id} failed: {str(e)}", exc_info=True)
+            self._finish(job, error=f"Analysis failed: {str(e)}")
+
+    def _finish(self, job: AnalysisJob, error: Optional[str] = None):
+        job.status = AnalysisJob.FAILED if error else AnalysisJob.SUCCEEDED
+        job.error = error
+        job.finished_at = time.time()
+        job.code = None
+        job.partial = {}
+        if error:
+            self.failed += 1
+            job.publish("failed", {"error": error})
+        else:
+            self.succeeded += 1
+            job.publish("done", {"result_url": f"/api/jobs/{job.id}/result"})
+        job.channel.close()
+
+    def _prune(self):
+        """Forget finished jobs whose results have outlived the TTL"""
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for job in self.jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_max": self.queue_max,
+            "jobs": by_status,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+@lru_cache()
+def get_job_manager() -> JobManager:
+    return JobManager()
\ No newline at end of file
@@ -0,0 +1,101 @@
+# ==========================================
+# BACKEND - backend/app/service/knowledge.py
+# ==========================================
+import mmap
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+from ..config import get_settings
+from ..models.schemas import Import
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parent.parent / "data" / "import_purposes.tsv"
+
+class ImportKnowledgeBase:
+    """Offline index of import purposes for the stdlib and common packages.
+    
+    The index is a UTF-8 file of ``key<TAB>purpose`` lines sorted bytewise by
+    key, where a key is a module (``typing``) or a module-qualified name
+    (``typing.List``). It is memory-mapped and binary-searched in place, so
+    nothing is parsed up front and lookups cost a handful of comparisons.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else DEFAULT_INDEX_PATH
+        self._mm: Optional[mmap.mmap] = None
+        try:
+            with open(self.path, 'rb') as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            logger.info(f"Loaded import knowledge base from {self.path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Import knowledge base unavailable ({self.path}): {e}")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Binary-search the mapped index for an exact key"""
+        mm = self._mm
+        if mm is None or not key:
+            return None
+        
+        target = key.encode('utf-8')
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b'\n', 0, mid) + 1
+            end = mm.find(b'\n', start)
+            if end == -1:
+                end = len(mm)
+            line_key, _, value = mm[start:end].partition(b'\t')
+            if line_key == target:
+                return value.decode('utf-8')
+            if line_key < target:
+                lo = end + 1
+            else:
+                hi = start
+        return None
+
+    def _module_purpose(self, module: str) -> Optional[str]:
+        """Purpose of a module, falling back to its top-level package"""
+        purpose = self.lookup(module)
+        if purpose or '.' not in module:
+            return purpose
+        
+        top_level = module.split('.', 1)[0]
+        parent_purpose = self.lookup(top_level)
+        if parent_purpose:
+            return f"Part of the {top_level} package. {parent_purpose}"
+        return None
+
+    def purpose_for(self, imp: Import) -> Optional[str]:
+        """Build an explanation for an import, or None if the module is unknown"""
+        purpose = self._module_purpose(imp.module)
+        if purpose is None:
+            return None
+        
+        # Only names with their own entry get detail; for `import x as y` the
+        # single name is just the alias and never matches
+        described = []
+        for name in imp.names:
+            detail = self.lookup(f"{imp.module}.{name}")
+            if detail:
+                described.append(f"{name} ({detail})")
+        if described:
+            purpose += f" Imported here: {'; '.join(described)}."
+        return purpose
+
+    def resolve(self, imports: List[Import]) -> Tuple[List[Import], List[Import]]:
+        """Fill purposes from the index; return (resolved, unknown) imports"""
+        resolved, unknown = [], []
+        for imp in imports:
+            purpose = self.purpose_for(imp)
+            if purpose is None:
+                unknown.append(imp)
+            else:
+                imp.purpose = purpose
+                resolved.append(imp)
+        return resolved, unknown
+
+@lru_cache()
+def get_import_knowledge_base() -> ImportKnowledgeBase:
+    return ImportKnowledgeBase(get_settings().IMPORT_KB_PATH or None)
@@ -0,0 +1,91 @@
+# ==========================================
+# BACKEND - backend/app/service/latency.py
+# ==========================================
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional, Tuple
+from ..config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class LatencyTracker:
+    """Rolling latency windows per (prompt type, model) used to size timeouts.
+    
+    Samples are seconds per item, so a batch of eight is held to eight
+    times the per-item estimate. Until a window holds enough samples the
+    configured default applies; afterwards the timeout is the chosen
+    percentile times a safety factor, scaled by the item count and clamped
+    to [OLLAMA_TIMEOUT_MIN, OLLAMA_TIMEOUT_MAX]. A timed-out call is a
+    censored sample at its limit: it only says the call took at least that
+    long, but it still lifts the percentile, so when the server slows down
+    the timeout backs off instead of timing out every call.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._lock = threading.Lock()
+        self._windows: Dict[Tuple[str, str], Deque[float]] = {}
+        self._timeouts: Dict[Tuple[str, str], int] = {}
+
+    def _append(self, prompt_type: str, model: str, seconds: float, items: int):
+        window = self._windows.get((prompt_type, model))
+        if window is None:
+            window = deque(maxlen=self.settings.ADAPTIVE_TIMEOUT_WINDOW)
+            self._windows[(prompt_type, model)] = window
+        window.append(seconds / max(1, items))
+
+    def record(self, prompt_type: str, model: str, seconds: float, items: int = 1):
+        """Add an observed call duration for a prompt covering items symbols"""
+        with self._lock:
+            self._append(prompt_type, model, seconds, items)
+
+    def record_timeout(self, prompt_type: str, model: str, limit: float, items: int = 1):
+        """Add a call that hit its limit as a sample at the limit"""
+        with self._lock:
+            self._timeouts[(prompt_type, model)] = self._timeouts.get((prompt_type, model), 0) + 1
+            self._append(prompt_type, model, limit, items)
+
+    def percentile(self, prompt_type: str, model: str, q: float) -> Optional[float]:
+        """Nearest-rank percentile of the current window (seconds per item), or None if empty"""
+        with self._lock:
+            window = self._windows.get((prompt_type, model))
+            samples = sorted(window) if window else []
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+        return samples[rank]
+
+    def timeout_for(self, prompt_type: str, model: str, default: float, items: int = 1) -> float:
+        """Adaptive timeout for a prompt covering items symbols, or the default while the window is still cold"""
+        with self._lock:
+            window = self._windows.get((prompt_type, model))
+            warm = window is not None and len(window) >= self.settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES
+        if not warm:
+            return default
+        
+        observed = self.percentile(prompt_type, model, self.settings.ADAPTIVE_TIMEOUT_PERCENTILE)
+        timeout = observed * self.settings.ADAPTIVE_TIMEOUT_FACTOR * max(1, items)
+        return min(max(timeout, self.settings.OLLAMA_TIMEOUT_MIN), self.settings.OLLAMA_TIMEOUT_MAX)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-key sample counts, timeouts and per-item percentiles"""
+        with self._lock:
+            keys = list(self._windows)
+            counts = {key: len(window) for key, window in self._windows.items()}
+            timeouts = dict(self._timeouts)
+        return {
+            f"{prompt_type}:{model}": {
+                "samples": counts[(prompt_type, model)],
+                "timeouts": timeouts.get((prompt_type, model), 0),
+                "p50": self.percentile(prompt_type, model, 0.5),
+                "p90": self.percentile(prompt_type, model, 0.9),
+                "p99": self.percentile(prompt_type, model, 0.99)
+            }
+            for prompt_type, model in keys
+        }
+
+@lru_cache()
+def get_latency_tracker() -> LatencyTracker:
+    return LatencyTracker()
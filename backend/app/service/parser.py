@@ -2,8 +2,10 @@
 # BACKEND - backend/app/services/parser.py
 # ==========================================
 import ast
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from ..config import get_settings
 from ..models.schemas import Variable, Function, Class, Import
+from .fingerprint import fingerprint_node
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -13,6 +15,10 @@ class CodeParser:
         logger.info("Initializing CodeParser")
         self.code = code
         self.tree = None
+        settings = get_settings()
+        self.fingerprints = settings.FINGERPRINT_ENABLED
+        self.fingerprint_names = settings.FINGERPRINT_CANONICALIZE_NAMES
+        self.fingerprint_literals = settings.FINGERPRINT_CANONICALIZE_LITERALS
         
     def parse(self) -> Optional[ast.AST]:
         """Parse Python code into AST"""
@@ -142,33 +148,88 @@ class CodeParser:
         for node in ast.walk(self.tree):
             if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
                 if not self._is_method(node):
-                    params = [arg.arg for arg in node.args.args]
-                    return_type = None
-                    if node.returns:
-                        return_type = ast.unparse(node.returns)
-                    
-                    # Extract variables used in function
-                    variables_used = []
-                    for inner_node in ast.walk(node):
-                        if isinstance(inner_node, ast.Name):
-                            if inner_node.id not in variables_used:
-                                variables_used.append(inner_node.id)
-                    
-                    docstring = ast.get_docstring(node)
-                    
-                    functions.append(Function(
-                        name=node.name,
-                        parameters=params,
-                        return_type=return_type,
-                        docstring=docstring,
-                        line_number=node.lineno,
-                        variables_used=variables_used,
-                        occurrences=function_calls.get(node.name, [])
-                    ))
+                    functions.append(self._build_function(node, function_calls.get(node.name, [])))
         
         logger.info(f"Extracted {len(functions)} functions")
         return functions
     
+    def _build_function(self, node, occurrences: List[int], fingerprint: bool = True) -> Function:
+        """Function model for a def node (methods skip the fingerprint, which only module functions use)"""
+        params = [arg.arg for arg in node.args.args]
+        return_type = None
+        if node.returns:
+            return_type = ast.unparse(node.returns)
+        
+        # Extract variables used in function
+        variables_used = []
+        for inner_node in ast.walk(node):
+            if isinstance(inner_node, ast.Name):
+                if inner_node.id not in variables_used:
+                    variables_used.append(inner_node.id)
+        
+        docstring = ast.get_docstring(node)
+        statement_kinds = self._statement_kinds(node)
+        fingerprint_hash, fingerprint_names = self._fingerprint(node) if fingerprint else (None, [])
+        
+        return Function(
+            name=node.name,
+            parameters=params,
+            return_type=return_type,
+            docstring=docstring,
+            line_number=node.lineno,
+            start_line_number=self._start_line(node),
+            end_line_number=node.end_lineno,
+            variables_used=variables_used,
+            occurrences=occurrences,
+            body_statements=len(statement_kinds),
+            statement_kinds=statement_kinds,
+            fingerprint=fingerprint_hash,
+            fingerprint_names=fingerprint_names
+        )
+    
+    def _start_line(self, node) -> int:
+        """First line of a def or class, counting its decorators"""
+        return min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+    
+    def _statement_kinds(self, node, nested: bool = True) -> List[str]:
+        """Kinds of every statement in a def/class body, docstrings skipped; nested ones unless nested is False"""
+        kinds = []
+        
+        def visit(body):
+            first = body[0] if body else None
+            if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+                body = body[1:]
+            for stmt in body:
+                kinds.append(self._statement_kind(stmt))
+                if not nested:
+                    continue
+                for field in ("body", "orelse", "finalbody"):
+                    visit(getattr(stmt, field, None) or [])
+                for handler in getattr(stmt, "handlers", None) or []:
+                    visit(handler.body)
+                for case in getattr(stmt, "cases", None) or []:
+                    visit(case.body)
+        
+        visit(node.body)
+        return kinds
+    
+    def _fingerprint(self, node) -> Tuple[Optional[str], List[str]]:
+        """Normalized structural hash used to reuse explanations of identical code"""
+        if not self.fingerprints:
+            return None, []
+        return fingerprint_node(node, names=self.fingerprint_names, literals=self.fingerprint_literals)
+    
+    def _statement_kind(self, stmt: ast.stmt) -> str:
+        """Statement type, qualified by its value (Return/Expr) or target (assignments)"""
+        name = type(stmt).__name__
+        if isinstance(stmt, (ast.Return, ast.Expr)) and stmt.value is not None:
+            return f"{name}:{type(stmt.value).__name__}"
+        if isinstance(stmt, ast.Assign):
+            return f"{name}:{type(stmt.targets[0]).__name__}"
+        if isinstance(stmt, (ast.AugAssign, ast.AnnAssign)):
+            return f"{name}:{type(stmt.target).__name__}"
+        return name
+    
     def _is_method(self, node) -> bool:
         """Check if function is a class method"""
         for parent in ast.walk(self.tree):
@@ -189,11 +250,13 @@ class CodeParser:
         for node in ast.walk(self.tree):
             if isinstance(node, ast.ClassDef):
                 methods = []
+                method_functions = []
                 attributes = []
                 
                 for item in node.body:
                     if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
                         methods.append(item.name)
+                        method_functions.append(self._build_function(item, [], fingerprint=False))
                     elif isinstance(item, ast.Assign):
                         for target in item.targets:
                             if isinstance(target, ast.Name):
@@ -201,6 +264,8 @@ class CodeParser:
                 
                 base_classes = [ast.unparse(base) for base in node.bases]
                 docstring = ast.get_docstring(node)
+                statement_kinds = self._statement_kinds(node)
+                fingerprint, fingerprint_names = self._fingerprint(node)
                 
                 classes.append(Class(
                     name=node.name,
@@ -208,7 +273,15 @@ class CodeParser:
                     attributes=attributes,
                     base_classes=base_classes,
                     docstring=docstring,
-                    line_number=node.lineno
+                    line_number=node.lineno,
+                    start_line_number=self._start_line(node),
+                    end_line_number=node.end_lineno,
+                    body_statements=len(statement_kinds),
+                    statement_kinds=statement_kinds,
+                    member_kinds=self._statement_kinds(node, nested=False),
+                    method_functions=method_functions,
+                    fingerprint=fingerprint,
+                    fingerprint_names=fingerprint_names
                 ))
         
         logger.info(f"Extracted {len(classes)} classes")
@@ -0,0 +1,142 @@
+# ==========================================
+# BACKEND - backend/app/service/pipeline.py
+# ==========================================
+import time
+from typing import Any, Dict, List, Optional
+from .ai import PROMPT_TEMPLATE_VERSION
+from .analyser import ANALYSIS_STAGES, CodeAnalyzer, ProgressCallback
+from .dag import run_cpu
+from .incremental import build_symbol_index
+from ..config import get_settings
+from ..models.schemas import CodeAnalysisResponse
+from ..storage.analysis import AnalysisStore, analysis_cache_key
+from ..storage.pdf import PDFGenerator
+from ..storage.file import FileStorage
+from ..utils.logger import setup_logger
+from ..utils.source import SourceIndex
+
+logger = setup_logger(__name__)
+
+# Stages of a full analysis as seen by API clients: the analyzer's, then the report
+PIPELINE_STAGES = ANALYSIS_STAGES + ("report",)
+
+# Fields of each list section that go into the API response
+SECTION_FIELDS: Dict[str, List[str]] = {
+    "variables": ["name", "type", "scope", "line_number", "occurrences"],
+    "functions": [
+        "name", "parameters", "return_type", "docstring", "line_number",
+        "logic_explanation", "variables_used", "occurrences", "explanation_source", "carried_over"
+    ],
+    "classes": [
+        "name", "methods", "attributes", "base_classes", "docstring", "line_number",
+        "detailed_explanation", "method_explanations", "explanation_source", "carried_over"
+    ],
+    "imports": ["module", "names", "line_number", "purpose"],
+    "errors": ["severity", "message", "line_number", "category"],
+    "suggestions": ["category", "title", "description", "code_example", "priority"]
+}
+
+def serialize_sections(sections: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn analyzer output (model lists or plain values) into response fields"""
+    serialized = {}
+    for name, value in sections.items():
+        fields = SECTION_FIELDS.get(name)
+        if fields is None:
+            serialized[name] = value
+        else:
+            serialized[name] = [{field: getattr(item, field) for field in fields} for item in value]
+    return serialized
+
+def build_response_dict(analysis: CodeAnalysisResponse, file_id: str) -> Dict[str, Any]:
+    """The JSON payload returned for a finished analysis"""
+    response = serialize_sections({
+        "overview": analysis.overview,
+        "detailed_overview": analysis.detailed_overview,
+        **{name: getattr(analysis, name) for name in SECTION_FIELDS}
+    })
+    response.update({
+        "stats": analysis.stats,
+        "file_id": file_id,
+        "pdf_ready": True
+    })
+    return response
+
+def _add_report_timing(pipeline: Optional[Dict[str, Any]], seconds: float):
+    """Append the report node to the analyzer's stage timings"""
+    if not pipeline:
+        return
+    duration = round(seconds * 1000, 1)
+    start = pipeline["wall_ms"]
+    pipeline["nodes"]["report"] = {
+        "start_ms": start,
+        "end_ms": round(start + duration, 1),
+        "duration_ms": duration,
+        "deps": list(pipeline["nodes"]),
+        "cpu": True
+    }
+    pipeline["wall_ms"] = round(start + duration, 1)
+    pipeline["critical_path"].append("report")
+    pipeline["critical_path_ms"] = round(pipeline["critical_path_ms"] + duration, 1)
+
+async def run_analysis(
+    code: str,
+    filename: str,
+    client_id: str = "anonymous",
+    progress: Optional[ProgressCallback] = None,
+    refresh: bool = False,
+    previous_analysis_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Analyze, save the report and build the response; progress sees every PIPELINE_STAGES entry and each explanation.
+
+    An unchanged source analysed with the same models, prompts and app
+    version is answered from the AnalysisStore unless refresh is set.
+    With previous_analysis_id, only symbols changed since that analysis are
+    explained again.
+    """
+    report = progress or (lambda stage, partial: None)
+    settings = get_settings()
+    analyzer = CodeAnalyzer(client_id=client_id)
+    store = AnalysisStore()
+    cache_key = analysis_cache_key(
+        code, analyzer.ai_service.models.values(), PROMPT_TEMPLATE_VERSION, settings.APP_VERSION
+    )
+
+    cached = None if refresh else await run_cpu(store.lookup, cache_key)
+    if cached is not None:
+        logger.info(f"Serving cached analysis {cached['file_id']} for {filename}")
+        for stage in PIPELINE_STAGES:
+            report(stage, {})
+        return {**cached["result"], "cached": True}
+
+    previous = None
+    if previous_analysis_id:
+        previous = await run_cpu(store.get, previous_analysis_id)
+        if previous is None:
+            logger.warning(f"Previous analysis {previous_analysis_id} not found, analysing {filename} in full")
+
+    analysis = await analyzer.analyze(code, filename, progress=report, previous=previous)
+
+    def write_report():
+        # Generate PDF report
+        pdf_generator = PDFGenerator()
+        pdf_html = pdf_generator.generate_formal_report(analysis, filename, code)
+
+        # Save PDF
+        storage = FileStorage()
+        return storage.save_pdf(pdf_html, filename)
+
+    # The report needs every stage's output, so it always ends the critical path
+    started = time.monotonic()
+    file_id, pdf_path = await run_cpu(write_report)
+    _add_report_timing(analysis.stats.get("pipeline"), time.monotonic() - started)
+    report("report", {"file_id": file_id})
+
+    response = build_response_dict(analysis, file_id)
+    symbols = build_symbol_index(SourceIndex(code), analysis.functions, analysis.classes)
+    degraded = analysis.stats.get("degraded", False)
+    if degraded:
+        logger.info(f"Not caching analysis {file_id}: parts of it are fallbacks")
+    await run_cpu(store.save, cache_key, file_id, filename, code, response, symbols, not degraded)
+
+    logger.info(f"Analysis complete. File ID: {file_id}")
+    return {**response, "cached": False}
\ No newline at end of file
@@ -0,0 +1,79 @@
+# ==========================================
+# BACKEND - backend/app/service/prefix.py
+# ==========================================
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+from ..models.schemas import Function, Class, Import
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Prompt types that are asked once per symbol and share the file prefix
+PREFIX_PROMPT_TYPES = {"function", "class", "functions_batch"}
+
+class FilePromptContext:
+    """Stable per-file prompt prefix: module outline plus import list.
+    
+    Every per-symbol prompt for a file starts with the same prefix, so Ollama
+    only has to evaluate it once. In "context" mode the prefix is primed once
+    per model and the returned ``context`` tokens are sent with each call; in
+    "system" mode it is sent as the system prompt and the runner's prompt
+    cache reuses the matching leading tokens.
+    """
+
+    def __init__(self, filename: str, text: str):
+        self.filename = filename
+        self.text = text
+        self._contexts: Dict[str, Optional[List[int]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    def build(
+        cls,
+        filename: str,
+        functions: List[Function],
+        classes: List[Class],
+        imports: List[Import]
+    ) -> "FilePromptContext":
+        lines = [
+            f"You are documenting the Python module `{filename}`.",
+            "Use this outline of the whole module as context for every question about it.",
+            "",
+            "MODULE OUTLINE:"
+        ]
+        
+        if functions:
+            lines.append("Functions:")
+            for func in functions:
+                returns = f" -> {func.return_type}" if func.return_type else ""
+                lines.append(f"- {func.name}({', '.join(func.parameters)}){returns} [line {func.line_number}]")
+        if classes:
+            lines.append("Classes:")
+            for cls_ in classes:
+                bases = f"({', '.join(cls_.base_classes)})" if cls_.base_classes else ""
+                methods = ', '.join(cls_.methods) or 'none'
+                lines.append(f"- {cls_.name}{bases}: methods {methods} [line {cls_.line_number}]")
+        if imports:
+            lines.append("Imports:")
+            for imp in imports:
+                names = [name for name in imp.names if name != imp.module]
+                lines.append(f"- {imp.module or '.'}" + (f": {', '.join(names)}" if names else ""))
+        
+        return cls(filename, '\n'.join(lines))
+
+    async def context_for(
+        self,
+        model: str,
+        prime: Callable[[str, str], Awaitable[Optional[List[int]]]]
+    ) -> Optional[List[int]]:
+        """Prime the prefix once per model; concurrent callers wait for that one call"""
+        if model in self._contexts:
+            return self._contexts[model]
+        
+        lock = self._locks.setdefault(model, asyncio.Lock())
+        async with lock:
+            if model not in self._contexts:
+                self._contexts[model] = await prime(model, self.text)
+                if self._contexts[model] is None:
+                    logger.info(f"Prefix priming unavailable for {model}; sending prefix as system prompt")
+        return self._contexts[model]
@@ -0,0 +1,65 @@
+# ==========================================
+# BACKEND - backend/app/service/router.py
+# ==========================================
+import re
+from typing import Dict
+from ..config import get_settings
+from ..utils.logger import setup_logger
+from ..utils.tokens import estimate_tokens
+
+logger = setup_logger(__name__)
+
+TIERS = ("fast", "balanced", "quality")
+
+# Prompt types whose tier does not depend on the snippet
+FIXED_TIERS = {
+    "overview": "balanced",
+    "detailed_overview": "quality",
+    "imports_batch": "balanced",
+    "suggestions": "balanced",
+    "json_repair": "fast"
+}
+
+# Decision points counted by the cheap complexity score
+_BRANCH_PATTERN = re.compile(r"\b(if|elif|for|while|except|with|and|or|case|lambda)\b")
+
+def complexity_score(snippet: str) -> int:
+    """Rough cyclomatic-style score: branch keywords plus nesting depth"""
+    if not snippet:
+        return 0
+    branches = len(_BRANCH_PATTERN.findall(snippet))
+    indents = [len(line) - len(line.lstrip()) for line in snippet.split('\n') if line.strip()]
+    depth = (max(indents) - min(indents)) // 4 if indents else 0
+    return branches + depth
+
+class ModelRouter:
+    """Pick a model tier from prompt type, snippet size and complexity"""
+
+    def __init__(self):
+        self.settings = get_settings()
+        default = self.settings.OLLAMA_MODEL
+        self.models: Dict[str, str] = {
+            "fast": self.settings.OLLAMA_MODEL_FAST or default,
+            "balanced": self.settings.OLLAMA_MODEL_BALANCED or default,
+            "quality": self.settings.OLLAMA_MODEL_QUALITY or default
+        }
+
+    def choose_tier(self, prompt_type: str, snippet: str = "") -> str:
+        """Tier for a prompt; per-symbol prompts are sized by their snippet"""
+        if prompt_type in FIXED_TIERS:
+            return FIXED_TIERS[prompt_type]
+        
+        tokens = estimate_tokens(snippet)
+        score = complexity_score(snippet)
+        if tokens <= self.settings.ROUTER_FAST_MAX_TOKENS and score <= self.settings.ROUTER_FAST_MAX_COMPLEXITY:
+            tier = "fast"
+        elif tokens >= self.settings.ROUTER_QUALITY_MIN_TOKENS or score >= self.settings.ROUTER_QUALITY_MIN_COMPLEXITY:
+            tier = "quality"
+        else:
+            tier = "balanced"
+        
+        logger.debug(f"Routing {prompt_type} ({tokens} tokens, complexity {score}) to {tier} tier")
+        return tier
+
+    def choose_model(self, prompt_type: str, snippet: str = "") -> str:
+        return self.models[self.choose_tier(prompt_type, snippet)]
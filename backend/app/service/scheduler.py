@@ -0,0 +1,139 @@
+# ==========================================
+# BACKEND - backend/app/service/scheduler.py
+# ==========================================
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List
+from ..config import get_settings
+from .backends import get_backend_pool
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Lower runs first: overviews, then functions, classes, imports, suggestions
+PRIORITIES = {
+    "overview": 0,
+    "detailed_overview": 0,
+    "function": 1,
+    "functions_batch": 1,
+    "class": 2,
+    "imports_batch": 3,
+    "suggestions": 4
+}
+DEFAULT_PRIORITY = 2
+
+class _Ticket:
+    __slots__ = ("priority", "start", "finish", "seq", "client_id", "future")
+
+    def __init__(self, priority: int, start: float, finish: float, seq: int, client_id: str, future: asyncio.Future):
+        self.priority = priority
+        self.start = start
+        self.finish = finish
+        self.seq = seq
+        self.client_id = client_id
+        self.future = future
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.finish, self.seq) < (other.priority, other.finish, other.seq)
+
+class LLMScheduler:
+    """Process-wide admission control for every Ollama call.
+    
+    At most the backend pool's capacity (``OLLAMA_SERVER_PARALLEL`` per
+    backend unless overridden) runs at once. Waiting calls are served by
+    priority class first; within a class, clients share the servers
+    by weighted fair queueing (start-time fair queueing on virtual finish
+    tags), so one large upload cannot starve a small interactive one.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.max_concurrency = max(1, get_backend_pool().capacity)
+        self.client_weights: Dict[str, float] = settings.SCHEDULER_CLIENT_WEIGHTS
+        
+        self._running = 0
+        self._queue: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._client_finish: Dict[str, float] = {}
+        self._served: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, prompt_type: str, client_id: str = "anonymous", cost: float = 1.0) -> AsyncIterator[None]:
+        """Hold one of the global concurrency slots for the duration of a call"""
+        await self._acquire(prompt_type, client_id, cost)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, prompt_type: str, client_id: str, cost: float):
+        priority = PRIORITIES.get(prompt_type, DEFAULT_PRIORITY)
+        weight = max(self.client_weights.get(client_id, 1.0), 0.01)
+        start = max(self._virtual_time, self._client_finish.get(client_id, 0.0))
+        finish = start + cost / weight
+        self._client_finish[client_id] = finish
+        
+        if self._running < self.max_concurrency and not self._queue:
+            self._grant(client_id, start)
+            return
+        
+        ticket = _Ticket(priority, start, finish, next(self._seq), client_id, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, ticket)
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                # Slot was handed over just as we were cancelled: give it back
+                self._release()
+            else:
+                ticket.future.cancel()
+            raise
+
+    def _grant(self, client_id: str, virtual_start: float):
+        self._running += 1
+        self._virtual_time = max(self._virtual_time, virtual_start)
+        self._served[client_id] = self._served.get(client_id, 0) + 1
+
+    def _release(self):
+        self._running -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._running < self.max_concurrency and self._queue:
+            ticket = heapq.heappop(self._queue)
+            if ticket.future.done():
+                continue
+            self._grant(ticket.client_id, ticket.start)
+            ticket.future.set_result(None)
+        
+        if not self._queue:
+            # Tags at or behind virtual time carry no credit; drop idle clients
+            self._client_finish = {
+                client_id: finish
+                for client_id, finish in self._client_finish.items()
+                if finish > self._virtual_time
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        waiting = [ticket for ticket in self._queue if not ticket.future.done()]
+        by_priority: Dict[str, int] = {}
+        by_client: Dict[str, int] = {}
+        for ticket in waiting:
+            by_priority[str(ticket.priority)] = by_priority.get(str(ticket.priority), 0) + 1
+            by_client[ticket.client_id] = by_client.get(ticket.client_id, 0) + 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self._running,
+            "queued": len(waiting),
+            "queued_by_priority": by_priority,
+            "queued_by_client": by_client,
+            "served_by_client": dict(self._served)
+        }
+
+@lru_cache()
+def get_scheduler() -> LLMScheduler:
+    return LLMScheduler()
@@ -0,0 +1,67 @@
+# ==========================================
+# BACKEND - backend/app/service/singleflight.py
+# ==========================================
+import asyncio
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key onto one underlying task.
+    
+    The first caller for a key starts the work; later callers await the same
+    task. Results and exceptions reach every waiter. A waiter that is
+    cancelled only detaches itself; the shared task is cancelled once the
+    last waiter has gone.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _, key=key, flight=flight: self._forget(key, flight))
+            self._started += 1
+        else:
+            self._coalesced += 1
+            logger.debug(f"Coalescing onto in-flight call {key[:12]} ({flight.waiters} waiting)")
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody wants the result any more; drop the key first so a new
+                # caller starts fresh instead of joining a cancelled task
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "started": self._started,
+            "coalesced": self._coalesced
+        }
+
+@lru_cache()
+def get_singleflight() -> SingleFlight:
+    return SingleFlight()
@@ -0,0 +1,180 @@
+# ==========================================
+# BACKEND - backend/app/service/structured.py
+# ==========================================
+import json
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
+from ..config import get_settings
+from ..models.schemas import Suggestion
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class StructuredOutputError(Exception):
+    """Raised when a JSON-mode reply cannot be parsed even after repair"""
+
+class IndexedExplanation(BaseModel):
+    index: int
+    explanation: str
+
+def _indexed_schema(key: str) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": {
+            key: {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {"type": "integer"},
+                        "explanation": {"type": "string"}
+                    },
+                    "required": ["index", "explanation"]
+                }
+            }
+        },
+        "required": [key]
+    }
+
+# JSON schemas sent as Ollama's ``format`` for each structured prompt type
+SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "suggestions": {
+        "type": "object",
+        "properties": {
+            "suggestions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "category": {"type": "string"},
+                        "title": {"type": "string"},
+                        "description": {"type": "string"},
+                        "priority": {"type": "string", "enum": ["High", "Medium", "Low"]},
+                        "code_example": {"type": "string"}
+                    },
+                    "required": ["category", "title", "description", "priority"]
+                }
+            }
+        },
+        "required": ["suggestions"]
+    },
+    "imports_batch": _indexed_schema("imports"),
+    "functions_batch": _indexed_schema("functions")
+}
+
+def response_format_for(prompt_type: str) -> Optional[Any]:
+    """Ollama ``format`` value: the task schema, or plain "json" for older servers"""
+    schema = SCHEMAS.get(prompt_type)
+    if schema is None:
+        return None
+    return "json" if get_settings().OLLAMA_STRUCTURED_FORMAT == "json" else schema
+
+def repair_json(text: str) -> str:
+    """Cheap local fixes for the usual ways a JSON reply goes wrong.
+
+    Strips markdown fences and surrounding prose, drops trailing commas and
+    closes strings and brackets left open when num_predict cut the reply off.
+    """
+    text = re.sub(r"```(?:json)?", "", text).strip()
+    starts = [pos for pos in (text.find("{"), text.find("[")) if pos != -1]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    stack: List[str] = []
+    in_string = escaped = False
+    end = len(text)
+    for pos, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                end = pos + 1
+                break
+
+    text = text[:end]
+    if in_string:
+        text += '"'
+    # A value cut off after its key or a dangling comma cannot be closed as-is
+    text = re.sub(r',\s*"[^"]*"\s*:?\s*$', "", text)
+    text = re.sub(r"[,:]\s*$", "", text)
+    text += "".join(reversed(stack))
+    return re.sub(r",\s*([}\]])", r"\1", text)
+
+class StructuredParser:
+    """Parses JSON-mode replies and counts how often each repair step was needed"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, prompt_type: str, outcome: str):
+        with self._lock:
+            counts = self._stats.setdefault(prompt_type, {"strict": 0, "repaired": 0, "llm_repaired": 0, "failed": 0})
+            counts[outcome] += 1
+
+    def load(self, text: str, prompt_type: str) -> Tuple[Any, str]:
+        """json.loads, falling back to a local repair pass; returns (data, outcome)"""
+        try:
+            return json.loads(text), "strict"
+        except (json.JSONDecodeError, TypeError):
+            pass
+        try:
+            data = json.loads(repair_json(text or ""))
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"Unparseable {prompt_type} reply: {e}")
+        logger.debug(f"Repaired malformed JSON reply for {prompt_type}")
+        return data, "repaired"
+
+    def suggestions(self, text: str, llm_repaired: bool = False) -> List[Suggestion]:
+        data, outcome = self.load(text, "suggestions")
+        items = data.get("suggestions", []) if isinstance(data, dict) else data
+        suggestions = []
+        for item in items if isinstance(items, list) else []:
+            try:
+                suggestions.append(Suggestion.model_validate(item))
+            except ValidationError as e:
+                logger.debug(f"Dropping invalid suggestion: {e.errors()[0]['msg']}")
+        if not suggestions:
+            raise StructuredOutputError("Suggestions reply contained no valid items")
+        self.record("suggestions", "llm_repaired" if llm_repaired else outcome)
+        return suggestions
+
+    def indexed(self, text: str, prompt_type: str, key: str, count: int, llm_repaired: bool = False) -> Dict[int, str]:
+        """Parse {key: [{index, explanation}]} into {zero-based index: explanation}"""
+        data, outcome = self.load(text, prompt_type)
+        items = data.get(key, []) if isinstance(data, dict) else data
+        explanations: Dict[int, str] = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                entry = IndexedExplanation.model_validate(item)
+            except ValidationError:
+                continue
+            if 1 <= entry.index <= count and entry.explanation.strip():
+                explanations[entry.index - 1] = entry.explanation.strip()
+        if not explanations:
+            raise StructuredOutputError(f"{prompt_type} reply contained no valid items")
+        self.record(prompt_type, "llm_repaired" if llm_repaired else outcome)
+        return explanations
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {prompt_type: dict(counts) for prompt_type, counts in self._stats.items()}
+
+@lru_cache()
+def get_structured_parser() -> StructuredParser:
+    return StructuredParser()
\ No newline at end of file
@@ -0,0 +1,83 @@
+# ==========================================
+# BACKEND - backend/app/service/usage.py
+# ==========================================
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Ollama reports durations in nanoseconds
+_NS = 1e9
+
+class UsageTracker:
+    """Aggregate Ollama eval metrics per (prompt type, model)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def record(self, prompt_type: str, model: str, result: Dict[str, Any]):
+        """Add the counters from a final (done) generate response"""
+        with self._lock:
+            usage = self._usage.setdefault((prompt_type, model), {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "prompt_eval_seconds": 0.0,
+                "eval_seconds": 0.0,
+                "load_seconds": 0.0,
+                "total_seconds": 0.0,
+                "truncated": 0
+            })
+            usage["calls"] += 1
+            usage["prompt_tokens"] += result.get("prompt_eval_count", 0) or 0
+            usage["completion_tokens"] += result.get("eval_count", 0) or 0
+            usage["prompt_eval_seconds"] += (result.get("prompt_eval_duration", 0) or 0) / _NS
+            usage["eval_seconds"] += (result.get("eval_duration", 0) or 0) / _NS
+            usage["load_seconds"] += (result.get("load_duration", 0) or 0) / _NS
+            usage["total_seconds"] += (result.get("total_duration", 0) or 0) / _NS
+            # done_reason "length" means num_predict cut the reply off
+            if result.get("done_reason") == "length":
+                usage["truncated"] += 1
+        
+        logger.debug(
+            f"{prompt_type} on {model}: {result.get('prompt_eval_count', 0)} tokens in, "
+            f"{result.get('eval_count', 0)} tokens out"
+        )
+
+    def _summarize(self, usage: Dict[str, float]) -> Dict[str, Any]:
+        summary = {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in usage.items()
+        }
+        summary["tokens_per_second"] = (
+            round(usage["completion_tokens"] / usage["eval_seconds"], 2) if usage["eval_seconds"] else 0.0
+        )
+        summary["prompt_tokens_per_second"] = (
+            round(usage["prompt_tokens"] / usage["prompt_eval_seconds"], 2) if usage["prompt_eval_seconds"] else 0.0
+        )
+        return summary
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per prompt type/model aggregates plus overall totals"""
+        with self._lock:
+            items = {key: dict(usage) for key, usage in self._usage.items()}
+        
+        totals: Dict[str, float] = {}
+        for usage in items.values():
+            for key, value in usage.items():
+                totals[key] = totals.get(key, 0) + value
+        
+        return {
+            "by_prompt": {
+                f"{prompt_type}:{model}": self._summarize(usage)
+                for (prompt_type, model), usage in sorted(items.items())
+            },
+            "totals": self._summarize(totals) if totals else {}
+        }
+
+@lru_cache()
+def get_usage_tracker() -> UsageTracker:
+    return UsageTracker()
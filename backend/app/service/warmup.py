@@ -0,0 +1,109 @@
+# ==========================================
+# BACKEND - backend/app/service/warmup.py
+# ==========================================
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import httpx
+from ..config import get_settings
+from .http_pool import get_http_pool
+from .backends import OllamaBackend, get_backend_pool
+from .router import ModelRouter
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def keep_alive_for(model: str) -> str:
+    """How long Ollama should keep a model loaded after each request"""
+    settings = get_settings()
+    return settings.OLLAMA_KEEP_ALIVE_PER_MODEL.get(model, settings.OLLAMA_KEEP_ALIVE)
+
+class ModelWarmup:
+    """Preload the configured models at startup so no user request pays the load time"""
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    DEGRADED = "degraded"
+    DISABLED = "disabled"
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.models: List[str] = sorted(set(ModelRouter().models.values()))
+        self.status = self.PENDING if self.settings.OLLAMA_WARMUP_ENABLED else self.DISABLED
+        # model -> backend url -> warm-up result
+        self.results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.READY, self.DEGRADED, self.DISABLED)
+
+    def start(self):
+        """Run the warm-up in the background; /health reports readiness when it ends"""
+        if self.status == self.DISABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        self.status = self.RUNNING
+        logger.info(f"Warming up models: {', '.join(self.models)}")
+        
+        # Backends warm in parallel, but one model at a time on each: loading
+        # several at once on a CPU box just thrashes memory
+        await asyncio.gather(*(self._warm_backend(backend) for backend in get_backend_pool().backends))
+        
+        failed = sorted(
+            f"{model}@{url}"
+            for model, per_backend in self.results.items()
+            for url, result in per_backend.items()
+            if not result["loaded"]
+        )
+        self.status = self.DEGRADED if failed else self.READY
+        if failed:
+            logger.warning(f"Model warm-up finished with failures: {', '.join(failed)}")
+        else:
+            logger.info("Model warm-up complete")
+
+    async def _warm_backend(self, backend: OllamaBackend):
+        for model in self.models:
+            if backend.serves(model):
+                self.results.setdefault(model, {})[backend.url] = await self._warm(model, backend)
+
+    async def _warm(self, model: str, backend: OllamaBackend) -> Dict[str, Any]:
+        """Load a model with a one-token generate call and pin its keep_alive"""
+        keep_alive = keep_alive_for(model)
+        client = get_http_pool().client(backend.url)
+        started = time.monotonic()
+        try:
+            response = await client.post(
+                "/api/generate",
+                json={
+                    "model": model,
+                    "prompt": "Hello",
+                    "stream": False,
+                    "keep_alive": keep_alive,
+                    "options": {"num_predict": 1}
+                },
+                timeout=httpx.Timeout(self.settings.OLLAMA_WARMUP_TIMEOUT, connect=self.settings.OLLAMA_CONNECT_TIMEOUT)
+            )
+            response.raise_for_status()
+            result = response.json()
+            seconds = round(time.monotonic() - started, 2)
+            load_seconds = round(result.get("load_duration", 0) / 1e9, 2)
+            logger.info(f"Warmed up {model} on {backend.url} in {seconds}s (load {load_seconds}s, keep_alive {keep_alive})")
+            return {"loaded": True, "seconds": seconds, "load_seconds": load_seconds, "keep_alive": keep_alive}
+        except Exception as e:
+            logger.error(f"Warm-up failed for {model} on {backend.url}: {str(e)}")
+            return {"loaded": False, "error": str(e), "keep_alive": keep_alive}
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"status": self.status, "models": self.results}
+
+@lru_cache()
+def get_model_warmup() -> ModelWarmup:
+    return ModelWarmup()
@@ -0,0 +1,138 @@
+# ==========================================
+# BACKEND - backend/app/storage/analysis.py
+# ==========================================
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from ..config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def source_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+def analysis_cache_key(code: str, models: Iterable[str], template_version: str, app_version: str) -> str:
+    """Everything that decides a full analysis result: source, models, prompts, app"""
+    digest = hashlib.sha256()
+    for part in (source_hash(code), ",".join(sorted(set(models))), template_version, app_version):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+class AnalysisStore:
+    """Finished analyses on disk, next to their reports.
+
+    Each record is ``analyses/<file_id>.json`` holding the response payload,
+    per-symbol span hashes and the cache key it was computed for;
+    ``analyses/keys/<cache_key>`` points at the file_id currently cached
+    for that key.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.enabled = self.settings.ANALYSIS_CACHE_ENABLED
+        self.ttl = self.settings.ANALYSIS_CACHE_TTL_SECONDS
+        self.root = Path(self.settings.OUTPUT_DIR) / "analyses"
+        self.keys = self.root / "keys"
+        self.keys.mkdir(parents=True, exist_ok=True)
+
+    def _record_path(self, file_id: str) -> Path:
+        return self.root / f"{Path(file_id).name}.json"
+
+    def _write(self, path: Path, content: str):
+        # Write then rename, so readers never see a half-written file
+        temp = path.with_suffix(path.suffix + ".tmp")
+        temp.write_text(content, encoding="utf-8")
+        os.replace(temp, path)
+
+    def save(
+        self,
+        cache_key: str,
+        file_id: str,
+        filename: str,
+        code: str,
+        result: Dict[str, Any],
+        symbols: Optional[Dict[str, Any]] = None,
+        cacheable: bool = True
+    ):
+        """Store a finished analysis; symbols (span hashes per function/class) enable incremental re-analysis.
+        
+        A record that is not cacheable stays readable by id but is never
+        served for its cache key.
+        """
+        record = {
+            "file_id": file_id,
+            "cache_key": cache_key,
+            "filename": filename,
+            "source_sha256": source_hash(code),
+            "created_at": time.time(),
+            "result": result,
+            "symbols": symbols or {}
+        }
+        try:
+            self._write(self._record_path(file_id), json.dumps(record))
+            if self.enabled and cacheable:
+                self._write(self.keys / cache_key, file_id)
+            logger.debug(f"Stored analysis {file_id}")
+        except OSError as e:
+            logger.warning(f"Could not store analysis {file_id}: {e}")
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """The stored record for an analysis, or None"""
+        path = self._record_path(file_id)
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable analysis record {path}: {e}")
+            return None
+
+    def lookup(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """The cached record for a cache key, if it is fresh and its report still exists"""
+        if not self.enabled:
+            return None
+        pointer = self.keys / cache_key
+        try:
+            file_id = pointer.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+
+        record = self.get(file_id)
+        if record is None or record.get("cache_key") != cache_key:
+            pointer.unlink(missing_ok=True)
+            return None
+        if self.ttl > 0 and time.time() - record["created_at"] > self.ttl:
+            logger.info(f"Cached analysis {file_id} expired")
+            pointer.unlink(missing_ok=True)
+            return None
+        if not any((Path(self.settings.OUTPUT_DIR) / "reports").glob(f"report_{file_id}_*")):
+            logger.info(f"Report for cached analysis {file_id} is gone, recomputing")
+            pointer.unlink(missing_ok=True)
+            return None
+        return record
+
+    def invalidate(self, file_id: str) -> bool:
+        """Stop serving an analysis from the cache; its record stays readable by id"""
+        record = self.get(file_id)
+        if record is None:
+            return False
+        pointer = self.keys / record["cache_key"]
+        try:
+            if pointer.read_text(encoding="utf-8").strip() == file_id:
+                pointer.unlink()
+        except OSError:
+            pass
+        return True
+
+    def clear(self) -> int:
+        """Drop every cache pointer; returns how many were removed"""
+        removed = 0
+        for pointer in self.keys.iterdir():
+            pointer.unlink(missing_ok=True)
+            removed += 1
+        return removed
\ No newline at end of file
@@ -0,0 +1,150 @@
+# ==========================================
+# BACKEND - backend/app/utils/source.py
+# ==========================================
+import ast
+import textwrap
+from typing import Dict, List, Optional, Tuple
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+# Statements whose header line shows the control structure of a body
+_COMPOUND = (
+    ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.If, ast.For, ast.AsyncFor,
+    ast.While, ast.Try, ast.With, ast.AsyncWith, ast.Match
+)
+_EXITS = (ast.Return, ast.Raise)
+
+# Line priorities: signature and docstring always stay, control lines next
+SIGNATURE, CONTROL, BODY = 0, 1, 2
+
+class SourceIndex:
+    """Line-offset index over one source file, built once per analysis.
+
+    ``span`` slices an exact line range straight out of the original string
+    instead of re-splitting the file for every symbol.
+    """
+
+    def __init__(self, code: str, max_tokens: int = 0):
+        self.code = code
+        self.max_tokens = max_tokens
+        self._offsets = [0]
+        position = code.find("\n")
+        while position != -1:
+            self._offsets.append(position + 1)
+            position = code.find("\n", position + 1)
+        self._snippets: Dict[Tuple[int, int], str] = {}
+
+    @property
+    def line_count(self) -> int:
+        return len(self._offsets)
+
+    def span(self, start_line: int, end_line: Optional[int] = None) -> str:
+        """Lines start_line..end_line (1-based, inclusive) without the trailing newline"""
+        start_line = max(1, start_line)
+        end_line = min(self.line_count, end_line or start_line)
+        if start_line > end_line:
+            return ""
+        start = self._offsets[start_line - 1]
+        end = self._offsets[end_line] - 1 if end_line < self.line_count else len(self.code)
+        return self.code[start:end]
+
+    def snippet(self, start_line: int, end_line: Optional[int]) -> str:
+        """Exact span of a symbol, truncated to the token budget; memoized per span"""
+        key = (start_line, end_line or start_line)
+        cached = self._snippets.get(key)
+        if cached is None:
+            cached = fit_snippet(self.span(*key), self.max_tokens)
+            self._snippets[key] = cached
+        return cached
+
+def _line_priorities(snippet: str, lines: List[str]) -> List[int]:
+    line_count = len(lines)
+    priorities = [BODY] * line_count
+    try:
+        tree = ast.parse(textwrap.dedent(snippet))
+    except SyntaxError:
+        return priorities
+
+    def mark(first: int, last: int, priority: int):
+        for line in range(first, min(last, line_count) + 1):
+            priorities[line - 1] = min(priorities[line - 1], priority)
+
+    def docstring_node(node) -> Optional[ast.AST]:
+        first = node.body[0] if node.body else None
+        if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+            return first
+        return None
+
+    outer = tree.body[0] if tree.body else None
+    for node in ast.walk(tree):
+        if isinstance(node, _COMPOUND):
+            # Header runs up to the line before the body (multi-line signatures included)
+            body_start = node.body[0].lineno if getattr(node, "body", None) else node.lineno + 1
+            mark(node.lineno, max(node.lineno, body_start - 1), SIGNATURE if node is outer else CONTROL)
+            for block in ("orelse", "finalbody"):
+                statements = getattr(node, block, None)
+                if not statements:
+                    continue
+                if isinstance(node, ast.If) and isinstance(statements[0], ast.If) and statements[0].col_offset == node.col_offset:
+                    continue  # "elif" is itself an If header
+                # "else:" / "finally:" is the nearest code line above the block
+                line = statements[0].lineno - 1
+                while line > 1 and not lines[line - 1].strip().startswith(("else", "finally")):
+                    line -= 1
+                mark(line, line, CONTROL)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                docstring = docstring_node(node)
+                if docstring is not None:
+                    mark(docstring.lineno, docstring.end_lineno, SIGNATURE if node is outer else CONTROL)
+        elif isinstance(node, (ast.ExceptHandler, ast.match_case)):
+            line = getattr(node, "lineno", None) or node.pattern.lineno
+            mark(line, line, CONTROL)
+        elif isinstance(node, _EXITS) or (isinstance(node, ast.Expr) and isinstance(node.value, (ast.Yield, ast.YieldFrom))):
+            mark(node.lineno, node.end_lineno, CONTROL)
+    return priorities
+
+def fit_snippet(snippet: str, max_tokens: int) -> str:
+    """Shrink a symbol's source to roughly max_tokens.
+
+    The signature and docstring are always kept; then control-structure
+    lines (nested headers, else/except, return/raise/yield); then plain body
+    lines in order while they fit. Each omitted run becomes one marker line.
+    """
+    if max_tokens <= 0 or estimate_tokens(snippet) <= max_tokens:
+        return snippet
+
+    lines = snippet.split("\n")
+    priorities = _line_priorities(snippet, lines)
+    if all(priority == BODY for priority in priorities):
+        priorities[0] = SIGNATURE
+
+    keep = [False] * len(lines)
+    budget = max_tokens * CHARS_PER_TOKEN
+    for tier in (SIGNATURE, CONTROL, BODY):
+        for idx, line in enumerate(lines):
+            if keep[idx] or priorities[idx] != tier:
+                continue
+            cost = len(line) + 1
+            if tier != SIGNATURE and cost > budget:
+                if tier == BODY:
+                    break
+                continue
+            keep[idx] = True
+            budget -= cost
+
+    result: List[str] = []
+    omitted = 0
+    for idx, line in enumerate(lines):
+        if keep[idx]:
+            if omitted:
+                result.append(_omission(lines[idx - omitted], omitted))
+                omitted = 0
+            result.append(line)
+        else:
+            omitted += 1
+    if omitted:
+        result.append(_omission(lines[len(lines) - omitted], omitted))
+    return "\n".join(result)
+
+def _omission(first_line: str, count: int) -> str:
+    indent = first_line[:len(first_line) - len(first_line.lstrip())]
+    return f"{indent}# ... {count} line(s) omitted"
\ No newline at end of file
@@ -0,0 +1,10 @@
+# ==========================================
+# BACKEND - backend/app/utils/tokens.py
+# ==========================================
+
+# Code tokenizes at roughly four characters per token for the models we run
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting prompts"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
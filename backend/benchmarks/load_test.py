@@ -0,0 +1,184 @@
+# ==========================================
+# BACKEND - backend/benchmarks/load_test.py
+# ==========================================
+"""Reproducible load test of CodeAnalyzer or the HTTP routes against the Ollama stub.
+
+Starts the stub in-process on a free port (unless --ollama-url points at a
+running Ollama or stub), then runs --requests analyses of the given file with
+--concurrency of them in flight, and reports latency percentiles, throughput
+and what the stub served. The LLM cache is disabled unless --cache is given.
+
+Usage (from backend/):
+    python -m benchmarks.load_test path/to/module.py [--requests 20] [--concurrency 4]
+        [--target analyzer|routes] [--url http://localhost:8000]
+        [--stub-args "--latency lognormal:-1,0.5 --tps 40 --error-rate 0.05 --time-scale 0.2"]
+        [--unique] [--json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import socket
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def start_stub(stub_args: str):
+    """Run the stub in this event loop; returns (uvicorn server, serve task, url)"""
+    import uvicorn
+    from stub.ollama import build_parser, create_app
+
+    args = build_parser().parse_args(shlex.split(stub_args))
+    args.port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(args), host="127.0.0.1", port=args.port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task, f"http://127.0.0.1:{args.port}"
+
+async def run_analyzer(index: int, code: str, filename: str) -> None:
+    from app.service.analyser import CodeAnalyzer
+
+    await CodeAnalyzer(client_id=f"load-{index}").analyze(code, filename)
+
+async def run_route(client, index: int, code: str, filename: str) -> None:
+    response = await client.post(
+        "/api/analyze",
+        files={"file": (filename, code.encode("utf-8"), "text/x-python")},
+        headers={"X-Client-ID": f"load-{index}"}
+    )
+    response.raise_for_status()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Python file to analyse")
+    parser.add_argument("--requests", type=int, default=20, help="Total analyses to run")
+    parser.add_argument("--concurrency", type=int, default=4, help="Analyses in flight at once")
+    parser.add_argument("--target", choices=("analyzer", "routes"), default="analyzer")
+    parser.add_argument("--url", default=None, help="Running backend for --target routes (default: in-process app)")
+    parser.add_argument("--ollama-url", default=None, help="Use this Ollama/stub instead of starting one")
+    parser.add_argument("--stub-args", default="--time-scale 0.1", help="Arguments for the in-process stub")
+    parser.add_argument("--unique", action="store_true", help="Make each request's source differ so the overview is not shared")
+    parser.add_argument("--cache", action="store_true", help="Leave the LLM response cache enabled")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        code = f.read()
+    filename = os.path.basename(args.path)
+
+    server = stub_task = None
+    ollama_url = args.ollama_url
+    if ollama_url is None and args.url is None:
+        server, stub_task, ollama_url = await start_stub(args.stub_args)
+
+    # Settings are read on first use, so configure them before importing the app
+    if ollama_url:
+        os.environ["OLLAMA_BASE_URL"] = ollama_url
+        os.environ["OLLAMA_BACKENDS"] = "[]"
+    os.environ.setdefault("OLLAMA_WARMUP_ENABLED", "false")
+    if not args.cache:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+
+    import httpx
+    from app.service.http_pool import get_http_pool
+    from app.service.usage import get_usage_tracker
+
+    client = None
+    if args.target == "routes":
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=None)
+        else:
+            from app.main import app
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=None)
+
+    gate = asyncio.Semaphore(max(1, args.concurrency))
+    latencies: List[float] = []
+    failures: List[str] = []
+
+    async def one(index: int):
+        source = f"{code}\n# load-test request {index}\n" if args.unique else code
+        async with gate:
+            started = time.monotonic()
+            try:
+                if client is not None:
+                    await run_route(client, index, source, filename)
+                else:
+                    await run_analyzer(index, source, filename)
+                latencies.append(time.monotonic() - started)
+            except Exception as e:
+                failures.append(f"{type(e).__name__}: {e}")
+
+    wall_started = time.monotonic()
+    try:
+        await asyncio.gather(*(one(index) for index in range(args.requests)))
+        wall = time.monotonic() - wall_started
+
+        stub_stats: Optional[Dict[str, Any]] = None
+        if ollama_url:
+            try:
+                async with httpx.AsyncClient(base_url=ollama_url) as probe:
+                    response = await probe.get("/stub/stats")
+                    if response.status_code == 200:
+                        stub_stats = response.json()
+            except httpx.HTTPError:
+                pass
+    finally:
+        if client is not None:
+            await client.aclose()
+        await get_http_pool().close()
+        if server is not None:
+            server.should_exit = True
+            await stub_task
+
+    summary = {
+        "target": args.target,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "succeeded": len(latencies),
+        "failed": len(failures),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(len(latencies) / wall, 3) if wall else 0.0,
+        "latency_seconds": {
+            "mean": round(statistics.mean(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(max(latencies), 3) if latencies else 0.0
+        },
+        "llm_usage": get_usage_tracker().snapshot(),
+        "stub": stub_stats,
+        "errors": sorted(set(failures))[:10]
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    latency = summary["latency_seconds"]
+    print(f"\nLoad test: {args.requests} x {filename} via {args.target}, concurrency {args.concurrency}\n")
+    print(f"succeeded {summary['succeeded']}, failed {summary['failed']} in {summary['wall_seconds']}s "
+          f"({summary['throughput_per_second']} analyses/s)")
+    print(f"latency mean {latency['mean']}s  p50 {latency['p50']}s  p95 {latency['p95']}s  "
+          f"p99 {latency['p99']}s  max {latency['max']}s")
+    if stub_stats:
+        print(f"stub served {stub_stats['requests']} generate calls "
+              f"(max in flight {stub_stats['max_in_flight']}, injected errors {stub_stats['injected_errors']}, "
+              f"timeouts {stub_stats['injected_timeouts']})")
+    for error in summary["errors"]:
+        print(f"  error: {error}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,101 @@
+# ==========================================
+# BACKEND - backend/benchmarks/prefix_reuse.py
+# ==========================================
+"""Measure prompt-eval time saved by the shared per-file prefix.
+
+Sends every function/class prompt of a file to Ollama once per prefix mode
+("off", "system", "context") and reports the prompt tokens Ollama actually
+evaluated and the prompt-eval time per call. Responses bypass the LLM cache.
+
+Usage (from backend/):
+    python -m benchmarks.prefix_reuse path/to/module.py [--repeat 2] [--model NAME]
+"""
+import argparse
+import asyncio
+import statistics
+from typing import Dict, List
+from app.service.ai import AIService
+from app.service.analyser import CodeAnalyzer
+from app.service.http_pool import get_http_pool
+from app.service.parser import CodeParser
+from app.service.prefix import FilePromptContext
+
+MODES = ("off", "system", "context")
+
+async def run_mode(service: AIService, mode: str, prompts: List[tuple], model: str) -> Dict[str, float]:
+    """Send each prompt once and collect Ollama's prompt-eval counters"""
+    service.prefix_mode = mode
+    file_context = service.file_context
+    # Fresh context object so "context" mode pays its priming call inside the run
+    service.set_file_context(FilePromptContext(file_context.filename, file_context.text))
+    
+    # Pin one backend so every mode is measured on the same server
+    client = service.http_pool.client(service.backends.pick(model).url)
+    tokens, millis = [], []
+    for prompt_type, prompt in prompts:
+        payload = await service._build_payload(prompt, model, prompt_type, {"num_predict": 32}, stream=False)
+        response = await client.post("/api/generate", json=payload, timeout=service.timeouts["long"])
+        response.raise_for_status()
+        result = response.json()
+        tokens.append(result.get("prompt_eval_count", 0))
+        millis.append(result.get("prompt_eval_duration", 0) / 1e6)
+    
+    return {
+        "calls": len(prompts),
+        "prompt_tokens": statistics.mean(tokens),
+        "prompt_eval_ms": statistics.mean(millis),
+        "prompt_eval_ms_after_first": statistics.mean(millis[1:]) if len(millis) > 1 else millis[0]
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Python file whose symbols are explained")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per mode (results are averaged)")
+    parser.add_argument("--model", default=None, help="Model to benchmark (defaults to OLLAMA_MODEL)")
+    args = parser.parse_args()
+    
+    with open(args.path, encoding="utf-8") as f:
+        code = f.read()
+    
+    code_parser = CodeParser(code)
+    code_parser.parse()
+    functions = code_parser.extract_functions()
+    classes = code_parser.extract_classes()
+    imports = code_parser.extract_imports()
+    
+    service = AIService()
+    analyzer = CodeAnalyzer()
+    source = analyzer._source_index(code)
+    model = args.model or service.model
+    service.set_file_context(FilePromptContext.build(args.path, functions, classes, imports))
+    
+    prompts = [
+        ("function", service._build_function_prompt(func, analyzer._extract_function_code(source, func)))
+        for func in functions
+    ] + [
+        ("class", service._build_class_prompt(cls, analyzer._extract_class_code(source, cls)))
+        for cls in classes
+    ]
+    if not prompts:
+        print("No functions or classes found")
+        return
+    
+    results: Dict[str, List[Dict[str, float]]] = {mode: [] for mode in MODES}
+    try:
+        for _ in range(args.repeat):
+            for mode in MODES:
+                results[mode].append(await run_mode(service, mode, prompts, model))
+    finally:
+        await get_http_pool().close()
+    
+    print(f"\nPrefix reuse on {args.path} ({len(prompts)} prompts, model {model})\n")
+    print(f"{'mode':<8} {'prompt tokens/call':>19} {'prompt eval ms/call':>20} {'ms/call after 1st':>18} {'saved ms/call':>14}")
+    baseline = statistics.mean(run["prompt_eval_ms"] for run in results["off"])
+    for mode in MODES:
+        tokens = statistics.mean(run["prompt_tokens"] for run in results[mode])
+        millis = statistics.mean(run["prompt_eval_ms"] for run in results[mode])
+        after_first = statistics.mean(run["prompt_eval_ms_after_first"] for run in results[mode])
+        print(f"{mode:<8} {tokens:>19.1f} {millis:>20.1f} {after_first:>18.1f} {baseline - millis:>14.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,451 @@
+# ==========================================
+# BACKEND - backend/stub/ollama.py
+# ==========================================
+"""Deterministic stand-in for the Ollama HTTP API.
+
+Implements /api/generate (streaming and non-streaming), /api/tags and
+/api/version with configurable latency, throughput and fault injection, so
+CodeAnalyzer and the routes can be load-tested offline. Every random draw is
+seeded from --seed, the model, the prompt and how many times that prompt has
+been seen, so a run replays identically regardless of request interleaving.
+
+Usage (from backend/):
+    python -m stub.ollama --port 11434 [--latency lognormal:-0.5,0.4] [--tps 25]
+        [--error-rate 0.02] [--timeout-rate 0.01] [--time-scale 0.1]
+        [--responses canned.json] [--parallel 4] [--seed 7]
+
+Latency specs: fixed:S, uniform:LO,HI, normal:MU,SIGMA, lognormal:MU,SIGMA
+(of the underlying normal), exponential:MEAN; all in seconds, applied as
+queue/overhead time before the first token.
+
+Canned responses are a JSON list of {"match": regex, "response": template}
+checked in order against the prompt. Templates may use {model}, {attempt}
+(how often this exact prompt was seen before), {prompt_chars},
+{prompt_tokens} and {first_line}.
+
+Control endpoints: GET /stub/stats, POST /stub/reset, GET/PATCH /stub/config.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FILLER = (
+    "This code reads its inputs, validates them, applies the core transformation "
+    "and returns the result to the caller while keeping side effects contained."
+).split()
+
+class LatencyDistribution:
+    """Parsed ``kind:p1,p2`` latency spec"""
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}' (expected one of {', '.join(self.KINDS)})")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(value) for value in params.split(",") if value.strip()]
+
+    def sample(self, rng: random.Random) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0] if p else 0.0
+        elif self.kind == "uniform":
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(p[0], p[1])
+        else:
+            value = rng.expovariate(1.0 / p[0]) if p and p[0] > 0 else 0.0
+        return max(0.0, value)
+
+class StubOllama:
+    """Request handling, simulated timing and fault injection for the stub server"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.seed = args.seed
+        self.models: List[str] = args.models
+        self.strict_models = args.strict_models
+        self.latency = LatencyDistribution(args.latency)
+        self.tps = max(0.1, args.tps)
+        self.prompt_tps = max(1.0, args.prompt_tps)
+        self.output_tokens = max(1, args.output_tokens)
+        self.load_seconds = max(0.0, args.load_seconds)
+        self.error_rate = args.error_rate
+        self.timeout_rate = args.timeout_rate
+        self.hang_seconds = args.hang_seconds
+        self.time_scale = max(0.0, args.time_scale)
+        self.responses = self._load_responses(args.responses)
+        self.parallel = max(1, args.parallel)
+
+        self._slots = asyncio.Semaphore(self.parallel)
+        self.reset()
+
+    @staticmethod
+    def _load_responses(path: Optional[str]) -> List[Tuple[re.Pattern, str]]:
+        if not path:
+            return []
+        with open(path, encoding="utf-8") as f:
+            rules = json.load(f)
+        return [(re.compile(rule["match"], re.MULTILINE), rule["response"]) for rule in rules]
+
+    def reset(self):
+        self._attempts: Dict[str, int] = {}
+        self._loaded: set = set()
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "streamed": 0,
+            "injected_errors": 0,
+            "injected_timeouts": 0,
+            "unknown_model": 0,
+            "cold_loads": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+            "queued": 0,
+            "prompt_tokens": 0,
+            "output_tokens": 0,
+            "by_model": {}
+        }
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "seed": self.seed,
+            "models": self.models,
+            "latency": self.latency.spec,
+            "tps": self.tps,
+            "prompt_tps": self.prompt_tps,
+            "output_tokens": self.output_tokens,
+            "load_seconds": self.load_seconds,
+            "error_rate": self.error_rate,
+            "timeout_rate": self.timeout_rate,
+            "hang_seconds": self.hang_seconds,
+            "time_scale": self.time_scale,
+            "parallel": self.parallel
+        }
+
+    def update_config(self, changes: Dict[str, Any]):
+        """Change fault and timing knobs on a running stub (parallel is fixed at startup)"""
+        for key, value in changes.items():
+            if key == "latency":
+                self.latency = LatencyDistribution(value)
+            elif key in ("tps", "prompt_tps", "load_seconds", "error_rate", "timeout_rate", "hang_seconds", "time_scale"):
+                setattr(self, key, float(value))
+            elif key in ("seed", "output_tokens"):
+                setattr(self, key, int(value))
+            else:
+                raise ValueError(f"Unknown or read-only setting '{key}'")
+
+    def _rng(self, model: str, prompt: str) -> Tuple[random.Random, int]:
+        """Per-request RNG that depends only on the seed, the request and its repeat count"""
+        digest = hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+        attempt = self._attempts.get(digest, 0)
+        self._attempts[digest] = attempt + 1
+        return random.Random(f"{self.seed}:{digest}:{attempt}"), attempt
+
+    async def _sleep(self, seconds: float):
+        if seconds > 0 and self.time_scale > 0:
+            await asyncio.sleep(seconds * self.time_scale)
+
+    # ---- response text ----
+
+    def _render(self, body: Dict[str, Any], rng: random.Random, attempt: int) -> str:
+        prompt = body.get("prompt", "")
+        if body.get("format"):
+            return json.dumps(self._json_reply(body["format"], prompt, rng))
+
+        fields = {
+            "model": body.get("model", ""),
+            "attempt": attempt,
+            "prompt_chars": len(prompt),
+            "prompt_tokens": _count_tokens(prompt),
+            "first_line": prompt.strip().split("\n", 1)[0][:80]
+        }
+        for pattern, template in self.responses:
+            if pattern.search(prompt):
+                return template.format(**fields)
+
+        words = f"Stub explanation from {fields['model']} for: {fields['first_line']}.".split()
+        target = self.output_tokens + rng.randint(-self.output_tokens // 4, self.output_tokens // 4)
+        position = 0
+        while len(words) < target:
+            words.append(FILLER[position % len(FILLER)])
+            position += 1
+        return " ".join(words)
+
+    def _json_reply(self, schema: Any, prompt: str, rng: random.Random) -> Any:
+        """Schema-conforming JSON; arrays get one item per numbered entry in the prompt
+        ("FUNCTION 3:" or "3. Module:"), or three when there are none"""
+        if not isinstance(schema, dict):
+            return {"response": "Stub JSON reply"}
+        numbered = (
+            re.findall(r"^\s*[A-Z]+ (\d+):", prompt, re.MULTILINE)
+            or re.findall(r"^\s*(\d+)\. Module:", prompt, re.MULTILINE)
+        )
+        items = len(set(numbered)) or 3
+        return _from_schema(schema, items, rng)
+
+    # ---- handlers ----
+
+    async def generate(self, body: Dict[str, Any]):
+        model = body.get("model", "")
+        prompt = (body.get("system") or "") + body.get("prompt", "")
+        stream = body.get("stream", True)
+        options = body.get("options") or {}
+        rng, attempt = self._rng(model, prompt)
+
+        self.stats["requests"] += 1
+        per_model = self.stats["by_model"].setdefault(model, {"requests": 0, "errors": 0})
+        per_model["requests"] += 1
+        if stream:
+            self.stats["streamed"] += 1
+
+        if self.strict_models and model not in self.models:
+            self.stats["unknown_model"] += 1
+            return JSONResponse(status_code=404, content={"error": f"model '{model}' not found, try pulling it first"})
+
+        # Draw every random decision up front so the outcome does not depend on timing
+        fault_roll = rng.random()
+        overhead = self.latency.sample(rng)
+        text = self._render(body, rng, attempt)
+
+        self.stats["queued"] += 1
+        await self._slots.acquire()
+        self.stats["queued"] -= 1
+        self.stats["in_flight"] += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        released = handed_off = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.stats["in_flight"] -= 1
+                self._slots.release()
+
+        try:
+            if fault_roll < self.timeout_rate:
+                self.stats["injected_timeouts"] += 1
+                per_model["errors"] += 1
+                await asyncio.sleep(self.hang_seconds)
+                return JSONResponse(status_code=500, content={"error": "stub: injected hang ended"})
+
+            inject_error = fault_roll < self.timeout_rate + self.error_rate
+            if inject_error and not stream:
+                self.stats["injected_errors"] += 1
+                per_model["errors"] += 1
+                await self._sleep(overhead)
+                return JSONResponse(status_code=500, content={"error": "stub: injected failure"})
+
+            load_duration = 0.0
+            if model not in self._loaded:
+                self._loaded.add(model)
+                self.stats["cold_loads"] += 1
+                load_duration = self.load_seconds
+                await self._sleep(load_duration)
+
+            # Like Ollama, only the new prompt is evaluated; context tokens are already done
+            context = body.get("context") or []
+            prompt_tokens = _count_tokens(prompt)
+            prompt_seconds = prompt_tokens / self.prompt_tps
+            await self._sleep(overhead + prompt_seconds)
+
+            tokens = _tokenize(text)
+            num_predict = options.get("num_predict")
+            if num_predict and num_predict > 0:
+                tokens = tokens[:num_predict]
+            timings = {
+                "load_duration": int(load_duration * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(prompt_seconds * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": int(len(tokens) / self.tps * 1e9)
+            }
+            reply_context = _fake_context(model, context, prompt, len(tokens))
+            done_reason = "length" if num_predict and len(tokens) >= num_predict else "stop"
+
+            if stream:
+                handed_off = True
+                return StreamingResponse(
+                    self._stream(model, tokens, timings, reply_context, done_reason, inject_error, per_model, release),
+                    media_type="application/x-ndjson"
+                )
+
+            await self._sleep(len(tokens) / self.tps)
+            self._count_usage(timings)
+            return {
+                "model": model,
+                "created_at": _timestamp(),
+                "response": "".join(tokens),
+                "done": True,
+                "done_reason": done_reason,
+                "context": reply_context,
+                "total_duration": int((overhead + prompt_seconds + load_duration) * 1e9) + timings["eval_duration"],
+                **timings
+            }
+        finally:
+            # A streaming reply releases its slot when the stream ends
+            if not handed_off:
+                release()
+
+    async def _stream(
+        self,
+        model: str,
+        tokens: List[str],
+        timings: Dict[str, int],
+        context: List[int],
+        done_reason: str,
+        inject_error: bool,
+        per_model: Dict[str, int],
+        release
+    ) -> AsyncIterator[str]:
+        try:
+            # Injected stream errors arrive mid-reply, the way Ollama reports them
+            fail_at = len(tokens) // 2 if inject_error else -1
+            for position, token in enumerate(tokens):
+                if position == fail_at:
+                    self.stats["injected_errors"] += 1
+                    per_model["errors"] += 1
+                    yield json.dumps({"error": "stub: injected failure"}) + "\n"
+                    return
+                await self._sleep(1.0 / self.tps)
+                yield json.dumps({"model": model, "created_at": _timestamp(), "response": token, "done": False}) + "\n"
+            self._count_usage(timings)
+            yield json.dumps({
+                "model": model,
+                "created_at": _timestamp(),
+                "response": "",
+                "done": True,
+                "done_reason": done_reason,
+                "context": context,
+                **timings
+            }) + "\n"
+        finally:
+            release()
+
+    def _count_usage(self, timings: Dict[str, int]):
+        self.stats["prompt_tokens"] += timings["prompt_eval_count"]
+        self.stats["output_tokens"] += timings["eval_count"]
+
+    def tags(self) -> Dict[str, Any]:
+        return {
+            "models": [
+                {"name": model, "model": model, "size": 0, "digest": hashlib.sha256(model.encode()).hexdigest()}
+                for model in self.models
+            ]
+        }
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _tokenize(text: str) -> List[str]:
+    """Split into whitespace-preserving word tokens"""
+    return re.findall(r"\S+\s*|\s+", text) or [text]
+
+def _timestamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+def _fake_context(model: str, context: List[int], prompt: str, output_tokens: int) -> List[int]:
+    """Stable token ids standing in for Ollama's conversation context"""
+    seed = int(hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()[:8], 16)
+    return list(context) + [(seed + i) % 32000 for i in range(_count_tokens(prompt) + output_tokens)]
+
+def _from_schema(schema: Dict[str, Any], items: int, rng: random.Random, name: str = "", index: int = 1) -> Any:
+    kind = schema.get("type")
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if kind == "object":
+        return {
+            key: _from_schema(sub, items, rng, key, index)
+            for key, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [_from_schema(schema.get("items", {}), items, rng, name, position + 1) for position in range(items)]
+    if kind == "integer":
+        return index if name == "index" else rng.randint(0, 100)
+    if kind == "number":
+        return round(rng.uniform(0, 100), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    words = rng.randint(6, 16)
+    return f"Stub {name or 'value'} {index}: " + " ".join(FILLER[(index + i) % len(FILLER)] for i in range(words))
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    stub = StubOllama(args)
+    app = FastAPI(title="Ollama stub")
+    app.state.stub = stub
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        return await stub.generate(await request.json())
+
+    @app.get("/api/tags")
+    async def tags():
+        return stub.tags()
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-stub"}
+
+    @app.get("/stub/stats")
+    async def stats():
+        return stub.stats
+
+    @app.post("/stub/reset")
+    async def reset():
+        stub.reset()
+        return {"reset": True}
+
+    @app.get("/stub/config")
+    async def get_config():
+        return stub.config()
+
+    @app.patch("/stub/config")
+    async def patch_config(request: Request):
+        try:
+            stub.update_config(await request.json())
+        except (ValueError, TypeError) as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        return stub.config()
+
+    return app
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m stub.ollama",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--seed", type=int, default=0, help="Seed for every random draw")
+    parser.add_argument("--models", nargs="+", default=["deepseek-coder"], help="Models listed by /api/tags")
+    parser.add_argument("--strict-models", action="store_true", help="404 for models not in --models, like a real server")
+    parser.add_argument("--latency", default="fixed:0.05", help="Overhead before the first token (see above)")
+    parser.add_argument("--tps", type=float, default=25.0, help="Output tokens per second")
+    parser.add_argument("--prompt-tps", type=float, default=400.0, help="Prompt tokens evaluated per second")
+    parser.add_argument("--output-tokens", type=int, default=48, help="Typical reply length in tokens (before num_predict)")
+    parser.add_argument("--load-seconds", type=float, default=0.0, help="Simulated cold-load time on a model's first request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail with HTTP 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that hang for --hang-seconds")
+    parser.add_argument("--hang-seconds", type=float, default=3600.0, help="How long an injected hang lasts (not scaled)")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiply every simulated delay (0 disables sleeping)")
+    parser.add_argument("--responses", default=None, help="JSON file of canned {match, response} rules")
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent requests served, like OLLAMA_NUM_PARALLEL")
+    return parser
+
+def main():
+    import uvicorn
+
+    args = build_parser().parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,32 @@
+# ==========================================
+# BACKEND - backend/tests/conftest.py
+# ==========================================
+import os
+import tempfile
+
+# Settings are read once and cached, so every on-disk path points at a
+# scratch directory before any app module is imported
+SCRATCH_DIR = tempfile.mkdtemp(prefix="code-explainer-tests-")
+os.environ.update({
+    "OUTPUT_DIR": os.path.join(SCRATCH_DIR, "output"),
+    "LOG_FILE": os.path.join(SCRATCH_DIR, "logs", "app.log"),
+    "LOG_LEVEL": "WARNING",
+    "LLM_CACHE_ENABLED": "false",
+    "LLM_CACHE_PATH": os.path.join(SCRATCH_DIR, "cache", "llm_cache.sqlite3"),
+    "OLLAMA_WARMUP_ENABLED": "false"
+})
+
+import pytest
+from app.config import get_settings
+
+@pytest.fixture
+def settings(monkeypatch):
+    """settings(NAME=value, ...) overrides the shared settings for one test and returns them"""
+    current = get_settings()
+
+    def override(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(current, name, value)
+        return current
+
+    return override
\ No newline at end of file
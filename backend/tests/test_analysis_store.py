@@ -0,0 +1,109 @@
+# ==========================================
+# BACKEND - backend/tests/test_analysis_store.py
+# ==========================================
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from app.storage.analysis import AnalysisStore, analysis_cache_key
+
+CODE = "def add(a, b):\n    return a + b\n"
+
+@pytest.fixture
+def store(settings, tmp_path):
+    settings(OUTPUT_DIR=str(tmp_path), ANALYSIS_CACHE_ENABLED=True, ANALYSIS_CACHE_TTL_SECONDS=3600)
+    (tmp_path / "reports").mkdir()
+    return AnalysisStore()
+
+def save(store, file_id, cache_key="key", **kwargs):
+    """Store a minimal analysis together with the report lookup expects"""
+    (store.root.parent / "reports" / f"report_{file_id}_module.pdf").write_text("report")
+    store.save(cache_key, file_id, "module.py", CODE, {"file_id": file_id}, **kwargs)
+
+def test_cache_key_covers_source_models_prompts_and_app():
+    key = analysis_cache_key(CODE, ["a", "b"], "v1", "1.0")
+    assert key == analysis_cache_key(CODE, ["b", "a", "a"], "v1", "1.0")
+    assert key != analysis_cache_key(CODE + "\n", ["a", "b"], "v1", "1.0")
+    assert key != analysis_cache_key(CODE, ["a"], "v1", "1.0")
+    assert key != analysis_cache_key(CODE, ["a", "b"], "v2", "1.0")
+    assert key != analysis_cache_key(CODE, ["a", "b"], "v1", "1.1")
+
+def test_saved_analysis_is_served_for_its_key(store):
+    save(store, "abc", symbols={"functions": {"add": {"hash": "h"}}})
+    record = store.lookup("key")
+    assert record["file_id"] == "abc"
+    assert record["result"] == {"file_id": "abc"}
+    assert record["symbols"] == {"functions": {"add": {"hash": "h"}}}
+    assert store.lookup("other") is None
+
+def test_uncacheable_analysis_is_readable_but_never_served(store):
+    save(store, "degraded", cacheable=False)
+    assert store.get("degraded")["file_id"] == "degraded"
+    assert store.lookup("key") is None
+    assert not (store.keys / "key").exists()
+
+def test_uncacheable_analysis_leaves_earlier_pointer_alone(store):
+    save(store, "good")
+    save(store, "degraded", cacheable=False)
+    assert store.lookup("key")["file_id"] == "good"
+
+def test_expired_analysis_is_dropped(store):
+    save(store, "old")
+    record = json.loads(store._record_path("old").read_text())
+    record["created_at"] = time.time() - 7200
+    store._record_path("old").write_text(json.dumps(record))
+    assert store.lookup("key") is None
+    assert not (store.keys / "key").exists()
+
+def test_zero_ttl_never_expires(store):
+    store.ttl = 0
+    save(store, "old")
+    record = json.loads(store._record_path("old").read_text())
+    record["created_at"] = 0
+    store._record_path("old").write_text(json.dumps(record))
+    assert store.lookup("key")["file_id"] == "old"
+
+def test_missing_report_drops_the_pointer(store):
+    save(store, "abc")
+    for report in (store.root.parent / "reports").iterdir():
+        report.unlink()
+    assert store.lookup("key") is None
+    assert not (store.keys / "key").exists()
+
+def test_disabled_store_serves_nothing(store):
+    save(store, "abc")
+    store.enabled = False
+    assert store.lookup("key") is None
+
+def test_invalidate_and_clear(store):
+    save(store, "abc", cache_key="first")
+    save(store, "def", cache_key="second")
+    assert store.invalidate("abc")
+    assert not store.invalidate("missing")
+    assert store.lookup("first") is None
+    assert store.get("abc") is not None
+    assert store.clear() == 1
+    assert store.lookup("second") is None
+
+def test_routes_read_the_store(store):
+    from app.main import app
+    save(store, "abc")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            found = await client.get("/api/analyses/abc")
+            missing = await client.post(
+                "/api/jobs?previous_analysis_id=missing",
+                files={"file": ("x.py", b"x = 1", "text/x-python")}
+            )
+            invalidated = await client.delete("/api/analyses/abc")
+            cleared = await client.delete("/api/analyses")
+            return found, missing, invalidated, cleared
+
+    found, missing, invalidated, cleared = asyncio.run(scenario())
+    assert found.json() == {"file_id": "abc"}
+    assert missing.status_code == 404
+    assert invalidated.json()["status"] == "invalidated"
+    assert cleared.json()["removed"] == 0
\ No newline at end of file
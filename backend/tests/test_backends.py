@@ -0,0 +1,105 @@
+# ==========================================
+# BACKEND - backend/tests/test_backends.py
+# ==========================================
+import asyncio
+import httpx
+import pytest
+from benchmarks.load_test import free_port, start_stub
+from app.service.ai import AIService
+from app.service.backends import get_backend_pool
+from app.service.http_pool import get_http_pool
+
+def reset_pool():
+    get_backend_pool.cache_clear()
+    get_http_pool.cache_clear()
+
+@pytest.fixture
+def stubs(settings):
+    """stubs(scenario, backends, stub_args) runs scenario(service, stubs) against two stub servers; backend entries may use {0} and {1} for their URLs"""
+    def run(scenario, backends=("{0}", "{1}"), stub_args="--latency fixed:0.05 --tps 1000"):
+        async def main():
+            started = [await start_stub(stub_args) for _ in range(2)]
+            urls = [url for _, _, url in started]
+            entries = [
+                entry.format(*urls) if isinstance(entry, str) else {**entry, "url": entry["url"].format(*urls)}
+                for entry in backends
+            ]
+            settings(OLLAMA_BACKENDS=entries, OLLAMA_CONNECT_TIMEOUT=1.0, BACKEND_EJECT_AFTER_FAILURES=3)
+            reset_pool()
+            try:
+                return await scenario(AIService(), [server.config.app.state.stub for server, _, _ in started])
+            finally:
+                await get_http_pool().close()
+                for server, task, _ in started:
+                    server.should_exit = True
+                    await task
+        try:
+            return asyncio.run(main())
+        finally:
+            reset_pool()
+    return run
+
+def generate(service, model="deepseek-coder", prompt="Explain this"):
+    payload = {"model": model, "prompt": prompt, "stream": False}
+    return service._post_to_backend(payload, model, 5.0)
+
+def test_calls_go_to_the_least_loaded_backend_by_weight(stubs):
+    async def scenario(service, servers):
+        await asyncio.gather(*(generate(service, prompt=f"call {idx}") for idx in range(8)))
+        return [server.stats["requests"] for server in servers]
+
+    requests = stubs(scenario, backends=({"url": "{0}", "weight": 3}, {"url": "{1}", "weight": 1}))
+    assert requests == [6, 2]
+
+def test_unreachable_backend_fails_over_and_is_ejected(stubs):
+    dead = f"http://127.0.0.1:{free_port()}"
+
+    async def scenario(service, servers):
+        for idx in range(6):
+            assert "response" in await generate(service, prompt=f"call {idx}")
+        return service.backends.snapshot()
+
+    snapshot = stubs(scenario, backends=(dead, "{0}"))
+    by_url = {backend["url"]: backend for backend in snapshot["backends"]}
+    assert not by_url[dead]["healthy"]
+    assert by_url[dead]["ejections"] == 1
+    # Once ejected, the dead backend is no longer tried
+    assert by_url[dead]["total_failures"] == 3
+
+def test_server_errors_eject_and_a_probe_readmits(stubs):
+    async def scenario(service, servers):
+        servers[0].update_config({"error_rate": 1.0})
+        pool = service.backends
+        sick = pool.backends[0]
+        # Sequential calls alternate, so the failing backend sees calls 0, 2 and 4
+        failed = []
+        for idx in range(5):
+            try:
+                await generate(service, prompt=f"call {idx}")
+            except httpx.HTTPStatusError:
+                failed.append(idx)
+        ejected = sick.healthy
+        # While ejected, calls only reach the healthy backend
+        await asyncio.gather(*(generate(service, prompt=f"after {idx}") for idx in range(4)))
+        routed = [server.stats["requests"] for server in servers]
+
+        servers[0].update_config({"error_rate": 0.0})
+        readmitted = await pool.probe(sick)
+        return failed, ejected, routed, readmitted, sick.healthy
+
+    failed, ejected, routed, readmitted, healthy = stubs(scenario)
+    assert failed == [0, 2, 4]
+    assert not ejected
+    assert routed == [3, 6]
+    assert readmitted and healthy
+
+def test_client_errors_never_eject(stubs):
+    async def scenario(service, servers):
+        for idx in range(6):
+            with pytest.raises(httpx.HTTPStatusError):
+                await generate(service, model="no-such-model", prompt=f"call {idx}")
+        return service.backends.snapshot()
+
+    snapshot = stubs(scenario, stub_args="--strict-models --models deepseek-coder")
+    assert snapshot["healthy"] == 2
+    assert all(backend["total_failures"] == 0 for backend in snapshot["backends"])
\ No newline at end of file
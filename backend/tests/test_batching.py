@@ -0,0 +1,69 @@
+# ==========================================
+# BACKEND - backend/tests/test_batching.py
+# ==========================================
+import asyncio
+import httpx
+import pytest
+from app.models.schemas import Function
+from app.service.ai import AIService
+from app.service.breaker import CircuitOpenError
+from app.service.structured import StructuredOutputError
+
+def make_items(count):
+    return [
+        (Function(name=f"step{idx}", parameters=["x"], return_type=None, docstring=None, line_number=idx + 1), f"def step{idx}(x):\n    return x + {idx}")
+        for idx in range(count)
+    ]
+
+def explain(service, items, batch_reply):
+    """Run explain_functions_batch with the batch call replaced by batch_reply; returns (results, single calls)"""
+    singles = []
+
+    async def call_structured(prompt, **kwargs):
+        return batch_reply()
+
+    async def explain_function(func, snippet):
+        singles.append(func.name)
+        return f"single {func.name}"
+
+    service._call_structured = call_structured
+    service.explain_function = explain_function
+    reported = {}
+    results = asyncio.run(service.explain_functions_batch(items, reported.__setitem__))
+    assert reported == dict(enumerate(results))
+    return results, singles
+
+@pytest.fixture
+def service(settings):
+    settings(LLM_BATCH_MAX_ITEMS=8, LLM_BATCH_TOKEN_BUDGET=4096)
+    return AIService()
+
+def test_items_missing_from_the_reply_get_single_calls(service):
+    results, singles = explain(service, make_items(3), lambda: {0: "batched 0", 2: "batched 2"})
+    assert results == ["batched 0", "single step1", "batched 2"]
+    assert singles == ["step1"]
+
+def test_unparseable_reply_retries_each_item(service):
+    def malformed():
+        raise StructuredOutputError("no JSON object")
+
+    results, singles = explain(service, make_items(3), malformed)
+    assert singles == ["step0", "step1", "step2"]
+    assert service.fallbacks == {}
+
+@pytest.mark.parametrize("error", [
+    Exception("AI generation timed out"),
+    CircuitOpenError("open"),
+])
+def test_outage_falls_back_for_the_whole_batch(service, error):
+    if not isinstance(error, CircuitOpenError):
+        error.__cause__ = httpx.ReadTimeout("timed out")
+
+    def unavailable():
+        raise error
+
+    items = make_items(4)
+    results, singles = explain(service, items, unavailable)
+    assert singles == []
+    assert results == [service._generate_fallback_function_explanation(func) for func, _ in items]
+    assert service.fallbacks == {"function": 4}
\ No newline at end of file
@@ -0,0 +1,107 @@
+# ==========================================
+# BACKEND - backend/tests/test_breaker.py
+# ==========================================
+import asyncio
+import httpx
+import pytest
+from app.service.breaker import CircuitBreaker, CircuitOpenError, is_outage
+
+REQUEST = httpx.Request("POST", "http://ollama/api/generate")
+
+def status_error(code: int) -> httpx.HTTPStatusError:
+    return httpx.HTTPStatusError(str(code), request=REQUEST, response=httpx.Response(code, request=REQUEST))
+
+def wrapped(error: Exception) -> Exception:
+    try:
+        raise Exception("AI generation failed") from error
+    except Exception as e:
+        return e
+
+@pytest.fixture
+def breaker(settings):
+    settings(CIRCUIT_FAILURE_THRESHOLD=3, CIRCUIT_RECOVERY_SECONDS=0.05, CIRCUIT_HALF_OPEN_MAX_CALLS=1)
+    return CircuitBreaker("test")
+
+def fail(breaker: CircuitBreaker, error: Exception):
+    with pytest.raises(type(error)):
+        with breaker.guard():
+            raise error
+
+def test_is_outage():
+    assert is_outage(httpx.ConnectError("refused", request=REQUEST))
+    assert is_outage(httpx.ReadTimeout("slow", request=REQUEST))
+    assert is_outage(status_error(503))
+    assert is_outage(wrapped(status_error(500)))
+    assert not is_outage(status_error(404))
+    assert not is_outage(wrapped(status_error(400)))
+    assert not is_outage(ValueError("bad reply"))
+
+def test_opens_after_consecutive_outages(breaker):
+    for _ in range(2):
+        fail(breaker, wrapped(httpx.ConnectError("refused", request=REQUEST)))
+    assert breaker.state == CircuitBreaker.CLOSED
+    fail(breaker, status_error(502))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            pass
+
+def test_client_errors_do_not_trip_the_circuit(breaker):
+    for _ in range(10):
+        fail(breaker, wrapped(status_error(404)))
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["total_failures"] == 0
+
+def test_success_resets_the_failure_count(breaker):
+    for _ in range(2):
+        fail(breaker, status_error(500))
+    with breaker.guard():
+        pass
+    for _ in range(2):
+        fail(breaker, status_error(500))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_trial_closes_or_reopens(breaker):
+    async def scenario():
+        for _ in range(3):
+            fail(breaker, status_error(500))
+        await asyncio.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        # One trial at a time; a failed trial re-opens at once
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        await asyncio.sleep(0.06)
+        with breaker.guard():
+            pass
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+def test_client_error_releases_the_half_open_trial(breaker):
+    async def scenario():
+        for _ in range(3):
+            fail(breaker, status_error(500))
+        await asyncio.sleep(0.06)
+        fail(breaker, status_error(404))
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+
+    asyncio.run(scenario())
+
+def test_pending_calls_are_abandoned_when_the_circuit_opens(breaker):
+    async def scenario():
+        pending = asyncio.create_task(breaker.run_unless_open(asyncio.sleep(1)))
+        await asyncio.sleep(0.01)
+        for _ in range(3):
+            fail(breaker, status_error(500))
+        with pytest.raises(CircuitOpenError):
+            await pending
+        # Once open, new calls fail without being awaited
+        with pytest.raises(CircuitOpenError):
+            await breaker.run_unless_open(asyncio.sleep(1))
+
+    asyncio.run(scenario())
\ No newline at end of file
@@ -0,0 +1,82 @@
+# ==========================================
+# BACKEND - backend/tests/test_cache.py
+# ==========================================
+import asyncio
+import pytest
+from app.service.cache import LLMCache
+
+@pytest.fixture
+def cache(settings, tmp_path):
+    settings(
+        LLM_CACHE_ENABLED=True,
+        LLM_CACHE_PATH=str(tmp_path / "llm_cache.sqlite3"),
+        LLM_CACHE_MEMORY_ITEMS=3,
+        LLM_CACHE_MAX_BYTES=2000
+    )
+    return LLMCache()
+
+def disk_keys(cache):
+    return [row[0] for row in cache._db.execute("SELECT key FROM llm_cache ORDER BY accessed_at, key")]
+
+def test_set_then_get_from_both_tiers(cache):
+    async def scenario():
+        await cache.set("a", "alpha")
+        assert await cache.get("a") == "alpha"
+        cache._memory.clear()
+        assert await cache.get("a") == "alpha"
+        assert await cache.get("missing") is None
+        return await cache.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["disk_items"] == 1
+
+def test_expired_entries_are_dropped(cache):
+    async def scenario():
+        await cache.set("old", "value")
+        cache.ttl = 0.001
+        await asyncio.sleep(0.01)
+        return await cache.get("old")
+
+    assert asyncio.run(scenario()) is None
+    assert disk_keys(cache) == []
+
+def test_eviction_trims_to_budget_and_keeps_memory_hits(cache):
+    async def scenario():
+        for i in range(8):
+            await cache.set(f"k{i}", "x" * 200)
+        # Only the last three writes are in memory; reading them must protect them on disk
+        for key in ("k5", "k6"):
+            assert await cache.get(key) is not None
+        for i in range(8, 14):
+            await cache.set(f"k{i}", "y" * 200)
+
+    asyncio.run(scenario())
+    keys = disk_keys(cache)
+    assert {"k5", "k6"} <= set(keys)
+    assert not {"k0", "k1", "k2", "k3"} & set(keys)
+    stored = sum(row[0] for row in cache._db.execute("SELECT size FROM llm_cache"))
+    assert stored == cache._disk_bytes <= cache.max_disk_bytes
+
+def test_delete_and_clear(cache):
+    async def scenario():
+        await cache.set("a", "alpha")
+        await cache.set("b", "beta")
+        await cache.delete("a")
+        deleted = await cache.get("a")
+        await cache.clear()
+        return deleted, await cache.get("b"), await cache.stats()
+
+    deleted, cleared, stats = asyncio.run(scenario())
+    assert deleted is None and cleared is None
+    assert stats["disk_items"] == 0 and stats["disk_bytes"] == 0
+
+def test_disabled_cache_stores_nothing(settings):
+    settings(LLM_CACHE_ENABLED=False)
+    cache = LLMCache()
+
+    async def scenario():
+        await cache.set("a", "alpha")
+        return await cache.get("a")
+
+    assert asyncio.run(scenario()) is None
\ No newline at end of file
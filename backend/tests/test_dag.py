@@ -0,0 +1,94 @@
+# ==========================================
+# BACKEND - backend/tests/test_dag.py
+# ==========================================
+import asyncio
+import threading
+import pytest
+from app.service.dag import Stage, StageGraph
+
+def test_stages_get_their_dependencies_results():
+    async def double(source):
+        return source * 2
+
+    graph = StageGraph([
+        Stage("source", lambda: 3),
+        Stage("double", double, deps=["source"]),
+        Stage("total", lambda source, double: source + double, deps=["source", "double"], cpu=True)
+    ])
+    results = asyncio.run(graph.run())
+    assert results == {"source": 3, "double": 6, "total": 9}
+
+def test_undeclared_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        StageGraph([Stage("b", lambda a: a, deps=["a"]), Stage("a", lambda: 1)])
+
+def test_independent_stages_overlap():
+    async def wait():
+        await asyncio.sleep(0.05)
+        return True
+
+    graph = StageGraph([Stage("a", wait), Stage("b", wait), Stage("c", wait)])
+    asyncio.run(graph.run())
+    timings = graph.timings()
+    assert timings["wall_ms"] < 140
+    assert set(timings["nodes"]) == {"a", "b", "c"}
+
+def test_cpu_stages_run_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    graph = StageGraph([
+        Stage("cpu", lambda: threading.get_ident(), cpu=True),
+        Stage("inline", lambda: threading.get_ident())
+    ])
+    results = asyncio.run(graph.run())
+    assert results["cpu"] != loop_thread
+    assert results["inline"] == loop_thread
+
+def test_critical_path_follows_the_slowest_chain():
+    def sleeper(seconds):
+        async def run(**_):
+            await asyncio.sleep(seconds)
+        return run
+
+    graph = StageGraph([
+        Stage("parse", sleeper(0.01)),
+        Stage("fast", sleeper(0.01), deps=["parse"]),
+        Stage("slow", sleeper(0.08), deps=["parse"]),
+        Stage("report", sleeper(0.01), deps=["fast", "slow"])
+    ])
+    asyncio.run(graph.run())
+    timings = graph.timings()
+    assert timings["critical_path"] == ["parse", "slow", "report"]
+    assert timings["critical_path_ms"] <= timings["wall_ms"] + 1
+    assert timings["nodes"]["report"]["deps"] == ["fast", "slow"]
+
+def test_failure_cancels_the_rest():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def broken():
+        raise RuntimeError("stage failed")
+
+    graph = StageGraph([
+        Stage("slow", slow),
+        Stage("broken", broken),
+        Stage("after", lambda broken: broken, deps=["broken"])
+    ])
+    with pytest.raises(RuntimeError):
+        asyncio.run(graph.run())
+    assert cancelled == ["slow"]
+    assert "after" not in graph.results
+
+def test_on_done_sees_every_stage():
+    finished = []
+    graph = StageGraph(
+        [Stage("a", lambda: 1), Stage("b", lambda a: a + 1, deps=["a"])],
+        on_done=lambda name, result: finished.append((name, result))
+    )
+    asyncio.run(graph.run())
+    assert finished == [("a", 1), ("b", 2)]
\ No newline at end of file
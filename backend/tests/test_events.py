@@ -0,0 +1,98 @@
+# ==========================================
+# BACKEND - backend/tests/test_events.py
+# ==========================================
+import asyncio
+import httpx
+from contextlib import aclosing
+from app.service.events import EventChannel
+from app.service.jobs import AnalysisJob, get_job_manager
+
+def collect(channel, after_id=0, heartbeat=None, limit=None):
+    async def read():
+        messages = []
+        async with aclosing(channel.subscribe(after_id, heartbeat=heartbeat)) as stream:
+            async for message in stream:
+                messages.append(message)
+                if limit and len(messages) >= limit:
+                    break
+        return messages
+    return read()
+
+def test_late_subscriber_gets_the_buffer_and_ends():
+    channel = EventChannel()
+    for stage in ("parse", "overview", "report"):
+        channel.publish("stage", {"completed": stage})
+    channel.close()
+    messages = asyncio.run(collect(channel))
+    assert [message["data"]["completed"] for message in messages] == ["parse", "overview", "report"]
+    assert [message["id"] for message in messages] == [1, 2, 3]
+    assert channel.subscribers == 0
+
+def test_resume_after_last_event_id():
+    channel = EventChannel()
+    for index in range(5):
+        channel.publish("explanation", {"index": index})
+    channel.close()
+    assert [message["id"] for message in asyncio.run(collect(channel, after_id=3))] == [4, 5]
+
+def test_buffer_keeps_only_the_newest_events():
+    channel = EventChannel(buffer_size=2)
+    for index in range(4):
+        channel.publish("explanation", {"index": index})
+    channel.close()
+    assert [message["id"] for message in asyncio.run(collect(channel))] == [3, 4]
+
+def test_live_subscribers_see_backlog_then_new_events_until_close():
+    async def scenario():
+        channel = EventChannel()
+        channel.publish("queued", {})
+        readers = [asyncio.create_task(collect(channel)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert channel.subscribers == 2
+        channel.publish("started", {})
+        channel.publish("done", {})
+        channel.close()
+        return await asyncio.gather(*readers), channel.subscribers
+
+    results, subscribers = asyncio.run(scenario())
+    for messages in results:
+        assert [message["event"] for message in messages] == ["queued", "started", "done"]
+    assert subscribers == 0
+
+def test_heartbeat_while_idle_and_unsubscribe_on_exit():
+    async def scenario():
+        channel = EventChannel()
+        messages = await collect(channel, heartbeat=0.01, limit=2)
+        return messages, channel.subscribers
+
+    messages, subscribers = asyncio.run(scenario())
+    assert messages == [None, None]
+    assert subscribers == 0
+
+def test_sse_route_replays_a_finished_job(settings):
+    settings(JOB_EVENT_HEARTBEAT_SECONDS=0)
+    from app.main import app
+
+    job = AnalysisJob("x = 1", "x.py", "client")
+    job.advance("parse", {})
+    manager = get_job_manager()
+    manager.jobs[job.id] = job
+    manager._finish(job)
+
+    async def read(headers):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(f"/api/jobs/{job.id}/events", headers=headers)
+            return response.headers["content-type"], response.text
+
+    try:
+        content_type, body = asyncio.run(read({}))
+        _, resumed = asyncio.run(read({"Last-Event-ID": "2"}))
+    finally:
+        del manager.jobs[job.id]
+    assert content_type.startswith("text/event-stream")
+    frames = [frame for frame in body.split("\n\n") if frame]
+    assert [frame.splitlines()[:2] for frame in frames] == [
+        ["id: 1", "event: queued"], ["id: 2", "event: stage"], ["id: 3", "event: done"]
+    ]
+    assert resumed.startswith("id: 3\nevent: done\n")
\ No newline at end of file
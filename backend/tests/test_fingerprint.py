@@ -0,0 +1,57 @@
+# ==========================================
+# BACKEND - backend/tests/test_fingerprint.py
+# ==========================================
+import ast
+from app.service.fingerprint import fingerprint_node, rewrite_names
+
+def fingerprint(code, **options):
+    return fingerprint_node(ast.parse(code).body[0], **options)
+
+ORIGINAL = '''
+def total(prices, rate):
+    """Sum prices with tax"""
+    subtotal = sum(prices)
+    return subtotal * (1 + rate)
+'''
+
+RENAMED = '''
+def order_sum(amounts, tax):
+    # Same logic, other names, no docstring
+    base = sum(amounts)
+    return base * (1 + tax)
+'''
+
+def test_renamed_but_identical_functions_match():
+    digest, names = fingerprint(ORIGINAL)
+    other_digest, other_names = fingerprint(RENAMED)
+    assert digest == other_digest
+    assert names == ["total", "prices", "rate", "subtotal"]
+    assert other_names == ["order_sum", "amounts", "tax", "base"]
+
+def test_changed_bodies_differ():
+    digest, _ = fingerprint(ORIGINAL)
+    assert fingerprint(ORIGINAL.replace("1 + rate", "1 - rate"))[0] != digest
+    assert fingerprint(ORIGINAL.replace("sum(prices)", "max(prices)"))[0] != digest
+    assert fingerprint(ORIGINAL.replace("return subtotal", "return round(subtotal)"))[0] != digest
+
+def test_literals_only_match_when_canonicalized():
+    taxed = ORIGINAL.replace("1 + rate", "2 + rate")
+    assert fingerprint(taxed)[0] != fingerprint(ORIGINAL)[0]
+    assert fingerprint(taxed, literals=True)[0] == fingerprint(ORIGINAL, literals=True)[0]
+
+def test_names_only_match_when_canonicalized():
+    assert fingerprint(RENAMED, names=False)[0] != fingerprint(ORIGINAL, names=False)[0]
+    assert fingerprint(ORIGINAL, names=False)[1] == []
+
+def test_rewrite_names_renames_whole_identifiers():
+    text = "`total` adds up prices, then applies rate to the total."
+    rewritten = rewrite_names(text, ["total", "prices", "rate"], ["order_sum", "amounts", "tax"])
+    assert rewritten == "`order_sum` adds up amounts, then applies tax to the order_sum."
+
+def test_rewrite_names_leaves_partial_matches_alone():
+    text = "It reads self.rate, the subtotal, total_count and totals, then returns rates."
+    assert rewrite_names(text, ["total", "rate"], ["order_sum", "tax"]) == text
+
+def test_rewrite_names_only_touches_short_names_in_backticks():
+    text = "Loops over `xs` with x as a counter, so xs is never copied."
+    assert rewrite_names(text, ["xs", "x"], ["ys", "y"]) == "Loops over `ys` with x as a counter, so xs is never copied."
\ No newline at end of file
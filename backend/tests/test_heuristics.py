@@ -0,0 +1,98 @@
+# ==========================================
+# BACKEND - backend/tests/test_heuristics.py
+# ==========================================
+import textwrap
+from app.service.heuristics import TrivialSymbolClassifier
+from app.service.parser import CodeParser
+
+def parse(code: str):
+    parser = CodeParser(textwrap.dedent(code))
+    parser.parse()
+    return parser.extract_functions(), {cls.name: cls for cls in parser.extract_classes()}
+
+def kind(result):
+    return result[0] if result else None
+
+def test_function_rules():
+    functions, _ = parse('''
+        def todo():
+            raise NotImplementedError
+
+        def name():
+            return CONFIG.name
+
+        def configure(value):
+            SETTINGS.value = value
+
+        def load(path):
+            return read_file(path)
+
+        def busy(items):
+            for item in items:
+                print(item)
+    ''')
+    classifier = TrivialSymbolClassifier()
+    kinds = {func.name: kind(classifier.classify_function(func)) for func in functions}
+    assert kinds == {"todo": "stub", "name": "getter", "configure": "setter", "load": "wrapper", "busy": None}
+
+def test_class_of_trivial_methods_is_simple():
+    _, classes = parse('''
+        class Point:
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+            def get_x(self):
+                return self.x
+
+            def __repr__(self):
+                return f"Point({self.x}, {self.y})"
+    ''')
+    result = TrivialSymbolClassifier().classify_class(classes["Point"])
+    assert kind(result) == "simple"
+    assert "`get_x(self)`: returns a stored value" in result[1]
+    assert "`__repr__(self)`: builds the text representation" in result[1]
+
+def test_class_with_a_real_method_goes_to_the_llm():
+    _, classes = parse('''
+        class Counter:
+            def add(self, value):
+                total = self.total + value
+                return total * 2
+
+            def get(self):
+                return self.total
+    ''')
+    assert TrivialSymbolClassifier().classify_class(classes["Counter"]) is None
+
+def test_class_members_are_counted_at_the_top_level(settings):
+    settings(HEURISTIC_CLASS_MAX_STATEMENTS=1)
+    _, classes = parse('''
+        class Small:
+            def __init__(self, a, b):
+                self.a = a
+                self.b = b
+
+        class Wide:
+            def a(self):
+                return self.x
+
+            def b(self):
+                return self.y
+
+            def c(self):
+                return self.z
+    ''')
+    classifier = TrivialSymbolClassifier()
+    assert kind(classifier.classify_class(classes["Small"])) == "simple"
+    assert classifier.classify_class(classes["Wide"]) is None
+
+def test_data_class_and_disabled_classifier(settings):
+    _, classes = parse('''
+        class Colors:
+            RED = 1
+            GREEN = 2
+    ''')
+    assert kind(TrivialSymbolClassifier().classify_class(classes["Colors"])) == "data"
+    settings(HEURISTICS_ENABLED=False)
+    assert TrivialSymbolClassifier().classify_class(classes["Colors"]) is None
\ No newline at end of file
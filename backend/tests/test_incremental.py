@@ -0,0 +1,126 @@
+# ==========================================
+# BACKEND - backend/tests/test_incremental.py
+# ==========================================
+from app.service.analyser import CodeAnalyzer
+from app.service.incremental import IncrementalPlan, build_symbol_index
+from app.service.parser import CodeParser
+from app.utils.source import SourceIndex
+
+BEFORE = '''
+import os
+
+def load(path):
+    with open(path) as f:
+        return f.read()
+
+def save(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+def helper():
+    return 1
+
+def helper():
+    return 2
+
+class Store:
+    def get(self, key):
+        return os.environ.get(key)
+'''.lstrip()
+
+AFTER = '''
+import os
+import json
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def helper():
+    return 1
+
+def helper():
+    return 3
+
+class Store:
+    def get(self, key):
+        return os.environ.get(key)
+
+def fresh():
+    return None
+'''.lstrip()
+
+def parse(code):
+    parser = CodeParser(code)
+    parser.parse()
+    return SourceIndex(code), parser.extract_functions(), parser.extract_classes(), parser.extract_imports()
+
+def previous_record(code, fallbacks=None, explain=lambda symbol: f"about {symbol.name}"):
+    """A stored analysis of code as pipeline.run_analysis writes it"""
+    source, functions, classes, imports = parse(code)
+    for func in functions:
+        func.logic_explanation = explain(func)
+        func.explanation_source = "llm"
+    for cls in classes:
+        cls.detailed_explanation = explain(cls)
+        cls.explanation_source = "llm"
+    stats = {} if fallbacks is None else {"fallbacks": fallbacks}
+    return {
+        "file_id": "previous",
+        "result": {"imports": [{"module": item.module} for item in imports], "stats": stats},
+        "symbols": build_symbol_index(source, functions, classes)
+    }
+
+def plan_for(previous, code):
+    source, functions, classes, imports = parse(code)
+    return IncrementalPlan(previous, source, functions, classes, imports), functions, classes
+
+def test_symbols_are_diffed_by_name_and_span():
+    plan, functions, classes = plan_for(previous_record(BEFORE, fallbacks={}), AFTER)
+    # load edited, save removed, second helper edited, fresh added; helper#0 and Store unchanged
+    assert plan.counts == {"unchanged": 2, "modified": 2, "added": 1, "removed": 1}
+    assert plan.imports_changed == 1
+    assert plan.structural_change == round(5 / 8, 3)
+    by_name = [(func.name, plan.carried_over(func)) for func in functions if func.name in ("helper", "load")]
+    assert [entry is not None for _, entry in by_name] == [False, True, False]
+    assert plan.carried_over(classes[0])["explanation"] == "about Store"
+
+def test_moved_symbol_keeps_its_explanation():
+    moved = "\n\n" + BEFORE
+    plan, functions, classes = plan_for(previous_record(BEFORE, fallbacks={}), moved)
+    assert plan.counts == {"unchanged": 5, "modified": 0, "added": 0, "removed": 0}
+    assert plan.structural_change == 0.0
+
+def test_sections_are_reusable_only_without_fallbacks():
+    plan, _, _ = plan_for(previous_record(BEFORE, fallbacks={"overview": 1}), BEFORE)
+    assert not plan.reusable("overview")
+    assert plan.reusable("detailed_overview")
+
+def test_records_without_fallback_stats_are_not_reused():
+    plan, _, _ = plan_for(previous_record(BEFORE), BEFORE)
+    assert not plan.reusable("overview")
+
+def test_carried_over_symbols_keep_their_source():
+    analyzer = CodeAnalyzer()
+    fallback = analyzer.ai_service._generate_fallback_function_explanation
+    previous = previous_record(
+        BEFORE,
+        fallbacks={"function": 1},
+        explain=lambda symbol: fallback(symbol) if symbol.name == "save" else f"about {symbol.name}"
+    )
+    plan, functions, _ = plan_for(previous, BEFORE)
+    events = []
+    remaining = analyzer._carry_over("function", functions, plan, lambda stage, partial: events.append(partial))
+
+    # The fallback explanation for save is worth another try
+    assert [func.name for func in remaining] == ["save"]
+    carried = [func for func in functions if func not in remaining]
+    assert all(func.carried_over and func.explanation_source == "llm" for func in carried)
+    assert [func.logic_explanation for func in carried] == ["about load", "about helper", "about helper"]
+    assert all(event["carried_over"] for event in events)
+def test_decorator_changes_count_as_modified():
+    decorated = BEFORE.replace("def helper():\n    return 1", "@staticmethod\ndef helper():\n    return 1")
+    previous = previous_record(decorated, fallbacks={})
+    plan, functions, _ = plan_for(previous, decorated.replace("@staticmethod", "@classmethod"))
+    assert plan.counts == {"unchanged": 4, "modified": 1, "added": 0, "removed": 0}
+    assert functions[2].start_line_number == functions[2].line_number - 1
\ No newline at end of file
@@ -0,0 +1,103 @@
+# ==========================================
+# BACKEND - backend/tests/test_jobs.py
+# ==========================================
+import asyncio
+import pytest
+from app.service import jobs
+from app.service.jobs import AnalysisJob, JobManager, JobQueueFullError
+from app.service.pipeline import PIPELINE_STAGES
+
+@pytest.fixture
+def manager(settings):
+    settings(JOB_WORKERS=1, JOB_QUEUE_MAX=2, JOB_RESULT_TTL_SECONDS=3600, JOB_EVENT_BUFFER=100)
+    return JobManager()
+
+async def finished(job):
+    """Every event of a job, read by a subscriber that may join after it finished"""
+    return [message async for message in job.channel.subscribe()]
+
+def test_job_runs_through_every_state(manager, monkeypatch):
+    async def analysis(code, filename, client_id, progress, refresh, previous_analysis_id):
+        seen.append(job.snapshot())
+        for stage in PIPELINE_STAGES:
+            progress(stage, {"overview": "text"} if stage == "overview" else {})
+        progress("explanation", {"kind": "function", "name": "add"})
+        return {"file_id": "abc"}
+
+    seen = []
+    monkeypatch.setattr(jobs, "run_analysis", analysis)
+
+    async def scenario():
+        nonlocal job
+        job = manager.submit("def add(a, b): return a + b", "add.py", "client")
+        queued = (job.status, manager.queue_position(job))
+        events = await finished(job)
+        await manager.stop()
+        return queued, events
+
+    job = None
+    queued, events = asyncio.run(scenario())
+    assert queued == (AnalysisJob.QUEUED, 1)
+    assert seen[0]["status"] == AnalysisJob.RUNNING and seen[0]["stage"] == PIPELINE_STAGES[0]
+    assert job.status == AnalysisJob.SUCCEEDED
+    assert job.result == {"file_id": "abc"}
+    assert job.progress == 1.0 and job.code is None and job.partial == {}
+    assert manager.queue_position(job) is None
+    names = [message["event"] for message in events]
+    assert names == ["queued", "started", *["stage"] * len(PIPELINE_STAGES), "explanation", "done"]
+    assert [message["id"] for message in events] == list(range(1, len(events) + 1))
+    assert events[2]["data"]["completed"] == PIPELINE_STAGES[0]
+    assert events[-1]["data"]["result_url"] == f"/api/jobs/{job.id}/result"
+    assert manager.stats()["succeeded"] == 1
+
+def test_failure_is_reported_on_the_job_and_its_channel(manager, monkeypatch):
+    async def analysis(*args, **kwargs):
+        raise ValueError("parser exploded")
+
+    monkeypatch.setattr(jobs, "run_analysis", analysis)
+
+    async def scenario():
+        job = manager.submit("x = 1", "x.py")
+        events = await finished(job)
+        await manager.stop()
+        return job, events
+
+    job, events = asyncio.run(scenario())
+    assert job.status == AnalysisJob.FAILED
+    assert job.error == "Analysis failed: parser exploded"
+    assert events[-1]["event"] == "failed"
+    assert events[-1]["data"]["error"] == job.error
+    assert manager.stats()["failed"] == 1
+
+def test_full_queue_rejects_and_stop_fails_leftovers(manager, monkeypatch):
+    release = asyncio.Event()
+
+    async def analysis(*args, **kwargs):
+        await release.wait()
+        return {}
+
+    monkeypatch.setattr(jobs, "run_analysis", analysis)
+
+    async def scenario():
+        running = manager.submit("a = 1", "a.py")
+        await asyncio.sleep(0)
+        waiting = [manager.submit("b = 1", "b.py"), manager.submit("c = 1", "c.py")]
+        with pytest.raises(JobQueueFullError):
+            manager.submit("d = 1", "d.py")
+        positions = [manager.queue_position(job) for job in waiting]
+        await manager.stop()
+        return running, waiting, positions
+
+    running, waiting, positions = asyncio.run(scenario())
+    assert positions == [1, 2]
+    assert running.error == "Analysis was cancelled"
+    assert all(job.error == "Server shut down before the analysis finished" for job in waiting)
+    assert manager.stats()["rejected"] == 1
+
+def test_finished_jobs_expire(manager):
+    job = AnalysisJob("x = 1", "x.py", "client")
+    manager.jobs[job.id] = job
+    manager._finish(job)
+    assert manager.get(job.id) is job
+    job.finished_at -= 7200
+    assert manager.get(job.id) is None
\ No newline at end of file
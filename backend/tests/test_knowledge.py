@@ -0,0 +1,62 @@
+# ==========================================
+# BACKEND - backend/tests/test_knowledge.py
+# ==========================================
+import asyncio
+import httpx
+import pytest
+from app.models.schemas import Import
+from app.service.ai import AIService
+from app.service.knowledge import DEFAULT_INDEX_PATH, ImportKnowledgeBase
+
+@pytest.fixture(scope="module")
+def kb():
+    return ImportKnowledgeBase()
+
+def test_index_is_sorted_bytewise_and_unique():
+    keys = [line.split(b"\t", 1)[0] for line in DEFAULT_INDEX_PATH.read_bytes().splitlines()]
+    assert keys == sorted(keys)
+    assert len(keys) == len(set(keys))
+    assert all(line.count(b"\t") == 1 for line in DEFAULT_INDEX_PATH.read_bytes().splitlines())
+
+def test_lookup_finds_every_key(kb):
+    for line in DEFAULT_INDEX_PATH.read_text(encoding="utf-8").splitlines():
+        key, purpose = line.split("\t")
+        assert kb.lookup(key) == purpose
+
+@pytest.mark.parametrize("key", ["", "a", "typin", "typing.", "zzzz", "typing.NotAName", "collections.abc.Nope"])
+def test_lookup_misses(kb, key):
+    assert kb.lookup(key) is None
+
+def test_missing_index_resolves_nothing(tmp_path):
+    kb = ImportKnowledgeBase(str(tmp_path / "missing.tsv"))
+    imports = [Import(module="typing", names=["List"], line_number=1)]
+    assert kb.resolve(imports) == ([], imports)
+
+def test_purpose_details_imported_names(kb):
+    purpose = kb.purpose_for(Import(module="functools", names=["lru_cache", "nothing"], line_number=1))
+    assert purpose.startswith(kb.lookup("functools"))
+    assert "lru_cache (" in purpose
+    assert "nothing" not in purpose
+
+def test_submodule_falls_back_to_its_package(kb):
+    purpose = kb.purpose_for(Import(module="os.not_a_module", names=[], line_number=1))
+    assert purpose == f"Part of the os package. {kb.lookup('os')}"
+
+def test_unknown_imports_go_to_the_model_and_fall_back(kb, monkeypatch):
+    service = AIService()
+    asked = []
+
+    async def unreachable(prompt, **kwargs):
+        asked.append(prompt)
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(service, "_call_structured", unreachable)
+    known = Import(module="json", names=["loads"], line_number=1)
+    unknown = Import(module="acme_internal", names=["Widget"], line_number=2)
+    asyncio.run(service.explain_imports([known, unknown]))
+
+    assert len(asked) == 1
+    assert "acme_internal" in asked[0] and "Module: json" not in asked[0]
+    assert known.purpose.startswith(kb.lookup("json"))
+    assert unknown.purpose.startswith("The acme_internal module provides Widget")
+    assert service.fallbacks == {"imports_batch": 1}
\ No newline at end of file
@@ -0,0 +1,59 @@
+# ==========================================
+# BACKEND - backend/tests/test_latency.py
+# ==========================================
+import pytest
+from app.service.latency import LatencyTracker
+
+@pytest.fixture
+def tracker(settings):
+    settings(
+        ADAPTIVE_TIMEOUT_PERCENTILE=0.99,
+        ADAPTIVE_TIMEOUT_FACTOR=2.0,
+        ADAPTIVE_TIMEOUT_MIN_SAMPLES=8,
+        ADAPTIVE_TIMEOUT_WINDOW=200,
+        OLLAMA_TIMEOUT_MIN=15.0,
+        OLLAMA_TIMEOUT_MAX=900.0
+    )
+    return LatencyTracker()
+
+def test_cold_window_uses_the_default(tracker):
+    for _ in range(7):
+        tracker.record("function", "m", 10.0)
+    assert tracker.timeout_for("function", "m", 300.0) == 300.0
+    tracker.record("function", "m", 10.0)
+    assert tracker.timeout_for("function", "m", 300.0) == 20.0
+
+def test_timeout_follows_rising_latency(tracker):
+    for _ in range(20):
+        tracker.record("function", "m", 10.0)
+    assert tracker.timeout_for("function", "m", 300.0) == 20.0
+    for _ in range(50):
+        tracker.record("function", "m", 40.0)
+    assert tracker.timeout_for("function", "m", 300.0) == 80.0
+
+def test_repeated_timeouts_back_off_to_the_maximum(tracker):
+    for _ in range(20):
+        tracker.record("function", "m", 10.0)
+    limits = []
+    # The server got slower than any limit we allow: every call times out
+    for _ in range(12):
+        limit = tracker.timeout_for("function", "m", 300.0)
+        limits.append(limit)
+        tracker.record_timeout("function", "m", limit)
+    assert limits[0] == 20.0
+    assert limits == sorted(limits)
+    assert limits[-1] == 900.0
+    assert tracker.snapshot()["function:m"]["timeouts"] == 12
+
+def test_one_timeout_among_many_fast_calls_is_outvoted(tracker):
+    tracker.record_timeout("function", "m", 20.0)
+    for _ in range(99):
+        tracker.record("function", "m", 10.0)
+    assert tracker.timeout_for("function", "m", 300.0) == 20.0
+
+def test_batches_scale_with_their_size(tracker):
+    for _ in range(10):
+        tracker.record("functions_batch", "m", 40.0, items=4)
+    assert tracker.timeout_for("functions_batch", "m", 600.0) == 20.0
+    assert tracker.timeout_for("functions_batch", "m", 600.0, items=8) == 160.0
+    assert tracker.percentile("functions_batch", "m", 0.5) == 10.0
\ No newline at end of file
@@ -0,0 +1,80 @@
+# ==========================================
+# BACKEND - backend/tests/test_pipeline.py
+# ==========================================
+import asyncio
+import pytest
+from benchmarks.load_test import free_port, start_stub
+from app.service.backends import get_backend_pool
+from app.service.breaker import get_circuit_breaker
+from app.service.http_pool import get_http_pool
+from app.service.latency import get_latency_tracker
+from app.service.pipeline import run_analysis
+from app.service.scheduler import get_scheduler
+from app.service.singleflight import get_singleflight
+from app.storage.analysis import AnalysisStore
+
+CODE = '''
+class Inventory:
+    def __init__(self):
+        self.items = {}
+
+    def add(self, name, count):
+        if count <= 0:
+            raise ValueError("count must be positive")
+        self.items[name] = self.items.get(name, 0) + count
+        return self.items[name]
+
+def restock(inventory, names):
+    for name in names:
+        inventory.add(name, 10)
+    return inventory
+'''.lstrip()
+
+def reset_ollama_services():
+    """Drop every service that captured the Ollama URL or its health so the next call starts fresh"""
+    for getter in (get_http_pool, get_backend_pool, get_circuit_breaker, get_scheduler, get_latency_tracker, get_singleflight):
+        getter.cache_clear()
+
+@pytest.fixture
+def services(settings, tmp_path):
+    current = settings(
+        OUTPUT_DIR=str(tmp_path),
+        OLLAMA_BACKENDS=[],
+        OLLAMA_CONNECT_TIMEOUT=1.0,
+        ANALYSIS_CACHE_ENABLED=True
+    )
+    yield current
+    reset_ollama_services()
+
+def test_fallback_analysis_is_not_cached_until_ollama_answers(services):
+    async def scenario():
+        # Nothing listens on this port, so every prompt falls back
+        services.OLLAMA_BASE_URL = f"http://127.0.0.1:{free_port()}"
+        reset_ollama_services()
+        degraded = await run_analysis(CODE, "inventory.py")
+        assert degraded["stats"]["degraded"]
+        assert degraded["stats"]["fallbacks"]
+        assert not degraded["cached"]
+        assert not any(AnalysisStore().keys.iterdir())
+
+        server, task, url = await start_stub("--time-scale 0")
+        try:
+            services.OLLAMA_BASE_URL = url
+            reset_ollama_services()
+            fresh = await run_analysis(CODE, "inventory.py")
+            served = server.config.app.state.stub.stats["requests"]
+            repeat = await run_analysis(CODE, "inventory.py")
+            assert served > 0
+            assert server.config.app.state.stub.stats["requests"] == served
+        finally:
+            await get_http_pool().close()
+            server.should_exit = True
+            await task
+        return degraded, fresh, repeat
+
+    degraded, fresh, repeat = asyncio.run(scenario())
+    assert not fresh["cached"]
+    assert not fresh["stats"]["degraded"]
+    assert fresh["file_id"] != degraded["file_id"]
+    assert repeat["cached"]
+    assert repeat["file_id"] == fresh["file_id"]
\ No newline at end of file
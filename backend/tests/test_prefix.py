@@ -0,0 +1,53 @@
+# ==========================================
+# BACKEND - backend/tests/test_prefix.py
+# ==========================================
+import asyncio
+import pytest
+from app.models.schemas import Function
+from app.service.ai import AIService
+from app.service.breaker import get_circuit_breaker
+from app.service.prefix import FilePromptContext
+from app.service.scheduler import get_scheduler
+from app.service.singleflight import get_singleflight
+
+def file_context(filename, line_number):
+    func = Function(name="total", parameters=["items"], return_type=None, docstring=None, line_number=line_number)
+    return FilePromptContext.build(filename, [func], [], [])
+
+@pytest.fixture
+def services(settings):
+    settings(OLLAMA_PREFIX_MODE="system")
+    for getter in (get_circuit_breaker, get_scheduler, get_singleflight):
+        getter.cache_clear()
+    yield
+    for getter in (get_circuit_breaker, get_scheduler, get_singleflight):
+        getter.cache_clear()
+
+def test_outline_lines_are_in_the_prompt(services):
+    context = file_context("shop.py", 12)
+    assert "- total(items) [line 12]" in context.text
+    service = AIService()
+    service.set_file_context(context)
+    payload = asyncio.run(service._build_payload("Explain total", "m", "function", {}, stream=False))
+    assert payload["system"] == context.text
+
+def test_symbol_prompts_share_calls_across_outlines(services):
+    generated = []
+
+    async def post_generate(prompt, timeout, model, *args):
+        generated.append(prompt)
+        await asyncio.sleep(0.05)
+        return "explained"
+
+    async def scenario():
+        calls = []
+        # The same function, shifted by an edit and copied into another file
+        for filename, line_number in (("shop.py", 12), ("shop.py", 30), ("copy.py", 3)):
+            service = AIService()
+            service.set_file_context(file_context(filename, line_number))
+            service._post_generate = post_generate
+            calls.append(service._call_ollama("Explain total", prompt_type="function", model="m"))
+        return await asyncio.gather(*calls)
+
+    assert asyncio.run(scenario()) == ["explained"] * 3
+    assert generated == ["Explain total"]
\ No newline at end of file
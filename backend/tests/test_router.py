@@ -0,0 +1,32 @@
+# ==========================================
+# BACKEND - backend/tests/test_router.py
+# ==========================================
+import asyncio
+from app.models.schemas import Import
+from app.service import router
+from app.service.ai import AIService
+
+def test_snippets_are_routed_by_size_and_complexity(settings):
+    settings(OLLAMA_MODEL_FAST="small", OLLAMA_MODEL_BALANCED="medium", OLLAMA_MODEL_QUALITY="large")
+    models = router.ModelRouter()
+    assert models.choose_model("function", "def f():\n    return 1") == "small"
+    branchy = "def f(x):\n" + "".join(f"    if x == {idx}:\n        return {idx}\n" for idx in range(20))
+    assert models.choose_model("function", branchy) == "large"
+    assert models.choose_model("detailed_overview") == "large"
+    assert models.choose_model("json_repair") == "small"
+
+def test_import_batch_follows_the_router(settings, monkeypatch):
+    settings(OLLAMA_MODEL_BALANCED="medium", OLLAMA_MODEL_QUALITY="large")
+    monkeypatch.setitem(router.FIXED_TIERS, "imports_batch", "quality")
+    service = AIService()
+    models = []
+
+    async def call_structured(prompt, prompt_type, model, **kwargs):
+        models.append(model)
+        return {0: "explained"}
+
+    service._call_structured = call_structured
+    imports = [Import(module="acme_internal", names=["Widget"], line_number=1)]
+    asyncio.run(service.explain_imports_batch(imports))
+    assert models == ["large"]
+    assert imports[0].purpose == "explained"
\ No newline at end of file
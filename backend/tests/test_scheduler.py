@@ -0,0 +1,104 @@
+# ==========================================
+# BACKEND - backend/tests/test_scheduler.py
+# ==========================================
+import asyncio
+import pytest
+from app.service.scheduler import LLMScheduler
+
+def make_scheduler(concurrency: int = 1, weights=None) -> LLMScheduler:
+    scheduler = LLMScheduler()
+    scheduler.max_concurrency = concurrency
+    scheduler.client_weights = weights or {}
+    return scheduler
+
+async def run_calls(scheduler: LLMScheduler, calls):
+    """Queue (prompt_type, client_id) calls behind a blocker and return the order they ran in"""
+    order = []
+    release = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot("overview", "blocker"):
+            await release.wait()
+
+    async def call(prompt_type: str, client_id: str):
+        async with scheduler.slot(prompt_type, client_id):
+            order.append((prompt_type, client_id))
+            await asyncio.sleep(0)
+
+    holding = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = []
+    for prompt_type, client_id in calls:
+        tasks.append(asyncio.create_task(call(prompt_type, client_id)))
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holding, *tasks)
+    return order
+
+def test_higher_priority_runs_first():
+    order = asyncio.run(run_calls(make_scheduler(), [
+        ("suggestions", "a"), ("class", "a"), ("function", "a"), ("overview", "a")
+    ]))
+    assert [prompt_type for prompt_type, _ in order] == ["overview", "function", "class", "suggestions"]
+
+def test_clients_share_fairly_within_a_priority():
+    # A large upload queued first must not starve a small one queued after it
+    calls = [("function", "big")] * 6 + [("function", "small")] * 2
+    order = asyncio.run(run_calls(make_scheduler(), calls))
+    clients = [client_id for _, client_id in order]
+    assert clients[:4].count("small") == 2
+
+def test_weights_scale_the_share():
+    calls = [("function", "heavy")] * 6 + [("function", "light")] * 6
+    order = asyncio.run(run_calls(make_scheduler(weights={"heavy": 2.0}), calls))
+    first_six = [client_id for _, client_id in order[:6]]
+    assert first_six.count("heavy") == 4
+
+def test_concurrency_limit_is_respected():
+    scheduler = make_scheduler(concurrency=2)
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with scheduler.slot("function", "a"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def scenario():
+        await asyncio.gather(*[call() for _ in range(6)])
+
+    asyncio.run(scenario())
+    assert peak == 2
+    assert scheduler.stats()["running"] == 0
+
+def test_cancelled_waiter_gives_up_its_place():
+    scheduler = make_scheduler()
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def holder():
+            async with scheduler.slot("function", "a"):
+                await release.wait()
+
+        async def waiter():
+            async with scheduler.slot("function", "b"):
+                pass
+
+        holding = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 1
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release.set()
+        await holding
+        # The slot is free again for the next caller
+        await asyncio.wait_for(waiter(), 1)
+
+    asyncio.run(scenario())
+    assert scheduler.stats()["running"] == 0
\ No newline at end of file
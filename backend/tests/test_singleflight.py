@@ -0,0 +1,86 @@
+# ==========================================
+# BACKEND - backend/tests/test_singleflight.py
+# ==========================================
+import asyncio
+import pytest
+from app.service.singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def scenario():
+        return await asyncio.gather(*[flights.do("key", work) for _ in range(5)])
+
+    assert asyncio.run(scenario()) == ["done"] * 5
+    assert calls == 1
+    assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+def test_exceptions_reach_every_waiter():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*[flights.do("key", work) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+def test_cancelled_waiter_detaches_without_cancelling_others():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.create_task(flights.do("key", work))
+        second = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+def test_last_waiter_leaving_cancels_the_call_and_frees_the_key():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "stale"
+
+    async def fresh():
+        return "fresh"
+
+    async def scenario():
+        waiter = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.wait_for(cancelled.wait(), 1)
+        # A new caller must start over rather than join the cancelled call
+        return await flights.do("key", fresh)
+
+    assert asyncio.run(scenario()) == "fresh"
+    assert calls == 1
+    assert flights.stats()["in_flight"] == 0
\ No newline at end of file
@@ -0,0 +1,72 @@
+# ==========================================
+# BACKEND - backend/tests/test_source.py
+# ==========================================
+import textwrap
+from app.utils.source import SourceIndex, fit_snippet
+
+CODE = "import os\n\ndef f(x):\n    return x\n\nclass A:\n    pass"
+
+def test_span_slices_exact_lines():
+    source = SourceIndex(CODE)
+    assert source.line_count == 7
+    assert source.span(3, 4) == "def f(x):\n    return x"
+    assert source.span(6, 7) == "class A:\n    pass"
+    assert source.span(1) == "import os"
+    assert source.span(2, 2) == ""
+
+def test_span_clamps_out_of_range_lines():
+    source = SourceIndex(CODE)
+    assert source.span(0, 1) == "import os"
+    assert source.span(6, 99) == "class A:\n    pass"
+    assert source.span(9, 12) == ""
+
+def test_trailing_newline():
+    source = SourceIndex("a = 1\nb = 2\n")
+    assert source.span(2) == "b = 2"
+    assert source.span(3) == ""
+
+def test_snippet_is_memoized():
+    source = SourceIndex(CODE, max_tokens=100)
+    assert source.snippet(3, 4) is source.snippet(3, 4)
+
+def test_fit_snippet_keeps_short_snippets():
+    snippet = "def f(x):\n    return x"
+    assert fit_snippet(snippet, 100) == snippet
+    assert fit_snippet(snippet, 0) == snippet
+
+def test_fit_snippet_keeps_signature_docstring_and_control_lines():
+    body = "\n".join(f"        total += compute_something_long({i}, value, other_argument)" for i in range(40))
+    snippet = textwrap.dedent('''\
+        def process(value, other_argument):
+            """Add up the computed terms."""
+            total = 0
+            if value:
+        {body}
+            elif other_argument:
+                total = -1
+            else:
+                raise ValueError("no input")
+            return total''').format(body=body)
+    fitted = fit_snippet(snippet, 60)
+    lines = fitted.split("\n")
+
+    assert lines[0] == "def process(value, other_argument):"
+    assert lines[1] == '    """Add up the computed terms."""'
+    for kept in ("    if value:", "    elif other_argument:", "    else:", '        raise ValueError("no input")', "    return total"):
+        assert kept in lines
+    assert any(line.strip().endswith("line(s) omitted") for line in lines)
+    assert len(fitted) < len(snippet)
+
+def test_fit_snippet_marks_each_omitted_run():
+    snippet = "def f():\n" + "\n".join(f"    x{i} = {i} * {i} + {i} * {i} + {i}" for i in range(30)) + "\n    return x0"
+    fitted = fit_snippet(snippet, 40)
+    omitted = sum(int(line.split("# ... ")[1].split()[0]) for line in fitted.split("\n") if "# ... " in line)
+    kept = len([line for line in fitted.split("\n") if "# ... " not in line])
+    assert kept + omitted == len(snippet.split("\n"))
+    assert fitted.endswith("    return x0")
+
+def test_fit_snippet_handles_unparseable_code():
+    snippet = "def broken(:\n" + "\n".join(f"    line_{i} = something({i})" for i in range(50))
+    fitted = fit_snippet(snippet, 30)
+    assert fitted.startswith("def broken(:")
+    assert "omitted" in fitted
\ No newline at end of file
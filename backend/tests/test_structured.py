@@ -0,0 +1,111 @@
+# ==========================================
+# BACKEND - backend/tests/test_structured.py
+# ==========================================
+import asyncio
+import json
+import pytest
+from app.service.ai import AIService
+from app.service.breaker import get_circuit_breaker
+from app.service.cache import LLMCache
+from app.service.scheduler import get_scheduler
+from app.service.singleflight import get_singleflight
+from app.service.structured import StructuredOutputError, StructuredParser, repair_json
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Sure! Here you go: {"a": [1, 2]} Hope that helps.', {"a": [1, 2]}),
+    ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+    ('{"items": [{"index": 1, "explanation": "cut off mid', {"items": [{"index": 1, "explanation": "cut off mid"}]}),
+    ('{"items": [{"index": 1, "explanation": "done"}, {"index": 2, "expl', {"items": [{"index": 1, "explanation": "done"}, {"index": 2}]}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('{"a": "brace } and \\" quote", "b": 2}', {"a": 'brace } and " quote', "b": 2}),
+    ('[1, 2', [1, 2])
+])
+def test_repair_json(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+def test_repair_json_leaves_non_json_alone():
+    assert repair_json("no json here") == "no json here"
+
+def test_indexed_keeps_only_valid_entries():
+    parser = StructuredParser()
+    reply = json.dumps({"functions": [
+        {"index": 1, "explanation": " first "},
+        {"index": 3, "explanation": "out of range"},
+        {"index": 2, "explanation": "   "},
+        {"explanation": "no index"}
+    ]})
+    assert parser.indexed(reply, "functions_batch", "functions", 2) == {0: "first"}
+    assert parser.stats()["functions_batch"]["strict"] == 1
+
+def test_indexed_counts_local_repairs():
+    parser = StructuredParser()
+    reply = '```json\n{"imports": [{"index": 1, "explanation": "truncated'
+    assert parser.indexed(reply, "imports_batch", "imports", 1) == {0: "truncated"}
+    assert parser.stats()["imports_batch"]["repaired"] == 1
+
+def test_suggestions_drop_invalid_items_and_fail_when_none_remain():
+    parser = StructuredParser()
+    reply = json.dumps({"suggestions": [
+        {"category": "Performance", "title": "Cache", "description": "Cache results.", "priority": "High"},
+        {"title": "missing fields"}
+    ]})
+    suggestions = parser.suggestions(reply)
+    assert [suggestion.title for suggestion in suggestions] == ["Cache"]
+    with pytest.raises(StructuredOutputError):
+        parser.suggestions('{"suggestions": []}')
+    with pytest.raises(StructuredOutputError):
+        parser.suggestions("not json at all")
+
+@pytest.fixture
+def service(settings, tmp_path):
+    settings(LLM_CACHE_ENABLED=True, LLM_CACHE_PATH=str(tmp_path / "llm_cache.sqlite3"))
+    for getter in (get_circuit_breaker, get_scheduler, get_singleflight):
+        getter.cache_clear()
+    service = AIService()
+    service.cache = LLMCache()
+    yield service
+    for getter in (get_circuit_breaker, get_scheduler, get_singleflight):
+        getter.cache_clear()
+
+def call_twice(service, repair_reply):
+    """Two identical structured calls where the model's first reply is malformed; returns (results, prompts sent)"""
+    sent = []
+
+    async def post_generate(prompt, timeout, model, prompt_type, *args):
+        sent.append(prompt_type)
+        return repair_reply if prompt_type == "json_repair" else "Sorry, here is my answer in prose."
+
+    service._post_generate = post_generate
+
+    async def call():
+        return await service._call_structured(
+            "Explain these imports",
+            prompt_type="imports_batch",
+            model="m",
+            parse=lambda text, repaired: service.structured.indexed(text, "imports_batch", "imports", 1, repaired)
+        )
+
+    async def scenario():
+        results = []
+        for _ in range(2):
+            try:
+                results.append(await call())
+            except StructuredOutputError:
+                results.append(None)
+        return results
+
+    return asyncio.run(scenario()), sent
+
+def test_repaired_reply_replaces_the_malformed_one_in_the_cache(service):
+    results, sent = call_twice(service, '{"imports": [{"index": 1, "explanation": "fixed"}]}')
+    assert results == [{0: "fixed"}, {0: "fixed"}]
+    assert sent == ["imports_batch", "json_repair"]
+
+def test_failed_repair_evicts_both_replies(service):
+    results, sent = call_twice(service, "still not JSON")
+    assert results == [None, None]
+    assert sent == ["imports_batch", "json_repair"] * 2
+    stats = asyncio.run(service.cache.stats())
+    assert stats["memory_items"] == stats["disk_items"] == 0
\ No newline at end of file
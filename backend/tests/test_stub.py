@@ -0,0 +1,26 @@
+# ==========================================
+# BACKEND - backend/tests/test_stub.py
+# ==========================================
+import asyncio
+import httpx
+from stub.ollama import _count_tokens, build_parser, create_app
+
+def generate(**body):
+    async def call():
+        app = create_app(build_parser().parse_args(["--time-scale", "0"]))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+            response = await client.post("/api/generate", json={"model": "deepseek-coder", "stream": False, **body})
+            return response.json()
+    return asyncio.run(call())
+
+def test_prompt_eval_counts_the_new_prompt_with_or_without_context():
+    prompt = "Explain this function briefly: def add(a, b): return a + b"
+    plain = generate(prompt=prompt)
+    with_context = generate(prompt=prompt, context=list(range(500)))
+    assert plain["prompt_eval_count"] == with_context["prompt_eval_count"] == _count_tokens(prompt)
+    assert with_context["context"]
+
+def test_system_prompt_is_evaluated_with_the_prompt():
+    system = "You are documenting the Python module `shop.py`. " * 10
+    reply = generate(prompt="Explain add", system=system)
+    assert reply["prompt_eval_count"] == _count_tokens(system + "Explain add")
\ No newline at end of file
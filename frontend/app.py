@@ -90,12 +90,30 @@ def display_welcome_message():
 # ------------------------------------------------------------------
 # Analysis handler (logic unchanged)
 # ------------------------------------------------------------------
+STAGE_LABELS = {
+    "parse": "Parsing code…",
+    "static_checks": "Checking for issues…",
+    "diagrams": "Drawing diagrams…",
+    "overview": "Writing the overview…",
+    "detailed_overview": "Writing the detailed overview…",
+    "imports": "Explaining imports…",
+    "explanations": "Explaining functions and classes…",
+    "suggestions": "Collecting suggestions…",
+    "report": "Building the report…",
+    "succeeded": "Done"
+}
+
 def handle_analysis(uploaded_file):
     file_content = uploaded_file.read()
     filename = uploaded_file.name
 
     st.success(f"📁 **{filename}** uploaded successfully")
 
+    refresh = st.checkbox(
+        "Re-run the full analysis even if this file was analysed before",
+        value=False
+    )
+
     analyze = st.button(
         "🔍 Analyze Code",
         type="primary",
@@ -104,16 +122,46 @@ def handle_analysis(uploaded_file):
 
     if analyze:
         with st.spinner("Running comprehensive analysis…"):
-            progress = st.progress(0)
-            progress.progress(20)
+            progress = st.progress(0, text="Queued…")
+            live = st.container()
+            overview_slot = live.empty()
+
+            def show_progress(status):
+                if status["status"] == "queued":
+                    position = status.get("queue_position")
+                    text = f"Queued (position {position})…" if position else "Queued…"
+                else:
+                    stage = status.get("stage") or status["status"]
+                    text = STAGE_LABELS.get(stage, stage.capitalize())
+                progress.progress(int(status.get("progress", 0) * 100), text=text)
+                show_fragment(status)
+
+            def show_fragment(event):
+                """Render results from the event stream as they arrive"""
+                fragment = event.get("fragment") or {}
+                if event.get("event") == "stage" and fragment.get("overview"):
+                    overview_slot.markdown(f"### 📝 Overview\n\n{fragment['overview']}")
+                elif event.get("event") == "explanation":
+                    icon = "🏛️" if fragment["kind"] == "class" else "⚙️"
+                    with live.expander(f"{icon} {fragment['name']} (line {fragment['line_number']})"):
+                        st.markdown(fragment["explanation"])
 
             api_client = APIClient(Config.API_BASE_URL)
-            analysis = api_client.analyze_code(file_content, filename)
+            analysis = api_client.analyze_code(
+                file_content,
+                filename,
+                on_progress=show_progress,
+                poll_interval=Config.ANALYSIS_POLL_INTERVAL,
+                timeout=Config.ANALYSIS_TIMEOUT,
+                refresh=refresh
+            )
 
-            progress.progress(100)
+            progress.progress(100, text="Done")
 
         if analysis and "error" not in analysis:
             st.session_state["analysis"] = analysis
+            if analysis.get("cached"):
+                st.info("This file was analysed before; showing the stored result")
             st.success("Analysis completed successfully")
             st.balloons()
             st.rerun()
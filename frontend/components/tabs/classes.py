@@ -80,6 +80,8 @@ def render_classes_tab(classes):
                     st.markdown("---")
                     st.markdown("#### 🧠 Detailed Explanation")
                     st.markdown(detailed_explanation)
+                    if cls.get('explanation_source') == 'heuristic':
+                        st.caption("⚡ Explained from structure without an AI call")
         
         except Exception as e:
             st.error(f"⚠️ Error rendering class {idx}: {str(e)}")
@@ -81,6 +81,8 @@ def render_functions_tab(functions):
                     st.markdown("---")
                     st.markdown("#### 🧠 Logic Explanation")
                     st.markdown(logic_explanation)
+                    if func.get('explanation_source') == 'heuristic':
+                        st.caption("⚡ Explained from structure without an AI call")
                 else:
                     st.info("Detailed logic explanation not available")
         
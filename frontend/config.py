@@ -4,6 +4,10 @@ class Config:
     PAGE_TITLE = "Python Code Explainer"
     PAGE_ICON = "🐍"
     
+    # Analysis jobs: seconds between status polls, and how long to wait in total
+    ANALYSIS_POLL_INTERVAL = 1.0
+    ANALYSIS_TIMEOUT = 1800
+    
     # UI Colors
     PRIMARY_COLOR = "#1f77b4"
     SECONDARY_COLOR = "#666"
@@ -1,35 +1,129 @@
+import json
+import time
 import requests
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterator, Optional
 
 class APIClient:
     """Client for backend API communication"""
     
+    # Times a dropped event stream is reopened before falling back to polling
+    STREAM_RECONNECTS = 2
+    
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
     
-    def analyze_code(self, file_content: bytes, filename: str) -> Optional[Dict[str, Any]]:
+    def analyze_code(
+        self,
+        file_content: bytes,
+        filename: str,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        poll_interval: float = 1.0,
+        timeout: float = 1800,
+        refresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
-        Send file to backend for analysis.
+        Submit file to the backend as an analysis job and wait for the result.
+        
+        Follows the job's event stream, falling back to polling its status if
+        the stream cannot be kept open.
         
         Args:
             file_content: Raw file bytes
             filename: Original filename
+            on_progress: Called with each job event (stage, explanation, ...)
+                or polled status while the analysis runs
+            poll_interval: Seconds between status checks when polling
+            timeout: Seconds to wait for the job before giving up
+            refresh: Recompute even if the backend has this file cached
             
         Returns:
             Analysis response dict or None on error
         """
         try:
-            files = {"file": (filename, file_content, "text/x-python")}
-            response = requests.post(
-                f"{self.base_url}/api/analyze",
-                files=files,
-                timeout=600
-            )
-            response.raise_for_status()
-            return response.json()
+            job = self.submit_analysis(file_content, filename, refresh=refresh)
+            job_id = job["job_id"]
+            deadline = time.monotonic() + timeout
+            last_event_id = 0
+            
+            for _ in range(self.STREAM_RECONNECTS + 1):
+                try:
+                    for event in self.stream_job_events(job_id, last_event_id):
+                        last_event_id = event.get("id", last_event_id)
+                        if on_progress:
+                            on_progress(event)
+                        if event["event"] == "failed":
+                            return {"error": event.get("error") or "Analysis failed"}
+                        if event["event"] == "done":
+                            return self.get_job_result(job_id)
+                        if time.monotonic() > deadline:
+                            return {"error": f"Analysis did not finish within {int(timeout)} seconds"}
+                except requests.exceptions.RequestException:
+                    continue
+            
+            while True:
+                status = self.get_job_status(job_id)
+                if on_progress:
+                    on_progress(status)
+                if status["status"] == "failed":
+                    return {"error": status.get("error") or "Analysis failed"}
+                if status["status"] == "succeeded":
+                    return self.get_job_result(job_id)
+                if time.monotonic() > deadline:
+                    return {"error": f"Analysis did not finish within {int(timeout)} seconds"}
+                time.sleep(poll_interval)
         except requests.exceptions.RequestException as e:
             return {"error": str(e)}
     
+    def stream_job_events(self, job_id: str, last_event_id: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield a job's Server-Sent Events as dicts (with their "id"), resuming after last_event_id"""
+        headers = {"Accept": "text/event-stream"}
+        if last_event_id:
+            headers["Last-Event-ID"] = str(last_event_id)
+        
+        with requests.get(
+            f"{self.base_url}/api/jobs/{job_id}/events",
+            headers=headers,
+            stream=True,
+            timeout=(10, 60)  # the server sends a keep-alive well within the read timeout
+        ) as response:
+            response.raise_for_status()
+            event_id, data_lines = None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    field, _, value = line.partition(":")
+                    if field == "id":
+                        event_id = int(value.strip())
+                    elif field == "data":
+                        data_lines.append(value.strip())
+                    continue
+                # A blank line ends the event; comment-only frames carry no data
+                if data_lines:
+                    event = json.loads("\n".join(data_lines))
+                    if event_id is not None:
+                        event["id"] = event_id
+                    yield event
+                event_id, data_lines = None, []
+    
+    def submit_analysis(self, file_content: bytes, filename: str, refresh: bool = False) -> Dict[str, Any]:
+        """Queue an analysis job; returns its job id and URLs"""
+        files = {"file": (filename, file_content, "text/x-python")}
+        params = {"refresh": "true"} if refresh else None
+        response = requests.post(f"{self.base_url}/api/jobs", files=files, params=params, timeout=30)
+        response.raise_for_status()
+        return response.json()
+    
+    def get_job_status(self, job_id: str) -> Dict[str, Any]:
+        """Stage progress and partial results of a job"""
+        response = requests.get(f"{self.base_url}/api/jobs/{job_id}", timeout=10)
+        response.raise_for_status()
+        return response.json()
+    
+    def get_job_result(self, job_id: str) -> Dict[str, Any]:
+        """Final analysis payload of a finished job"""
+        response = requests.get(f"{self.base_url}/api/jobs/{job_id}/result", timeout=30)
+        response.raise_for_status()
+        return response.json()
+    
     def get_health(self) -> Dict[str, Any]:
         """Check API health"""
         try: